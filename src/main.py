@@ -2,33 +2,62 @@ import argparse
 from pathlib import Path
 import pandas as pd
 from sugarscape import SugarscapeG1mt
+from sugarscape.checkpoint import load_checkpoint, run_with_checkpoints
+from sugarscape.landscape import load_landscape
 
 def parse_args():
     p = argparse.ArgumentParser(description="Run Sugarscape")
     p.add_argument("--steps", type=int, default=1000)
     p.add_argument("--seed", type=int, default=123)
-    p.add_argument("--width", type=int, default=50)
-    p.add_argument("--height", type=int, default=50)
+    p.add_argument("--width", type=int, default=None, help="defaults to the map's width")
+    p.add_argument("--height", type=int, default=None, help="defaults to the map's height")
     p.add_argument("--init-pop", type=int, default=200)
+    p.add_argument("--map", default=None, help="heightmap: sugar-map.txt style text or .npy")
     p.add_argument("--sugar-noise", type=float, default=0.5)
     p.add_argument("--spice-noise", type=float, default=0.5)
-    return p.parse_args()
+    p.add_argument("--stream-dir", type=Path, default=None,
+                   help="stream collected data to chunked .npz files in this directory")
+    p.add_argument("--flush-every", type=int, default=100)
+    p.add_argument("--network-every", type=int, default=None,
+                   help="with --stream-dir: record the Trade Network agent reporter every N steps")
+    p.add_argument("--checkpoint-every", type=int, default=0,
+                   help="save a checkpoint every N steps (0 = never)")
+    p.add_argument("--checkpoint", type=Path, default=Path("data/checkpoint.npz"))
+    p.add_argument("--resume", type=Path, default=None,
+                   help="continue from a checkpoint until --steps total steps")
+    args = p.parse_args()
+    if args.network_every is not None and args.stream_dir is None:
+        p.error("--network-every requires --stream-dir")
+    return args
 
 def main():
     args = parse_args()
-    model = SugarscapeG1mt(
-        width=args.width, height=args.height,
-        initial_population=args.init_pop, seed=args.seed,
-        sugar_noise_sigma=args.sugar_noise,
-        spice_noise_sigma=args.spice_noise,
-    )
-    model.run_model(step_count=args.steps)
+    if args.resume is not None:
+        model = load_checkpoint(args.resume)
+    else:
+        landscape = load_landscape(args.map)
+        model = SugarscapeG1mt(
+            width=args.width or landscape.shape[1], height=args.height or landscape.shape[0],
+            initial_population=args.init_pop, seed=args.seed,
+            map_path=args.map, landscape=landscape,
+            sugar_noise_sigma=args.sugar_noise,
+            spice_noise_sigma=args.spice_noise,
+            collector_dir=args.stream_dir,
+            collector_flush_every=args.flush_every,
+            collector_intervals={"Trade Network": args.network_every or 1},
+        )
+    run_with_checkpoints(model, args.steps, args.checkpoint_every, args.checkpoint)
+    stream_dir = model.init_kwargs["collector_dir"]
+    if stream_dir is not None:
+        print(f"Streamed to {stream_dir}/ (read with sugarscape.results.RunResults)")
+        return
     mv = model.datacollector.get_model_vars_dataframe()
     av = model.datacollector.get_agent_vars_dataframe()
     out_dir = Path("data")
     mv.to_csv(out_dir / "model_vars.csv", index=True)
     av.to_csv(out_dir / "agent_vars.csv", index=True)
-    print(f"Saved to {out_dir}/model_vars.csv and agent_vars.csv")
+    print(f"Saved to {out_dir}/model_vars.csv and agent_vars.csv "
+          "(read with sugarscape.results.RunResults)")
 
 if __name__ == "__main__":
     main()
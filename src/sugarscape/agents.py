@@ -2,7 +2,7 @@ from __future__ import annotations
 import math
 import numpy as np
 import mesa
-from .utils import grid_dist
+from .trading import solve_pair
 
 class Sugar(mesa.Agent):
     def __init__(self, unique_id, model, pos, max_sugar):
@@ -49,30 +49,26 @@ class Trader(mesa.Agent):
 
     # --- cell queries ---
     def get_sugar(self, pos):
-        for a in self.model.grid.get_cell_list_contents(pos):
-            if isinstance(a, Sugar): return a
-        return None
+        return self.model.sugar_patches.get(pos)
 
     def get_spice(self, pos):
-        for a in self.model.grid.get_cell_list_contents(pos):
-            if isinstance(a, Spice): return a
-        return None
+        return self.model.spice_patches.get(pos)
 
     def get_trader(self, pos):
-        for a in self.model.grid.get_cell_list_contents(pos):
-            if isinstance(a, Trader): return a
-        return None
+        return self.model.trader_at(pos)
 
     def is_occupied_by_other_trader(self, pos):
         if pos == self.pos: return False
-        for a in self.model.grid.get_cell_list_contents(pos):
-            if isinstance(a, Trader): return True
-        return False
+        return self.model.occupancy.count[pos[1], pos[0]] > 0
 
     # --- quantities at pos ---
     def get_sugar_amount(self, pos): 
+        res = self.model.sugar_amount
+        if res is not None: return res.item(pos[1], pos[0])  # a Python scalar, not np.int64
         p = self.get_sugar(pos);  return p.amount if p else 0
     def get_spice_amount(self, pos): 
+        res = self.model.spice_amount
+        if res is not None: return res.item(pos[1], pos[0])
         p = self.get_spice(pos);  return p.amount if p else 0
 
     # --- economics ---
@@ -105,9 +101,14 @@ class Trader(mesa.Agent):
         nbor.sugar -= sugar_exchanged
         nbor.spice += spice_exchanged
 
+    def _reject(self, reason):
+        inst = self.model.instruments
+        if inst is not None: inst.count("reject_" + reason)
+        return False
+
     def maybe_sell_resource(self, nbor, price, welfare_self, welfare_nbor, selling, min_gain=1e-12):
         amt = self.calculate_amount_exchanged(price)
-        if amt is None: return False
+        if amt is None: return self._reject("price")
         sugar_ex, spice_ex = amt
 
         if selling == "sugar":
@@ -119,12 +120,12 @@ class Trader(mesa.Agent):
 
         self_su = self.sugar + dss; self_sp = self.spice + dsp
         nbor_su = nbor.sugar + dns; nbor_sp = nbor.spice + dnp
-        if min(self_su, self_sp, nbor_su, nbor_sp) < 0: return False
+        if min(self_su, self_sp, nbor_su, nbor_sp) < 0: return self._reject("negative")
 
         ws_new = self.calculate_welfare(self_su, self_sp)
         wn_new = nbor.calculate_welfare(nbor_su, nbor_sp)
         if (ws_new - welfare_self) < min_gain or (wn_new - welfare_nbor) < min_gain:
-            return False
+            return self._reject("welfare")
 
         def mrs_with(agent, su, sp):
             return ((sp / max(1e-9, agent.metabolism_spice)) /
@@ -136,14 +137,43 @@ class Trader(mesa.Agent):
         mrs_nbor_a = mrs_with(nbor, nbor_su, nbor_sp)
 
         if selling == "spice":
-            if not (mrs_self_b > mrs_nbor_b and mrs_self_a >= mrs_nbor_a): return False
+            if not (mrs_self_b > mrs_nbor_b and mrs_self_a >= mrs_nbor_a): return self._reject("mrs")
         else:
-            if not (mrs_self_b < mrs_nbor_b and mrs_self_a <= mrs_nbor_a): return False
+            if not (mrs_self_b < mrs_nbor_b and mrs_self_a <= mrs_nbor_a): return self._reject("mrs")
 
         self.exchange_resource(nbor, sugar_ex, spice_ex)
         return True
 
     def trade(self, nbor, max_rounds=64, min_gain=1e-12):
+        solver = self.model.trade_solver
+        inst = self.model.instruments
+        if inst is not None:
+            inst.count("trades")
+        if solver == "iterative":
+            return self.trade_iterative(nbor, max_rounds, min_gain)
+        # in validate mode the iterative pass does the counting
+        rejects = inst.current if inst is not None and solver == "fast" else None
+        su, sp, nsu, nsp, prices = solve_pair(
+            self.sugar, self.spice, self.metabolism_sugar, self.metabolism_spice,
+            nbor.sugar, nbor.spice, nbor.metabolism_sugar, nbor.metabolism_spice,
+            max_rounds, min_gain, rejects)
+        if solver == "validate":
+            n0 = len(self.prices)
+            self.trade_iterative(nbor, max_rounds, min_gain)
+            if ((self.sugar, self.spice, nbor.sugar, nbor.spice) != (su, sp, nsu, nsp)
+                    or self.prices[n0:] != prices):
+                raise RuntimeError(
+                    f"fast trade solver diverged for {self.unique_id} -> {nbor.unique_id}")
+            return
+        if prices:
+            self.sugar, self.spice, nbor.sugar, nbor.spice = su, sp, nsu, nsp
+            self.prices.extend(prices)
+            self.trade_partners.extend([nbor.unique_id] * len(prices))
+            self.model.record_trade(self, nbor, prices)
+            if inst is not None:
+                inst.count("trade_rounds", len(prices))
+
+    def trade_iterative(self, nbor, max_rounds=64, min_gain=1e-12):
         rounds = 0
         while rounds < max_rounds:
             if (self.sugar <= 0 and self.spice <= 0) or (nbor.sugar <= 0 and nbor.spice <= 0):
@@ -166,12 +196,23 @@ class Trader(mesa.Agent):
             self.prices.append(price)
             self.trade_partners.append(nbor.unique_id)
             rounds += 1
+        if rounds:
+            self.model.record_trade(self, nbor, self.prices[-rounds:])
+            inst = self.model.instruments
+            if inst is not None:
+                inst.count("trade_rounds", rounds)
 
     # --- main movement/eat/die/trade-with-neighbor ---
     def move(self):
-        neighbors = [i for i in self.model.grid.get_neighborhood(
-            self.pos, self.moore, True, self.vision
-        ) if not self.is_occupied_by_other_trader(i)]
+        if self.model.movement_engine == "vectorized":
+            neighbors, dists = self.best_cells_vectorized()
+        else:
+            xs, ys, dist = self.model.neighborhoods.cells(self.pos, self.vision, self.moore, True)
+            if self.model.instruments is not None:
+                self.model.instruments.count("cells_scanned", xs.size)
+            free = (self.model.occupancy.count[ys, xs] == 0) | (dist == 0)
+            neighbors = list(zip(xs[free].tolist(), ys[free].tolist()))
+            dists = dist[free].tolist()
         if not neighbors: return
         welfares = [
             self.calculate_welfare(
@@ -183,13 +224,45 @@ class Trader(mesa.Agent):
         assert all(isinstance(w, (int, float, np.floating)) and np.isfinite(w) for w in welfares)
         max_w = max(welfares)
         idxs = [i for i, w in enumerate(welfares) if math.isclose(w, max_w)]
-        cands = [neighbors[i] for i in idxs]
-        min_d = min(grid_dist(self.pos, p, self.moore) for p in cands)
-        finals = [p for p in cands if math.isclose(grid_dist(self.pos, p, self.moore), min_d, rel_tol=1e-3)]
+        min_d = min(dists[i] for i in idxs)
+        finals = [neighbors[i] for i in idxs if math.isclose(dists[i], min_d, rel_tol=1e-3)]
         self.model.random.shuffle(finals)
-        self.model.grid.move_agent(self, finals[0])
+        self.model.move_trader(self, finals[0])
+
+    def best_cells_vectorized(self):
+        """Free cells in vision whose welfare is within 1e-6 of the best, and their distances.
+
+        Welfare is evaluated for the whole stencil at once on the resource
+        arrays. NumPy's SIMD pow can differ from Python's in the last bit, so
+        this only prunes: `move` re-scores the short list exactly, which keeps
+        the chosen cell identical to the per-cell path.
+        """
+        m = self.model
+        xs, ys, dist = m.neighborhoods.cells(self.pos, self.vision, self.moore, True)
+        if m.instruments is not None:
+            m.instruments.count("cells_scanned", xs.size)
+        free = (m.occupancy.count[ys, xs] == 0) | (dist == 0)
+        xs, ys, dist = xs[free], ys[free], dist[free]
+        m_total = self.metabolism_sugar + self.metabolism_spice
+        if m_total <= 0:
+            w = np.zeros(xs.size)
+        else:
+            su = np.maximum(0.0, (self.sugar + m.sugar_amount[ys, xs]).astype(float))
+            sp = np.maximum(0.0, (self.spice + m.spice_amount[ys, xs]).astype(float))
+            w = su ** (self.metabolism_sugar / m_total) * sp ** (self.metabolism_spice / m_total)
+        near = np.flatnonzero(w >= w.max() * (1.0 - 1e-6))
+        return list(zip(xs[near].tolist(), ys[near].tolist())), dist[near].tolist()
 
     def harvest(self):
+        if self.model.sugar_amount is not None:
+            # array-backed resources (index [y, x]); .item() keeps trader
+            # state in Python scalars, which the per-agent math is fast on
+            x, y = self.pos
+            self.sugar += self.model.sugar_amount.item(y, x)
+            self.model.sugar_amount[y, x] = 0
+            self.spice += self.model.spice_amount.item(y, x)
+            self.model.spice_amount[y, x] = 0
+            return
         # collect sugar in this cell
         p = self.get_sugar(self.pos)
         if p:
@@ -208,21 +281,19 @@ class Trader(mesa.Agent):
 
     def maybe_die(self):
         if self.is_starved():
-            # leave a short-lived 'ghost' for the viz
-            self.model.spawn_death_marker(self.pos)
-            # remove trader
-            self.model.grid.remove_agent(self)
-            self.model.schedule.remove(self)
+            self.model.kill_trader(self)
 
     def is_starved(self):
         # Returns True if the trader has no sugar or spice left.
         return self.sugar <= 0 and self.spice <= 0
 
     def trade_with_neighbor(self):
-        nbors = [
-            self.get_trader(pos) for pos in self.model.grid.get_neighborhood(
-                self.pos, self.moore, False, self.vision)
-            if self.is_occupied_by_other_trader(pos)
-        ]
+        m = self.model
+        xs, ys, _ = m.neighborhoods.cells(self.pos, self.vision, self.moore, False)
+        if m.instruments is not None:
+            m.instruments.count("cells_scanned", xs.size)
+        ids = m.occupancy.ids[ys, xs]
+        traders = m.schedule.agents_by_type[Trader]
+        nbors = [traders[uid] for uid in ids[ids >= 0].tolist()]
         for a in nbors:
-            if a: self.trade(a)
+            self.trade(a)
@@ -2,22 +2,10 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from .model import SugarscapeG1mt
-from .agents import Sugar, Spice, Trader
 
 def rasterize(model):
-    H, W = model.height, model.width
-    sugar = np.zeros((H, W)); spice = np.zeros((H, W))
-    xs, ys = [], []
-    for y in range(H):
-        for x in range(W):
-            for a in model.grid.get_cell_list_contents((x, y)):
-                if isinstance(a, Sugar):
-                    sugar[y, x] = a.amount
-                elif isinstance(a, Spice):
-                    spice[y, x] = a.amount
-                elif isinstance(a, Trader):
-                    xs.append(x); ys.append(y)
-    return sugar, spice, np.array(xs), np.array(ys)
+    snap = model.snapshot()
+    return snap["sugar"], snap["spice"], snap["trader_x"], snap["trader_y"]
 
 def main(steps=200, interval=120):
     model = SugarscapeG1mt(seed=42)
@@ -0,0 +1,161 @@
+"""Benchmarks: model construction and step() phase by phase.
+
+    python -m sugarscape.bench --sizes 50 100 200x100 --populations 200 1000 \\
+        --steps 20 --param resource_engine=array --out data/bench.json
+
+Every case runs on a `synthetic_landscape` of the requested size, with
+``instrument="on"`` so phase times and counters come from `model.instruments`
+(see `sugarscape.instrument`). Results (init time, per-phase step time,
+steps/sec, hot-path counters, peak traced memory) are written
+as JSON; ``--compare old.json`` prints the steps/sec ratio against a previous
+run, e.g. one saved on another commit.
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+from .landscape import synthetic_landscape
+from .sweep import expand_grid, parse_param
+
+def _build(width, height, population, seed, model_kwargs):
+    from .model import SugarscapeG1mt
+    return SugarscapeG1mt(width=width, height=height, initial_population=population, seed=seed,
+                          landscape=synthetic_landscape(width, height), **model_kwargs)
+
+def bench_case(width, height, population, steps=20, seed=0, memory=True, **model_kwargs) -> dict:
+    """Time one configuration; `model_kwargs` go to SugarscapeG1mt.
+
+    Peak memory is measured in a second, identical run under tracemalloc so
+    it does not skew the timings.
+    """
+    from .agents import Trader
+    kwargs = dict(model_kwargs)
+    if kwargs.get("instrument", "off") == "off":
+        kwargs["instrument"] = "on"
+    t0 = time.perf_counter()
+    model = _build(width, height, population, seed, kwargs)
+    init_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    try:
+        for _ in range(steps):
+            model.step()
+        step_s = time.perf_counter() - t0
+    finally:
+        model.close()
+    totals = model.instruments.totals
+
+    rec = {"width": width, "height": height, "population": population, "steps": steps,
+           "seed": seed, "params": model_kwargs,
+           "init_seconds": init_s, "step_seconds": step_s,
+           "steps_per_sec": steps / step_s if step_s > 0 else float("inf"),
+           "phase_seconds": {p: totals[f"time_{p}"] for p in model.instruments.phases},
+           "counters": {k: totals[k] for k in model.instruments.COUNTERS},
+           "final_traders": model.schedule.get_type_count(Trader)}
+    if memory:
+        tracemalloc.start()
+        try:
+            m = _build(width, height, population, seed, model_kwargs)
+            try:
+                for _ in range(steps):
+                    m.step()
+            finally:
+                m.close()
+            rec["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return rec
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=Path(__file__).parent, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_bench(sizes, populations, steps=20, seed=0, grid=None, memory=True) -> dict:
+    """Run every (size, population, grid point) case; `sizes` are (width, height)."""
+    import mesa
+    results = []
+    for params in expand_grid(grid or {}):
+        for width, height in sizes:
+            for pop in populations:
+                results.append(bench_case(width, height, pop, steps=steps, seed=seed,
+                                          memory=memory, **params))
+    meta = {"commit": _git_commit(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(), "numpy": np.__version__,
+            "mesa": mesa.__version__, "machine": platform.machine()}
+    return {"meta": meta, "results": results}
+
+def _key(rec):
+    return (rec["width"], rec["height"], rec["population"], rec["steps"],
+            json.dumps(rec["params"], sort_keys=True))
+
+def compare(base: dict, new: dict) -> list[dict]:
+    """Match cases between two run_bench outputs; speedup = new / base steps/sec."""
+    old = {_key(r): r for r in base["results"]}
+    rows = []
+    for r in new["results"]:
+        b = old.get(_key(r))
+        if b is not None:
+            rows.append({"width": r["width"], "height": r["height"],
+                         "population": r["population"], "params": r["params"],
+                         "speedup": r["steps_per_sec"] / b["steps_per_sec"]})
+    return rows
+
+def _parse_size(text):
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h or w)
+
+def format_table(results) -> str:
+    from .model import SugarscapeG1mt
+    head = f"{'size':>9} {'pop':>6} {'init s':>7} {'steps/s':>8} {'MB':>7}  " + \
+           " ".join(f"{p:>12}" for p in SugarscapeG1mt.PHASES)
+    lines = [head]
+    for r in results:
+        total = r["step_seconds"] or 1.0
+        share = " ".join(f"{100 * r['phase_seconds'][p] / total:>11.1f}%"
+                         for p in SugarscapeG1mt.PHASES)
+        mem = r.get("peak_memory_mb")
+        lines.append(f"{r['width']:>4}x{r['height']:<4} {r['population']:>6} "
+                     f"{r['init_seconds']:>7.3f} {r['steps_per_sec']:>8.2f} "
+                     f"{'-' if mem is None else format(mem, '.1f'):>7}  {share}"
+                     + (f"  {r['params']}" if r["params"] else ""))
+    return "\n".join(lines)
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark SugarscapeG1mt")
+    p.add_argument("--sizes", type=_parse_size, nargs="+", default=[(50, 50), (100, 100)],
+                   help="grid sizes, N or WxH")
+    p.add_argument("--populations", type=int, nargs="+", default=[200, 800])
+    p.add_argument("--steps", type=int, default=20)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--param", type=parse_param, action="append", default=[],
+                   help="constructor kwarg and values, e.g. resource_engine=agents,array")
+    p.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    p.add_argument("--out", type=Path, default=None, help="write results as JSON")
+    p.add_argument("--compare", type=Path, default=None, help="earlier JSON to compare against")
+    return p.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    res = run_bench(args.sizes, args.populations, steps=args.steps, seed=args.seed,
+                    grid=dict(args.param), memory=not args.no_memory)
+    print(format_table(res["results"]))
+    if args.out is not None:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(res, indent=2))
+        print(f"Saved {len(res['results'])} cases to {args.out}")
+    if args.compare is not None:
+        for row in compare(json.loads(args.compare.read_text()), res):
+            print(f"{row['width']}x{row['height']} pop={row['population']} {row['params']}: "
+                  f"{row['speedup']:.2f}x")
+
+if __name__ == "__main__":
+    main()
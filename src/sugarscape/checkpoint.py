@@ -0,0 +1,313 @@
+"""Binary checkpoint / resume for SugarscapeG1mt.
+
+A checkpoint is a single compressed ``.npz`` of plain arrays plus a JSON
+header (nothing is unpickled on load): resource arrays, trader state in
+scheduler order, RNG states, step counters, recent deaths, the trade network
+and the collected model series. Agent records go to part files in a
+``<checkpoint>.collected/`` directory next to it, each holding the steps
+since the previous checkpoint to that path (a streaming collector's chunks
+are referenced instead). `load_checkpoint`
+rebuilds an empty model from the saved constructor arguments and overwrites
+its state, so stepping the restored model continues bit-identically.
+
+Dead traders stay registered with mesa, so the DataCollector keeps reporting
+their last partner lists; a checkpoint saves those lists and the restore
+registers stand-ins in the same order.
+"""
+from __future__ import annotations
+import json
+import weakref
+from pathlib import Path
+import numpy as np
+
+# scalar types trader sugar/spice take, restored as they were saved
+_SCALARS = (int, float, np.int64, np.float64)
+
+def _json_value(v):
+    """json.dumps `default`: cast the non-JSON values init kwargs may hold."""
+    if isinstance(v, np.bool_):
+        return bool(v)
+    if isinstance(v, np.integer):
+        return int(v)
+    if isinstance(v, np.floating):
+        return float(v)
+    if isinstance(v, Path):
+        return str(v)
+    raise TypeError(f"cannot checkpoint {type(v).__name__} value {v!r}")
+
+def _ragged(lists):
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(v) for v in lists])
+    flat = [x for v in lists for x in v]
+    return offsets, np.asarray(flat)
+
+def _unragged(offsets, flat):
+    flat = flat.tolist()
+    return [flat[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+def _records(values):
+    """Reporter values (None, list or scalar) as kind codes plus a ragged array."""
+    kind = np.array([0 if v is None else 1 if isinstance(v, (list, tuple)) else 2
+                     for v in values], dtype=np.int8)
+    offsets, flat = _ragged([[] if v is None else v if isinstance(v, (list, tuple)) else [v]
+                             for v in values])
+    return kind, offsets, flat
+
+def _unrecords(kind, offsets, flat):
+    out = _unragged(offsets, flat)
+    return [None if k == 0 else v if k == 1 else v[0] for k, v in zip(kind.tolist(), out)]
+
+# collector -> (part directory, last step written, part names), so later
+# checkpoints to the same path only write the steps collected since
+_WRITTEN = weakref.WeakKeyDictionary()
+
+def _parts_dir(path):
+    return path.with_name(path.name + ".collected")
+
+def _agent_rows(dc, after=None):
+    """(step, id, *values) rows of `dc` for steps after `after` (all if None)."""
+    if after is None and getattr(dc, "earlier", None) is not None:
+        yield from dc.earlier.reset_index().itertuples(index=False, name=None)
+    # mesa keeps one list of rows per collected step
+    for step, rows in dc._agent_records.items():
+        if after is None or step > after:
+            yield from rows
+
+def _save_collected(dc, directory):
+    """Model records of a mesa.DataCollector as arrays; agent records go to a
+    part file in `directory` holding only the steps since the last save there.
+
+    Returns (arrays, part names, last step written).
+    """
+    if dc.agenttype_reporters or dc.tables:
+        raise ValueError("checkpoints do not cover agent-type reporters or tables")
+    arrays = {f"model.{k}.value": np.asarray(v) for k, v in dc.model_vars.items()}
+    if not dc.agent_reporters:
+        return arrays, [], None
+    where, last, parts = _WRITTEN.get(dc, (None, None, []))
+    if where != directory:
+        last, parts = None, []
+    rows = list(_agent_rows(dc, last))
+    if not rows:
+        return arrays, parts, last
+    part = {"step": np.array([r[0] for r in rows], dtype=np.int64),
+            "id": np.array([r[1] for r in rows], dtype=np.int64)}
+    for i, name in enumerate(dc.agent_reporters, start=2):
+        kind, off, flat = _records([r[i] for r in rows])
+        part.update({f"{name}.kind": kind, f"{name}.offsets": off, f"{name}.values": flat})
+    name = f"part-{rows[0][0]:08d}-{rows[-1][0]:08d}.npz"
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp = directory / (name + ".tmp")
+    with open(tmp, "wb") as fh:
+        np.savez_compressed(fh, **part)
+    tmp.replace(directory / name)
+    return arrays, [*parts, name], rows[-1][0]
+
+def _load_collected(dc, z, directory, parts):
+    """A ResumedDataCollector with `dc`'s reporters and the saved records."""
+    import pandas as pd
+    from .collectors import ResumedDataCollector
+
+    earlier, last = None, None
+    if dc.agent_reporters and parts:
+        frames = []
+        for name in parts:
+            with np.load(directory / name, allow_pickle=False) as p:
+                cols = {"Step": p["step"].tolist(), "AgentID": p["id"].tolist()}
+                for rep in dc.agent_reporters:
+                    cols[rep] = _unrecords(*(p[f"{rep}.{k}"] for k in ("kind", "offsets", "values")))
+            frames.append(pd.DataFrame(cols))
+        earlier = pd.concat(frames).set_index(["Step", "AgentID"])
+        last = int(frames[-1]["Step"].iloc[-1])
+    out = ResumedDataCollector(earlier, model_reporters=dc.model_reporters,
+                               agent_reporters=dc.agent_reporters)
+    for name in dc.model_reporters:
+        out.model_vars[name].extend(z[f"model.{name}.value"].tolist())
+    _WRITTEN[out] = (directory, last, list(parts))
+    return out
+
+def save_checkpoint(model, path):
+    """Write `model`'s full state to `path` (written atomically)."""
+    from .agents import Trader
+    from .collectors import StreamingCollector
+
+    traders = list(model.schedule.agents_by_type.get(Trader, {}).values())
+    occ = model.occupancy
+    rank = [occ.arrival(t.pos, t.unique_id) for t in traders]
+    live = {t.unique_id for t in traders}
+    registry = [a for a in model.agents if isinstance(a, Trader)]
+    retired_off, retired = _ragged([a.trade_partners for a in registry
+                                    if a.unique_id not in live])
+    price_off, prices = _ragged([t.prices for t in traders])
+    partner_off, partners = _ragged([t.trade_partners for t in traders])
+    su_cap, su_amt, sp_cap, sp_amt = model.resource_arrays()
+    patch_types = {}
+    if model.sugar_amount is None:
+        for name, patches in (("sugar", model.sugar_patches), ("spice", model.spice_patches)):
+            codes = np.zeros(su_amt.shape, dtype=np.int8)
+            for (x, y), p in patches.items():
+                codes[y, x] = _SCALARS.index(type(p.amount))
+            patch_types[f"{name}_amount_type"] = codes
+    pairs = np.array([(a, b, bits) for (a, b), bits in model.trade_pairs.items()],
+                     dtype=np.int64).reshape(-1, 3)
+
+    path = Path(path)
+    dc = model.datacollector
+    if isinstance(dc, StreamingCollector):
+        dc.flush()
+        chunks, collected, parts = dc.chunks, {}, None
+    else:
+        chunks = None
+        collected, parts, last = _save_collected(dc, _parts_dir(path))
+
+    mt_version, mt_state, gauss_next = model.random.getstate()
+    init_kwargs = {k: v for k, v in model.init_kwargs.items() if k != "landscape"}
+    meta = {
+        "init_kwargs": init_kwargs,
+        "steps": model.schedule.steps,
+        "mesa_steps": model.steps,
+        "running": model.running,
+        "mt_version": mt_version,
+        "gauss_next": gauss_next,
+        "np_random": model.np_random.bit_generator.state,
+        "rng": model.rng.bit_generator.state,
+        "log_price_sum": model.log_price_sum,
+        "price_count": model.price_count,
+        "strip_seed": model.engine.seed if model.engine is not None else None,
+        "network_step": model.network.last_step if model.network is not None else None,
+        "collector_chunks": chunks,
+        "collected_parts": parts,
+    }
+    arrays = dict(
+        meta=np.frombuffer(json.dumps(meta, default=_json_value).encode(), dtype=np.uint8),
+        landscape=np.asarray(model.landscape),
+        mt_state=np.asarray(mt_state, dtype=np.uint32),
+        sugar_capacity=su_cap, sugar_amount=su_amt,
+        spice_capacity=sp_cap, spice_amount=sp_amt,
+        uid=np.array([t.unique_id for t in traders], dtype=np.int64),
+        x=np.array([t.pos[0] for t in traders], dtype=np.int64),
+        y=np.array([t.pos[1] for t in traders], dtype=np.int64),
+        rank=np.array(rank, dtype=np.int64),
+        moore=np.array([t.moore for t in traders], dtype=bool),
+        sugar=np.array([t.sugar for t in traders], dtype=float),
+        spice=np.array([t.spice for t in traders], dtype=float),
+        sugar_type=np.array([_SCALARS.index(type(t.sugar)) for t in traders], dtype=np.int8),
+        spice_type=np.array([_SCALARS.index(type(t.spice)) for t in traders], dtype=np.int8),
+        metabolism_sugar=np.array([t.metabolism_sugar for t in traders], dtype=np.int64),
+        metabolism_spice=np.array([t.metabolism_spice for t in traders], dtype=np.int64),
+        vision=np.array([t.vision for t in traders], dtype=np.int64),
+        price_offsets=price_off, prices=prices.astype(float),
+        partner_offsets=partner_off, partners=partners.astype(np.int64),
+        trade_pairs=pairs,
+        **patch_types,
+        registry=np.array([a.unique_id for a in registry], dtype=np.int64),
+        retired_offsets=retired_off, retired=retired.astype(np.int64),
+        **{f"collected.{k}": v for k, v in collected.items()},
+        **{f"death_{k}": v for k, v in model.deaths.events().items()},
+    )
+    if model.network is not None:
+        arrays.update({f"network_{k}": v for k, v in model.network.edges().items()})
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        np.savez_compressed(fh, **arrays)
+    tmp.replace(path)
+    if parts is not None:
+        _WRITTEN[dc] = (_parts_dir(path), last, parts)
+        for old in _parts_dir(path).glob("part-*.npz"):
+            if old.name not in parts:
+                old.unlink()
+
+def load_checkpoint(path):
+    """Rebuild a model from `path`; stepping it continues the saved run."""
+    from .agents import Trader
+    from .model import SugarscapeG1mt
+
+    with np.load(path, allow_pickle=False) as z:
+        z = {k: z[k] for k in z.files}
+    meta = json.loads(z["meta"].tobytes().decode())
+    kwargs = dict(meta["init_kwargs"], landscape=z["landscape"], initial_population=0)
+    model = SugarscapeG1mt(**kwargs)
+    if meta["collector_chunks"] is not None:
+        model.datacollector.resume(meta["collector_chunks"])
+
+    # resources
+    if model.sugar_amount is not None:
+        cap_dtype = model.sugar_capacity.dtype
+        model.sugar_capacity = z["sugar_capacity"].astype(cap_dtype)
+        model.spice_capacity = z["spice_capacity"].astype(cap_dtype)
+        model.sugar_amount = z["sugar_amount"].astype(cap_dtype)
+        model.spice_amount = z["spice_amount"].astype(cap_dtype)
+    else:
+        for p in [*model.sugar_patches.values(), *model.spice_patches.values()]:
+            model.grid.remove_agent(p); model.schedule.remove(p); p.remove()
+        model.sugar_patches.clear(); model.spice_patches.clear()
+        cap_dtype = int if model.init_kwargs["integerize_maps"] else float
+        model.place_patches(z["sugar_capacity"].astype(cap_dtype), z["spice_capacity"].astype(cap_dtype))
+        for name, patches in (("sugar", model.sugar_patches), ("spice", model.spice_patches)):
+            amt, codes = z[f"{name}_amount"], z[f"{name}_amount_type"]
+            for (x, y), p in patches.items():
+                p.amount = _SCALARS[codes[y, x]](amt[y, x])
+    model.sugar_max = float(np.max(z["sugar_capacity"])) if z["sugar_capacity"].size else 0.0
+    model.spice_max = float(np.max(z["spice_capacity"])) if z["spice_capacity"].size else 0.0
+
+    # traders are registered with mesa in the saved order (dead ones as
+    # stand-ins holding their partner lists), then scheduled in scheduler
+    # order; grid cells are filled rank by rank so stacked traders keep
+    # their arrival order
+    prices = _unragged(z["price_offsets"], z["prices"])
+    partners = _unragged(z["partner_offsets"], z["partners"])
+    retired = iter(_unragged(z["retired_offsets"], z["retired"]))
+    row = {uid: i for i, uid in enumerate(z["uid"].tolist())}
+    traders = [None] * len(row)
+    for uid in z["registry"].tolist():
+        i = row.get(uid)
+        if i is None:
+            Trader(uid, model, None).trade_partners = next(retired)
+            continue
+        sugar = _SCALARS[z["sugar_type"][i]](z["sugar"][i])
+        spice = _SCALARS[z["spice_type"][i]](z["spice"][i])
+        t = model.trader_cls(uid, model, None, moore=bool(z["moore"][i]), sugar=sugar, spice=spice,
+                             metabolism_sugar=int(z["metabolism_sugar"][i]),
+                             metabolism_spice=int(z["metabolism_spice"][i]),
+                             vision=int(z["vision"][i]))
+        t.prices, t.trade_partners = prices[i], partners[i]
+        traders[i] = t
+    for t in traders:
+        model.schedule.add(t)
+    for i in np.argsort(z["rank"], kind="stable"):
+        model.place_trader(traders[i], (int(z["x"][i]), int(z["y"][i])))
+
+    model.deaths.restore({k: z[f"death_{k}"] for k in model.deaths.FIELDS})
+
+    # step counters, RNGs and per-step statistics
+    model.schedule.steps = meta["steps"]
+    model.steps = meta["mesa_steps"]
+    model.running = meta["running"]
+    model.random.setstate((meta["mt_version"], tuple(z["mt_state"].tolist()), meta["gauss_next"]))
+    model.np_random.bit_generator.state = meta["np_random"]
+    model.rng.bit_generator.state = meta["rng"]
+    model.trade_pairs = {(a, b): bits for a, b, bits in z["trade_pairs"].tolist()}
+    model.log_price_sum = meta["log_price_sum"]
+    if model.engine is not None:
+        model.engine.seed = meta["strip_seed"]
+    model.price_count = meta["price_count"]
+    if model.network is not None:
+        model.network.restore({k: z[f"network_{k}"] for k in model.network.FIELDS},
+                              meta["network_step"])
+
+    if meta["collector_chunks"] is None:
+        collected = {k[len("collected."):]: v for k, v in z.items() if k.startswith("collected.")}
+        model.datacollector = _load_collected(model.datacollector, collected,
+                                              _parts_dir(Path(path)), meta["collected_parts"])
+    return model
+
+def run_with_checkpoints(model, step_count, every, path):
+    """Step `model` until `step_count` total steps, checkpointing every `every`."""
+    while model.schedule.steps < step_count:
+        model.step()
+        if every and model.schedule.steps % every == 0:
+            save_checkpoint(model, path)
+    flush = getattr(model.datacollector, "flush", None)
+    if flush is not None:
+        flush()
+    return model
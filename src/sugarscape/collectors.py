@@ -0,0 +1,190 @@
+"""Streaming, columnar replacement for mesa.DataCollector.
+
+Collected values are buffered for `flush_every` collections and then appended
+to ``<path>/chunk-NNNNNN.npz``. Each reporter is stored column-wise:
+
+* model reporter ``X``: ``model.X.step`` and ``model.X.value``
+* agent reporter ``X``: ``agent.X.step`` / ``agent.X.agent`` (one entry per
+  agent record), ``agent.X.offsets`` and ``agent.X.values`` (CSR layout, so
+  list-valued reporters like "Trade Network" stay flat).
+
+`CollectorReader` opens the directory lazily; only the arrays you ask for
+are read from each chunk.
+
+`ResumedDataCollector` is the mesa.DataCollector of a model restored from a
+checkpoint (see `sugarscape.checkpoint`).
+"""
+from __future__ import annotations
+import json
+from pathlib import Path
+import mesa
+import numpy as np
+import pandas as pd
+
+class StreamingCollector:
+    def __init__(self, path, model_reporters=None, agent_reporters=None,
+                 flush_every=100, intervals=None, agent_type=None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.model_reporters = dict(model_reporters or {})
+        self.agent_reporters = dict(agent_reporters or {})
+        self.flush_every = flush_every
+        self.intervals = dict(intervals or {})  # {reporter: collect every N steps}
+        self.agent_type = agent_type
+        self._chunk = None   # set by `resume`, or by the first flush of a fresh run
+        self._pending = 0
+        self._reset_buffers()
+        (self.path / "meta.json").write_text(json.dumps({
+            "model_reporters": list(self.model_reporters),
+            "agent_reporters": list(self.agent_reporters),
+            "intervals": self.intervals,
+        }))
+
+    def _reset_buffers(self):
+        self._model = {k: ([], []) for k in self.model_reporters}
+        self._agent = {k: ([], [], [0], []) for k in self.agent_reporters}
+
+    def _due(self, name, step):
+        return step % self.intervals.get(name, 1) == 0
+
+    def _agents(self, model):
+        by_type = model.schedule.agents_by_type
+        if self.agent_type is not None:
+            return list(by_type.get(self.agent_type, {}).values())
+        return [a for d in by_type.values() for a in d.values()]
+
+    def collect(self, model):
+        step = model.schedule.steps
+        for name, fn in self.model_reporters.items():
+            if self._due(name, step):
+                steps, values = self._model[name]
+                steps.append(step); values.append(fn(model))
+        agents = None
+        for name, fn in self.agent_reporters.items():
+            if not self._due(name, step):
+                continue
+            if agents is None:
+                agents = self._agents(model)
+            steps, ids, offsets, values = self._agent[name]
+            for a in agents:
+                v = fn(a)
+                if v is None:
+                    continue
+                steps.append(step); ids.append(a.unique_id)
+                if isinstance(v, (list, tuple, np.ndarray)):
+                    values.extend(v)
+                else:
+                    values.append(v)
+                offsets.append(len(values))
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Append buffered collections as a new chunk file."""
+        if self._chunk is None:
+            # a fresh run replaces the chunks an earlier run left here
+            for f in self.path.glob("chunk-*.npz"):
+                f.unlink()
+            self._chunk = 0
+        if not self._pending:
+            return
+        arrays = {}
+        for name, (steps, values) in self._model.items():
+            arrays[f"model.{name}.step"] = np.asarray(steps, dtype=np.int64)
+            arrays[f"model.{name}.value"] = np.asarray(values, dtype=float)
+        for name, (steps, ids, offsets, values) in self._agent.items():
+            arrays[f"agent.{name}.step"] = np.asarray(steps, dtype=np.int64)
+            arrays[f"agent.{name}.agent"] = np.asarray(ids)
+            arrays[f"agent.{name}.offsets"] = np.asarray(offsets, dtype=np.int64)
+            arrays[f"agent.{name}.values"] = np.asarray(values)
+        out = self.path / f"chunk-{self._chunk:06d}.npz"
+        tmp = out.with_name(out.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            np.savez(fh, **arrays)
+        tmp.replace(out)
+        self._chunk += 1
+        self._pending = 0
+        self._reset_buffers()
+
+    @property
+    def chunks(self) -> int:
+        """Chunk files written so far."""
+        return self._chunk or 0
+
+    def resume(self, chunks):
+        """Continue a checkpointed run: keep its first `chunks` chunk files,
+        drop any written after the checkpoint, and number on from there."""
+        for f in sorted(self.path.glob("chunk-*.npz"))[chunks:]:
+            f.unlink()
+        self._chunk = chunks
+
+    # mesa.DataCollector compatibility (flushes the buffer, then reads back)
+    def get_model_vars_dataframe(self):
+        self.flush()
+        return CollectorReader(self.path).model_vars()
+
+    def get_agent_vars_dataframe(self, name=None):
+        self.flush()
+        name = name or next(iter(self.agent_reporters))
+        return CollectorReader(self.path).agent_vars(name)
+
+class ResumedDataCollector(mesa.DataCollector):
+    """mesa.DataCollector that continues a checkpointed run: `earlier` holds
+    the agent records collected before the checkpoint and goes in front of
+    the new ones."""
+    def __init__(self, earlier, **kwargs):
+        super().__init__(**kwargs)
+        self.earlier = earlier
+
+    def get_agent_vars_dataframe(self):
+        df = super().get_agent_vars_dataframe()
+        return df if self.earlier is None else pd.concat([self.earlier, df])
+
+class CollectorReader:
+    """Lazy reader for a StreamingCollector directory."""
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        self.chunks = sorted(self.path.glob("chunk-*.npz"))
+
+    def iter_chunks(self):
+        for f in self.chunks:
+            with np.load(f, allow_pickle=False) as z:
+                yield z
+
+    def model_series(self, name) -> pd.Series:
+        steps, values = [], []
+        for z in self.iter_chunks():
+            steps.append(z[f"model.{name}.step"]); values.append(z[f"model.{name}.value"])
+        if not steps:
+            return pd.Series(dtype=float, name=name)
+        return pd.Series(np.concatenate(values), index=pd.Index(np.concatenate(steps), name="Step"),
+                         name=name)
+
+    def model_vars(self, names=None) -> pd.DataFrame:
+        names = names or self.meta["model_reporters"]
+        return pd.concat([self.model_series(n) for n in names], axis=1)
+
+    def iter_agent_records(self, name, steps=None):
+        """Yield (step, agent_id, values array) without loading every chunk at once.
+
+        `steps` optionally restricts to a (start, stop) step range.
+        """
+        for z in self.iter_chunks():
+            st = z[f"agent.{name}.step"]
+            if steps is not None:
+                lo, hi = steps
+                if st.size == 0 or st[-1] < lo or st[0] >= hi:
+                    continue
+            ids = z[f"agent.{name}.agent"]
+            off = z[f"agent.{name}.offsets"]
+            vals = z[f"agent.{name}.values"]
+            for i in range(st.size):
+                if steps is None or steps[0] <= st[i] < steps[1]:
+                    yield int(st[i]), ids[i].item(), vals[off[i]:off[i + 1]]
+
+    def agent_vars(self, name, steps=None) -> pd.DataFrame:
+        rows = [(s, a, v.tolist()) for s, a, v in self.iter_agent_records(name, steps)]
+        df = pd.DataFrame(rows, columns=["Step", "AgentID", name])
+        return df.set_index(["Step", "AgentID"])
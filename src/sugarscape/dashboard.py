@@ -0,0 +1,66 @@
+# src/sugarscape/dashboard.py -- run with: solara run src/sugarscape/dashboard.py
+"""Live dashboard: the model steps in a background process, the page only draws.
+
+A `SimulationWorker` produces snapshots; a page thread waits for the newest
+one and hands it to the page, which draws it when it gets to it. Slow
+drawing skips frames, never slows the simulation, and the controls stay
+responsive because nothing on the page calls `model.step()`.
+"""
+from collections import deque
+import solara
+from matplotlib.figure import Figure
+from sugarscape.live import HISTORY, SimulationWorker
+from sugarscape.render import draw_snapshot
+
+MODEL_KWARGS = dict(seed=42, sugar_noise_sigma=0.3, spice_noise_sigma=0.5,
+                    resource_engine="array")
+PLOTS = ("Trader", "Volume", "Price")
+FRAME_INTERVAL = 0.2  # seconds between page updates, at most
+
+@solara.component
+def Page():
+    worker = solara.use_memo(lambda: SimulationWorker(MODEL_KWARGS, mode="process"), [])
+    history = solara.use_memo(lambda: {n: (deque(maxlen=HISTORY), deque(maxlen=HISTORY))
+                                       for n in PLOTS}, [])
+    frame, set_frame = solara.use_state(None)   # (snapshot, {name: (steps, values)})
+    running, set_running = solara.use_state(True)
+    solara.use_effect(lambda: worker.close, [])
+
+    def poll(cancel):
+        while not cancel.is_set():
+            s = worker.latest(timeout=0.25)
+            if s is None:
+                continue
+            for step, values in s.pop("series"):
+                for name, (xs, ys) in history.items():
+                    xs.append(step); ys.append(values[name])
+            # copies, so drawing never iterates a deque this thread is appending to
+            set_frame((s, {n: (list(xs), list(ys)) for n, (xs, ys) in history.items()}))
+            cancel.wait(FRAME_INTERVAL)
+    solara.use_thread(poll, dependencies=[])
+
+    def toggle():
+        worker.pause() if running else worker.resume()
+        set_running(not running)
+
+    with solara.Column():
+        with solara.Row():
+            solara.Button("Pause" if running else "Play", on_click=toggle)
+            if frame is not None:
+                snap = frame[0]
+                solara.Text(f"step {snap['step']} | {snap['trader_x'].size} traders | "
+                            f"{worker.skipped} frames skipped")
+        if frame is None:
+            solara.Text("starting simulation...")
+            return
+        snap, series = frame
+        with solara.Row():
+            fig = Figure(figsize=(6, 6))
+            draw_snapshot(fig.add_subplot(), snap)
+            solara.FigureMatplotlib(fig, format="png", bbox_inches="tight")
+            plots = Figure(figsize=(5, 6))
+            for i, name in enumerate(PLOTS):
+                ax = plots.add_subplot(len(PLOTS), 1, i + 1)
+                ax.plot(*series[name], lw=1)
+                ax.set_ylabel(name)
+            solara.FigureMatplotlib(plots, format="png", bbox_inches="tight")
@@ -0,0 +1,54 @@
+from __future__ import annotations
+import numpy as np
+
+class DeathEvents:
+    """Ring buffer of recent deaths (step, x, y) for the viz (``model.deaths``).
+
+    Events are appended in step order, so the ones older than `ttl` steps
+    are always the oldest; `expire` drops them with one comparison over the
+    live slice. When `capacity` events are live the oldest is overwritten,
+    which keeps memory bounded however many traders die.
+    """
+    FIELDS = ("step", "x", "y")
+
+    def __init__(self, ttl=8, capacity=4096):
+        self.ttl = ttl
+        self.step = np.zeros(capacity, dtype=np.int64)
+        self.x = np.zeros(capacity, dtype=np.int64)
+        self.y = np.zeros(capacity, dtype=np.int64)
+        self.start = 0   # ring index of the oldest live event
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def _live(self, col):
+        i = (self.start + np.arange(self.n)) % col.size
+        return col[i]
+
+    def add(self, step, pos):
+        cap = self.step.size
+        i = (self.start + self.n) % cap
+        self.step[i] = step; self.x[i] = pos[0]; self.y[i] = pos[1]
+        if self.n == cap:
+            self.start = (self.start + 1) % cap
+        else:
+            self.n += 1
+
+    def expire(self, step):
+        """Drop events at least `ttl` steps older than `step`."""
+        old = np.count_nonzero(self._live(self.step) <= step - self.ttl)
+        self.start = (self.start + old) % self.step.size
+        self.n -= old
+
+    def positions(self) -> tuple[np.ndarray, np.ndarray]:
+        """(x, y) of live events, oldest first (copies)."""
+        return self._live(self.x), self._live(self.y)
+
+    def events(self) -> dict:
+        return {f: self._live(getattr(self, f)) for f in self.FIELDS}
+
+    def restore(self, events):
+        self.start, self.n = 0, 0
+        for s, x, y in zip(*(np.asarray(events[f]).tolist() for f in self.FIELDS)):
+            self.add(s, (x, y))
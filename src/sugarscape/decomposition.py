@@ -0,0 +1,241 @@
+"""Strip decomposition of the torus for multi-core stepping.
+
+With ``step_engine="parallel"`` the grid is cut into an even number of
+vertical strips, each at least ``2 * halo + 1`` columns wide, where the halo
+is ``vision_max``. Every trader a strip's traders can see, move to or trade
+with lies in the strip plus `halo` columns on either side, and those windows
+never overlap for two strips of the same parity. Movement and each trading
+pass therefore run in two phases -- all even strips concurrently, then all
+odd strips -- on copies of each window, and the results are applied back in
+strip order.
+
+The strips run on a thread pool: the `kernels` are compiled by numba with
+the GIL released, so threads share the windows without pickling them to
+other processes. Uncompiled, the kernels are plain Python loops that gain
+nothing from threads, which is why the model needs numba for this engine.
+
+Within a strip, traders act in a random order drawn from a generator seeded
+by (seed, step, phase, strip), so a run depends only on the seed, never on
+the number of workers. A trader that moves into an odd strip during the
+even phase is not moved again. Regrowth, metabolism and deaths are already
+whole-array operations and stay in the main process.
+"""
+from __future__ import annotations
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from . import kernels
+from .spatial import stencil_table
+
+MAX_ROUNDS = 64
+MIN_GAIN = 1e-12
+
+def _move_task(p):
+    dx, dy, starts = stencil_table(p["halo"], p["moore"])
+    stats = np.zeros(len(kernels.STATS), dtype=np.int64)
+    kernels.move_harvest(p["order"], p["tx"], p["ty"], p["su"], p["sp"], p["msu"], p["msp"],
+                         p["vis"], p["sugar"], p["spice"], p["count"], dx, dy, starts, p["moore"],
+                         p["x_off"], p["width"], p["rand"],
+                         np.empty(dx.size), np.empty(dx.size, dtype=np.int64),
+                         np.empty(dx.size, dtype=np.int64), stats)
+    return p["tx"], p["ty"], p["su"], p["sp"], stats
+
+def _trade_task(p):
+    dx, dy, starts = stencil_table(p["halo"], p["moore"])
+    stats = np.zeros(len(kernels.STATS), dtype=np.int64)
+    size = max(256, 4 * dx.size)
+    calls, prices = [], []
+    start = 0
+    while start < p["order"].size:
+        ci = np.empty(size, dtype=np.int64); cj = np.empty(size, dtype=np.int64)
+        cn = np.empty(size, dtype=np.int64); pr = np.empty(size * MAX_ROUNDS)
+        start, nc, npr = kernels.trade_pass(
+            p["order"], start, p["tx"], p["ty"], p["su"], p["sp"], p["msu"], p["msp"],
+            p["vis"], p["owner"], dx, dy, starts, MAX_ROUNDS, MIN_GAIN,
+            ci, cj, cn, pr, stats)
+        calls.append((ci[:nc], cj[:nc], cn[:nc])); prices.append(pr[:npr])
+        size *= 2
+    if not calls:
+        empty = np.zeros(0, dtype=np.int64)
+        return p["su"], p["sp"], empty, empty, empty, np.zeros(0), stats
+    ci, cj, cn = (np.concatenate(c) for c in zip(*calls))
+    return p["su"], p["sp"], ci, cj, cn, np.concatenate(prices), stats
+
+class StripEngine:
+    def __init__(self, model, workers=None, seed=0):
+        self.model = model
+        self.halo = model.vision_max
+        min_width = 2 * self.halo + 1
+        n = model.width // min_width
+        n -= n % 2
+        if n < 2 or model.height < min_width:
+            raise ValueError(
+                f'step_engine="parallel" needs width >= {2 * min_width} and height >= '
+                f"{min_width} for vision_max={self.halo}")
+        self.edges = (np.arange(n + 1) * model.width) // n
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self._pool = None
+        self._trade_passes = 0
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _map(self, fn, tasks):
+        if self.workers <= 1 or len(tasks) <= 1:
+            return [fn(t) for t in tasks]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        return list(self._pool.map(fn, tasks))
+
+    def _rng(self, phase, strip):
+        return np.random.default_rng([self.seed, self.model.schedule.steps, phase, strip])
+
+    def _move_order(self, strip, own):
+        """Acting order of a strip's traders for movement, and one uniform
+        per trader for tie-breaks."""
+        rng = self._rng(0, strip)
+        order = rng.permutation(own)
+        return order, rng.random(order.size)
+
+    def _trade_order(self, strip, own):
+        return self._rng(self._trade_passes, strip).permutation(own)
+
+    def _windows(self, parity, busy=None):
+        """Yield (strip, x_off, columns, region rows, local owned) for one parity."""
+        m, cols, h = self.model, self.model.traders, self.halo
+        n = cols.n
+        x = cols.x[:n]
+        for s in range(parity, len(self.edges) - 1, 2):
+            x0, x1 = int(self.edges[s]), int(self.edges[s + 1])
+            off = x0 - h
+            span = x1 - x0 + 2 * h
+            lx = (x - off) % m.width
+            rows = np.flatnonzero(lx < span)
+            own = (lx[rows] >= h) & (lx[rows] < h + x1 - x0)
+            if busy is not None:
+                own &= ~busy[rows]
+            yield s, off, np.arange(off, off + span) % m.width, rows, np.flatnonzero(own)
+
+    def _task(self, rows, off, order, halo):
+        cols, m = self.model.traders, self.model
+        return {"order": order, "tx": (cols.x[rows] - off) % m.width, "ty": cols.y[rows],
+                "su": cols.sugar[rows], "sp": cols.spice[rows],
+                "msu": cols.metabolism_sugar[rows], "msp": cols.metabolism_spice[rows],
+                "vis": cols.vision[rows], "moore": bool(m.moore_movement), "halo": halo}
+
+    def _count(self, stats):
+        inst = self.model.instruments
+        if inst is not None:
+            for name, v in zip(kernels.STATS, stats.tolist()):
+                inst.count(name, v)
+
+    def move_and_harvest(self):
+        m, cols = self.model, self.model.traders
+        if cols.n and cols.vision[:cols.n].max() > self.halo:
+            raise ValueError("trader vision exceeds vision_max, the strip halo")
+        for t in cols.agents:
+            t.prices = []
+            t.trade_partners = []
+        self._trade_passes = 0
+        moved = np.zeros(cols.n, dtype=bool)
+        for parity in (0, 1):
+            tasks, meta = [], []
+            for s, off, columns, rows, own in self._windows(parity, moved):
+                order, rand = self._move_order(s, own)
+                p = self._task(rows, off, order, self.halo)
+                p.update(sugar=m.sugar_amount[:, columns], spice=m.spice_amount[:, columns],
+                         count=m.occupancy.count[:, columns], x_off=off, width=m.width,
+                         rand=rand)
+                tasks.append(p); meta.append((off, rows, order))
+            for (off, rows, order), (tx, ty, su, sp, stats) in zip(meta, self._map(_move_task, tasks)):
+                done = rows[order]
+                nx = (tx[order] + off) % m.width
+                ny = ty[order]
+                cols.sugar[done] = su[order]
+                cols.spice[done] = sp[order]
+                m.sugar_amount[ny, nx] = 0
+                m.spice_amount[ny, nx] = 0
+                for r, x, y in zip(done.tolist(), nx.tolist(), ny.tolist()):
+                    t = cols.agents[r]
+                    if t.pos != (x, y):
+                        m.move_trader(t, (x, y))
+                moved[done] = True
+                self._count(stats)
+
+    def trade_pass(self):
+        m, cols = self.model, self.model.traders
+        self._trade_passes += 1
+        for parity in (0, 1):
+            tasks, meta = [], []
+            for s, off, columns, rows, own in self._windows(parity):
+                order = self._trade_order(s, own)
+                p = self._task(rows, off, order, self.halo)
+                # first trader per cell, as a local trader number
+                ids = m.occupancy.ids[:, columns]
+                owner = np.full(ids.shape, -1, dtype=np.int64)
+                if rows.size:
+                    uids = cols.uid[rows]
+                    by_uid = np.argsort(uids)
+                    hit = ids >= 0
+                    owner[hit] = by_uid[np.searchsorted(uids, ids[hit], sorter=by_uid)]
+                p["owner"] = owner
+                tasks.append(p); meta.append(rows)
+            for rows, (su, sp, ci, cj, cn, prices, stats) in zip(meta, self._map(_trade_task, tasks)):
+                cols.sugar[rows] = su
+                cols.spice[rows] = sp
+                start = 0
+                for i, j, k in zip(ci.tolist(), cj.tolist(), cn.tolist()):
+                    a, b = cols.agents[rows[i]], cols.agents[rows[j]]
+                    ps = prices[start:start + k].tolist()
+                    start += k
+                    a.prices.extend(ps)
+                    a.trade_partners.extend([b.unique_id] * k)
+                    m.record_trade(a, b, ps)
+                self._count(stats)
+
+class TorusEngine(StripEngine):
+    """``step_engine="jit"``: the strip kernels run once over the whole torus.
+
+    One window covers the grid, so nothing needs a halo copy, and traders
+    act in the serial engine's order: ``model._randomize_traders()``, a
+    shuffle with ``model.random``. Movement ties are broken by one
+    ``model.random.random()`` per trader, drawn up front, because the
+    compiled kernel cannot call `random.shuffle` the way `Trader.move`
+    does; that is why runs match the serial engine statistically rather
+    than bit for bit. Needs numba compiling `kernels`.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.halo = model.vision_max
+        if min(model.width, model.height) < 2 * self.halo + 1:
+            raise ValueError(f'step_engine="jit" needs width and height >= {2 * self.halo + 1} '
+                             f"for vision_max={self.halo}")
+        self.edges = np.array([0, model.width])
+        self.workers = 1
+        self.seed = None   # the order comes from model.random
+        self._pool = None
+        self._trade_passes = 0
+
+    def _shuffled_rows(self):
+        return np.fromiter((t._row for t in self.model._randomize_traders()), dtype=np.int64,
+                           count=self.model.traders.n)
+
+    def _move_order(self, strip, own):
+        # one window, visited once: `own` is every row
+        order = self._shuffled_rows()
+        rand = self.model.random.random
+        return order, np.fromiter((rand() for _ in range(order.size)), dtype=float,
+                                  count=order.size)
+
+    def _trade_order(self, strip, own):
+        return self._shuffled_rows()
+
+    def _windows(self, parity, busy=None):
+        if parity:
+            return
+        n = self.model.traders.n
+        own = np.ones(n, dtype=bool) if busy is None else ~busy[:n]
+        yield 0, 0, np.arange(self.model.width), np.arange(n), np.flatnonzero(own)
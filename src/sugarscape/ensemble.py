@@ -0,0 +1,220 @@
+"""Online ensemble statistics across runs, per step.
+
+    python -m sugarscape.ensemble data/sweep          # summarize a finished sweep
+    python -m sugarscape.sweep ... --summary          # or summarize while it runs
+
+`EnsembleStats` takes the model-reporter table of one run at a time (a
+DataFrame indexed by step, as from ``datacollector.get_model_vars_dataframe()``
+or a sweep's ``run-NNNNN.csv``) and folds it into per-step running
+statistics, so no run is kept after it has been added:
+
+* count, mean and variance with Welford's update
+* quantiles with the P-square estimator (Jain & Chlamtac, 1985): five
+  markers per step and quantile, exact while fewer than five runs reached
+  that step
+
+Every update is vectorized over the step axis. NaN values (e.g. ``Price`` on
+a step without trades) are skipped, so counts can differ per step and
+reporter; runs of different lengths are fine.
+"""
+from __future__ import annotations
+import argparse
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+class _P2:
+    """P-square estimate of quantile `p`, for every step at once."""
+    def __init__(self, p, size):
+        self.p = p
+        self.dn = np.array([0.0, p / 2, p, (1 + p) / 2, 1.0])
+        self.q, self.n, self.want = self._blank(size)
+
+    def _blank(self, size):
+        p = self.p
+        return (np.zeros((size, 5)), np.tile(np.arange(5.0), (size, 1)),
+                np.tile(np.array([0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]), (size, 1)))
+
+    def grow(self, size):
+        extra = self._blank(size - self.q.shape[0])
+        self.q, self.n, self.want = (np.vstack([a, b]) for a, b in
+                                     zip((self.q, self.n, self.want), extra))
+
+    def add(self, rows, x, seen):
+        """Observe x[i] at step rows[i]; `seen` is the per-row count before it."""
+        init = seen < 5
+        r, c = rows[init], seen[init]
+        self.q[r, c] = x[init]
+        full = r[c == 4]
+        self.q[full] = np.sort(self.q[full], axis=1)
+
+        r, x = rows[~init], x[~init]
+        if r.size == 0:
+            return
+        q, n, want = self.q[r], self.n[r], self.want[r]
+        q[:, 0] = np.minimum(q[:, 0], x)
+        q[:, 4] = np.maximum(q[:, 4], x)
+        k = np.clip((q[:, 1:4] <= x[:, None]).sum(axis=1), 0, 3)
+        n += np.arange(5) > k[:, None]
+        want += self.dn
+        for i in (1, 2, 3):
+            d = want[:, i] - n[:, i]
+            move = ((d >= 1) & (n[:, i + 1] - n[:, i] > 1)) | ((d <= -1) & (n[:, i - 1] - n[:, i] < -1))
+            if not move.any():
+                continue
+            s = np.sign(d[move])
+            qm, qi, qp = q[move, i - 1], q[move, i], q[move, i + 1]
+            nm, ni, np_ = n[move, i - 1], n[move, i], n[move, i + 1]
+            par = qi + s / (np_ - nm) * ((ni - nm + s) * (qp - qi) / (np_ - ni)
+                                         + (np_ - ni - s) * (qi - qm) / (ni - nm))
+            ok = (qm < par) & (par < qp)
+            lin = qi + s * (np.where(s > 0, qp, qm) - qi) / (np.where(s > 0, np_, nm) - ni)
+            q[move, i] = np.where(ok, par, lin)
+            n[move, i] += s
+        self.q[r], self.n[r], self.want[r] = q, n, want
+
+    def value(self, count):
+        out = self.q[:count.size, 2].copy()
+        for r in np.flatnonzero(count < 5):
+            c = int(count[r])
+            out[r] = np.quantile(self.q[r, :c], self.p) if c else np.nan
+        return out
+
+class EnsembleStats:
+    def __init__(self, names=None, quantiles=(0.1, 0.5, 0.9)):
+        self.names = list(names) if names is not None else None
+        self.quantiles = tuple(quantiles)
+        self.runs = 0
+        self.size = 0   # steps 0..size-1 have been seen
+        self._cap = 0
+        self._stats = {}
+
+    def _ensure(self, size):
+        self.size = max(self.size, size)
+        if size <= self._cap:
+            return
+        cap = max(size, 2 * self._cap)
+        for st in self._stats.values():
+            extra = cap - st["count"].size
+            for k in ("count", "mean", "m2"):
+                st[k] = np.concatenate([st[k], np.zeros(extra)])
+            for est in st["p2"]:
+                est.grow(cap)
+        self._cap = cap
+
+    def add(self, frame: pd.DataFrame):
+        """Fold in one run's model reporters (index: step)."""
+        if self.names is None:
+            self.names = [c for c in frame.columns if pd.api.types.is_numeric_dtype(frame[c])]
+        steps = np.asarray(frame.index, dtype=np.int64)
+        self._ensure(int(steps.max()) + 1 if steps.size else 0)
+        for name in self.names:
+            st = self._stats.get(name)
+            if st is None:
+                st = self._stats[name] = {
+                    "count": np.zeros(self._cap), "mean": np.zeros(self._cap),
+                    "m2": np.zeros(self._cap),
+                    "p2": [_P2(p, self._cap) for p in self.quantiles]}
+            x = frame[name].to_numpy(dtype=float)
+            ok = np.isfinite(x)
+            rows, x = steps[ok], x[ok]
+            seen = st["count"][rows].astype(np.int64)
+            for est in st["p2"]:
+                est.add(rows, x, seen)
+            c = seen + 1.0
+            delta = x - st["mean"][rows]
+            mean = st["mean"][rows] + delta / c
+            st["m2"][rows] += delta * (x - mean)
+            st["mean"][rows] = mean
+            st["count"][rows] = c
+        self.runs += 1
+
+    def add_model(self, model):
+        self.add(model.datacollector.get_model_vars_dataframe())
+
+    def summary(self) -> dict:
+        """{name: {"count", "mean", "var", "q<p>"...}} arrays over steps 0..size-1.
+
+        `var` is the sample variance (NaN where fewer than two runs).
+        """
+        out = {}
+        k = self.size
+        for name, st in self._stats.items():
+            c = st["count"][:k]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rec = {"count": c.astype(np.int64),
+                       "mean": np.where(c > 0, st["mean"][:k], np.nan),
+                       "var": np.where(c > 1, st["m2"][:k] / (c - 1), np.nan)}
+            for p, est in zip(self.quantiles, st["p2"]):
+                rec[f"q{p:g}"] = est.value(c)[:k]
+            out[name] = rec
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        """Steps reached by at least one run; columns (reporter, statistic)."""
+        summ = self.summary()
+        cols = {(n, k): v for n, rec in summ.items() for k, v in rec.items()}
+        df = pd.DataFrame(cols, index=pd.RangeIndex(self.size, name="Step"))
+        seen = np.zeros(self.size, dtype=bool)
+        for rec in summ.values():
+            seen |= rec["count"] > 0
+        return df[seen]
+
+    def save(self, path, **meta):
+        """Write the summary as one compressed ``.npz`` (``<name>.<statistic>`` arrays)."""
+        arrays = {f"{n}.{k}": v for n, rec in self.summary().items() for k, v in rec.items()}
+        info = {"runs": self.runs, "names": self.names, "quantiles": self.quantiles, **meta}
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            np.savez_compressed(fh, meta=np.frombuffer(json.dumps(info).encode(), dtype=np.uint8),
+                                **arrays)
+        tmp.replace(path)
+
+def load_summary(path) -> tuple[dict, pd.DataFrame]:
+    """Read a file written by `EnsembleStats.save`: (meta, frame like `to_frame`)."""
+    with np.load(path) as z:
+        meta = json.loads(z["meta"].tobytes().decode())
+        cols = {tuple(k.split(".", 1)): z[k] for k in z.files if k != "meta"}
+    df = pd.DataFrame(cols)
+    df.index.name = "Step"
+    seen = np.zeros(len(df), dtype=bool)
+    for n in meta["names"]:
+        if (n, "count") in df:
+            seen |= df[(n, "count")].to_numpy() > 0
+    return meta, df[seen]
+
+def summarize_sweep(out_dir, quantiles=(0.1, 0.5, 0.9)) -> list[Path]:
+    """Summarize a finished sweep: ``summary-PPPPP.npz`` per parameter point.
+
+    Points are numbered in run order, as `sweep.run_sweep(summary=True)` does.
+    """
+    out_dir = Path(out_dir)
+    recs = [json.loads(line) for line in (out_dir / "manifest.jsonl").read_text().splitlines()]
+    points = {}
+    for rec in sorted(recs, key=lambda r: r["run"]):
+        points.setdefault(json.dumps(rec["params"], sort_keys=True), []).append(rec)
+    paths = []
+    for i, runs in enumerate(points.values()):
+        stats = EnsembleStats(quantiles=quantiles)
+        for rec in runs:
+            stats.add(pd.read_csv(out_dir / rec["file"], index_col=0))
+        path = out_dir / f"summary-{i:05d}.npz"
+        stats.save(path, params=runs[0]["params"], seeds=[r["seed"] for r in runs])
+        paths.append(path)
+    return paths
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Per-step ensemble statistics of a sweep")
+    p.add_argument("sweep_dir", type=Path)
+    p.add_argument("--quantiles", type=float, nargs="+", default=[0.1, 0.5, 0.9])
+    return p.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = summarize_sweep(args.sweep_dir, quantiles=args.quantiles)
+    print(f"Wrote {len(paths)} summaries to {args.sweep_dir}/")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Headless frame / video export.
+
+    python -m sugarscape.export --steps 500 --every 5 --out data/frames
+    python -m sugarscape.export --steps 500 --out data/run.mp4 --fps 20
+    python -m sugarscape.export --param sugar_noise_sigma=0,0.5 --out data/frames
+
+The simulation steps in this process; every `every`-th step its
+`snapshot()` is handed to a pool of worker processes that draw it with the
+Agg backend (no display needed). A directory `out` receives
+``frame-NNNNNN.png`` files; a file name with a video/gif suffix is encoded
+with matplotlib's writers (ffmpeg for video, Pillow for ``.gif``).
+
+``--param`` values combine as in `sugarscape.sweep`: every combination is
+rendered, to ``out/run-NNN`` (or ``<stem>-NNN<suffix>`` for a video) when
+there is more than one.
+"""
+from __future__ import annotations
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from .sweep import parse_param, expand_grid
+
+VIDEO_SUFFIXES = (".mp4", ".mkv", ".mov", ".avi", ".webm", ".gif")
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+def render_frame(snap, path=None, welfare_cap=100.0, size=(6, 6), dpi=100):
+    """Draw one snapshot; save it to `path`, or return it as an RGBA uint8 array."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from .render import draw_snapshot
+    fig = Figure(figsize=size, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes((0, 0, 1, 1))
+    draw_snapshot(ax, snap, welfare_cap=welfare_cap)
+    ax.set_axis_off()
+    ax.text(0.01, 0.99, f"step {snap['step']}", transform=ax.transAxes, va="top",
+            color="white", fontsize=9)
+    if path is not None:
+        fig.savefig(path)
+        return path
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+def _video_writer(path, fps):
+    from matplotlib import animation
+    if Path(path).suffix.lower() == ".gif":
+        return animation.PillowWriter(fps=fps)
+    if not animation.writers.is_available("ffmpeg"):
+        raise RuntimeError(f"writing {path} needs ffmpeg on PATH (or use a .gif / PNG directory)")
+    return animation.FFMpegWriter(fps=fps)
+
+def _write_frames(frames, path, fps, size, dpi):
+    """Encode RGBA arrays, in order, through a matplotlib writer."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=size, dpi=dpi)
+    FigureCanvasAgg(fig)
+    writer = _video_writer(path, fps)
+    image = None
+    with writer.saving(fig, str(path), dpi):
+        for rgba in frames:
+            if image is None:
+                image = fig.figimage(rgba)
+            else:
+                image.set_data(rgba)
+            writer.grab_frame()
+
+def export_run(model, steps, out, every=1, workers=None, fps=15, size=(6, 6), dpi=100) -> int:
+    """Step `model` `steps` times, rendering step 0 and every `every`-th step.
+
+    At most ``2 * workers`` frames are in flight, so memory stays bounded on
+    long runs. Returns the number of frames written.
+    """
+    out = Path(out)
+    video = out.suffix.lower() in VIDEO_SUFFIXES
+    if not video:
+        out.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    cap = getattr(model, "viz_welfare_cap", 100.0)
+
+    def snapshots():
+        yield model.snapshot()
+        for i in range(1, steps + 1):
+            model.step()
+            if i % every == 0:
+                yield model.snapshot()
+
+    def rendered(pool):
+        pending = deque()
+        for n, snap in enumerate(snapshots()):
+            path = None if video else out / f"frame-{n:06d}.png"
+            pending.append(pool.submit(render_frame, snap, path, cap, size, dpi))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        if video:
+            count = 0
+            def counted(frames):
+                nonlocal count
+                for f in frames:
+                    count += 1
+                    yield f
+            _write_frames(counted(rendered(pool)), out, fps, size, dpi)
+            return count
+        return sum(1 for _ in rendered(pool))
+
+def run_out(out, i, n):
+    """Output path of combination `i` of `n`."""
+    out = Path(out)
+    if n == 1:
+        return out
+    if out.suffix.lower() in VIDEO_SUFFIXES:
+        return out.with_name(f"{out.stem}-{i:03d}{out.suffix}")
+    return out / f"run-{i:03d}"
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Render a Sugarscape run without a display")
+    p.add_argument("--steps", type=int, default=200)
+    p.add_argument("--every", type=int, default=1, help="render every Nth step")
+    p.add_argument("--out", type=Path, default=Path("data/frames"),
+                   help="PNG directory, or a video/.gif file name")
+    p.add_argument("--workers", type=int, default=os.cpu_count())
+    p.add_argument("--fps", type=int, default=15)
+    p.add_argument("--dpi", type=int, default=100)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--param", type=parse_param, action="append", default=[],
+                   help="constructor kwarg and values, e.g. initial_population=200,400")
+    p.add_argument("--resource-engine", default="array")
+    return p.parse_args(argv)
+
+def main(argv=None):
+    from .model import SugarscapeG1mt
+    args = parse_args(argv)
+    grid = {}
+    for name, values in args.param:
+        grid.setdefault(name, []).extend(values)
+    points = expand_grid(grid)
+    for i, kwargs in enumerate(points):
+        out = run_out(args.out, i, len(points))
+        model = SugarscapeG1mt(seed=args.seed, **{"resource_engine": args.resource_engine, **kwargs})
+        n = export_run(model, args.steps, out, every=args.every, workers=args.workers,
+                       fps=args.fps, dpi=args.dpi)
+        print(f"Rendered {n} frames to {out}" + (f" ({kwargs})" if kwargs else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+class Instruments:
+    """Per-step phase timings and hot-path counters (``model.instruments``).
+
+    Counters are reset at the start of every step. `current` is the record
+    being filled in; `last` is the finished record of the previous step and
+    `totals` sums every counter and timing since construction. Keys:
+
+    * ``step`` -- the step number the record belongs to
+    * ``cells_scanned`` -- neighborhood cells visited by move and trade
+    * ``trades`` / ``trade_rounds`` -- trade() calls and exchanges executed
+    * ``reject_<reason>`` -- maybe_sell_resource refusals: ``price`` (no
+      valid exchange amount), ``negative`` (would overdraw a side),
+      ``welfare`` (no mutual gain), ``mrs`` (MRS would cross over)
+    * ``removed`` -- traders that died
+    * ``time_<phase>`` -- seconds in each `SugarscapeG1mt.PHASES` entry
+    """
+    COUNTERS = ("cells_scanned", "trades", "trade_rounds",
+                "reject_price", "reject_negative", "reject_welfare", "reject_mrs",
+                "removed")
+
+    def __init__(self, phases):
+        self.phases = tuple(phases)
+        self.totals = self._blank()
+        self.last = None
+        self.current = self._blank()
+
+    def _blank(self):
+        rec = dict.fromkeys(self.COUNTERS, 0)
+        rec.update((f"time_{p}", 0.0) for p in self.phases)
+        return rec
+
+    def begin_step(self, step):
+        self.current = self._blank()
+        self.current["step"] = step
+
+    def count(self, name, n=1):
+        self.current[name] += n
+
+    def time(self, phase, seconds):
+        self.current[f"time_{phase}"] += seconds
+
+    def end_step(self):
+        rec = self.current
+        for k, v in rec.items():
+            if k != "step":
+                self.totals[k] += v
+        self.last = rec
+        return rec
+
+    def reporters(self) -> dict:
+        """Model reporters for the data collector.
+
+        Collection runs inside the step, so the ``collect`` phase's own time
+        is only in `last`/`totals`, not in the collected columns.
+        """
+        names = list(self.COUNTERS) + [f"time_{p}" for p in self.phases if p != "collect"]
+        return {n: (lambda m, n=n: m.instruments.current[n]) for n in names}
@@ -0,0 +1,186 @@
+"""Array kernels for the strip and JIT step engines (see decomposition.py).
+
+Each kernel works on one local window: resource and occupancy arrays indexed
+[y, x_local] and per-trader columns indexed by a local trader number. A
+window is either one strip plus its halo or the whole torus; x wraps at the
+window width, which never happens inside a strip window. The kernels use
+only NumPy arrays, scalars and `math`, no Python objects, and are compiled
+with numba when it is installed (`HAVE_NUMBA`).
+
+Counters written to ``stats``: 0 cells scanned, 1 trade calls, 2 trade rounds,
+3..6 rejections (price, negative, welfare, mrs) -- the `Instruments` order.
+"""
+from __future__ import annotations
+import math
+try:
+    import numba
+except ImportError:  # optional; the kernels then run as plain Python
+    numba = None
+
+HAVE_NUMBA = numba is not None
+
+def _jit(fn):
+    return numba.njit(cache=True, nogil=True)(fn) if HAVE_NUMBA else fn
+
+STATS = ("cells_scanned", "trades", "trade_rounds",
+         "reject_price", "reject_negative", "reject_welfare", "reject_mrs")
+REJECT_NONE, REJECT_PRICE, REJECT_NEGATIVE, REJECT_WELFARE, REJECT_MRS = -1, 0, 1, 2, 3
+
+@_jit
+def move_harvest(order, tx, ty, su, sp, msu, msp, vis, sugar, spice, count,
+                 dx, dy, starts, moore, x_off, width, rand, wbuf, cxbuf, cybuf, stats):
+    """Move each trader in `order` to its best free cell in vision, then harvest.
+
+    Same rule as Trader.move: best Cobb-Douglas welfare (ties by
+    math.isclose), then smallest grid_dist on raw global coordinates, then a
+    uniform pick driven by ``rand[k]``. `dx`/`dy`/`starts` is a
+    `spatial.stencil_table`, so a trader with vision v visits exactly mesa's
+    neighborhood of radius v. Updates tx, ty, su, sp, sugar, spice and count
+    in place.
+    """
+    height, wx = sugar.shape
+    for k in range(order.size):
+        i = order[k]
+        x = tx[i]; y = ty[i]; v = vis[i]
+        m_total = msu[i] + msp[i]
+        n = 0
+        best = -1.0
+        for s in range(starts[v], starts[v + 1]):
+            ox = dx[s]; oy = dy[s]
+            cx = (x + ox) % wx; cy = (y + oy) % height
+            stats[0] += 1
+            if count[cy, cx] > 0 and not (ox == 0 and oy == 0): continue
+            if m_total <= 0:
+                w = 0.0
+            else:
+                w = ((max(0.0, float(su[i] + sugar[cy, cx])) ** (msu[i] / m_total))
+                     * (max(0.0, float(sp[i] + spice[cy, cx])) ** (msp[i] / m_total)))
+            wbuf[n] = w; cxbuf[n] = cx; cybuf[n] = cy
+            n += 1
+            if w > best: best = w
+        # nearest of the best (raw coordinates, like utils.grid_dist);
+        # wbuf is reused for the candidates' distances, -1 for the rest
+        gx = (x + x_off) % width
+        min_d = -1.0
+        for c in range(n):
+            w = wbuf[c]
+            if abs(w - best) <= 1e-9 * max(abs(w), abs(best)):
+                ddx = abs((cxbuf[c] + x_off) % width - gx); ddy = abs(cybuf[c] - y)
+                d = float(max(ddx, ddy) if moore else ddx + ddy)
+                wbuf[c] = d
+                if min_d < 0 or d < min_d: min_d = d
+            else:
+                wbuf[c] = -1.0
+        nf = 0
+        for c in range(n):
+            if wbuf[c] == min_d:
+                cxbuf[nf] = cxbuf[c]; cybuf[nf] = cybuf[c]
+                nf += 1
+        pick = min(int(rand[k] * nf), nf - 1)
+        nx = cxbuf[pick]; ny = cybuf[pick]
+        count[y, x] -= 1; count[ny, nx] += 1
+        tx[i] = nx; ty[i] = ny
+        su[i] += sugar[ny, nx]; sugar[ny, nx] = 0
+        sp[i] += spice[ny, nx]; spice[ny, nx] = 0
+
+@_jit
+def trade_pair(s_su, s_sp, s_msu, s_msp, n_su, n_sp, n_msu, n_msp,
+               max_rounds, min_gain, prices, p0):
+    """trading.solve_pair writing prices into ``prices[p0:]``.
+
+    Returns (s_su, s_sp, n_su, n_sp, rounds, reject reason code).
+    """
+    eps = 1e-9
+    s_mt = s_msu + s_msp
+    n_mt = n_msu + n_msp
+    s_a_su = s_msu / s_mt if s_mt > 0 else 0.0
+    s_a_sp = s_msp / s_mt if s_mt > 0 else 0.0
+    n_a_su = n_msu / n_mt if n_mt > 0 else 0.0
+    n_a_sp = n_msp / n_mt if n_mt > 0 else 0.0
+    s_msu_c = max(s_msu, eps); s_msp_c = max(s_msp, eps)
+    n_msu_c = max(n_msu, eps); n_msp_c = max(n_msp, eps)
+    k = 0
+    reason = REJECT_NONE
+    while k < max_rounds:
+        if (s_su <= 0 and s_sp <= 0) or (n_su <= 0 and n_sp <= 0): break
+        m_self = (max(s_sp, eps) / s_msp_c) / (max(s_su, eps) / s_msu_c)
+        m_nbor = (max(n_sp, eps) / n_msp_c) / (max(n_su, eps) / n_msu_c)
+        if not (math.isfinite(m_self) and math.isfinite(m_nbor)): break
+        if abs(m_self - m_nbor) <= max(1e-9 * max(abs(m_self), abs(m_nbor)), 1e-12): break
+        price = math.sqrt(m_self * m_nbor)
+        if not (math.isfinite(price) and price > 0): break
+        if price <= eps:
+            reason = REJECT_PRICE; break
+        if price >= 1:
+            su_ex = 1; sp_ex = max(1, int(round(price)))
+        else:
+            su_ex = max(1, int(round(1.0 / price))); sp_ex = 1
+        if m_self > m_nbor:
+            self_su = s_su + su_ex; self_sp = s_sp - sp_ex
+            nbor_su = n_su - su_ex; nbor_sp = n_sp + sp_ex
+        else:
+            self_su = s_su - su_ex; self_sp = s_sp + sp_ex
+            nbor_su = n_su + su_ex; nbor_sp = n_sp - sp_ex
+        if min(min(self_su, self_sp), min(nbor_su, nbor_sp)) < 0:
+            reason = REJECT_NEGATIVE; break
+        if s_mt > 0:
+            w_self = (max(0.0, float(s_su)) ** s_a_su) * (max(0.0, float(s_sp)) ** s_a_sp)
+            ws_new = (max(0.0, float(self_su)) ** s_a_su) * (max(0.0, float(self_sp)) ** s_a_sp)
+        else:
+            w_self = 0.0; ws_new = 0.0
+        if n_mt > 0:
+            w_nbor = (max(0.0, float(n_su)) ** n_a_su) * (max(0.0, float(n_sp)) ** n_a_sp)
+            wn_new = (max(0.0, float(nbor_su)) ** n_a_su) * (max(0.0, float(nbor_sp)) ** n_a_sp)
+        else:
+            w_nbor = 0.0; wn_new = 0.0
+        if (ws_new - w_self) < min_gain or (wn_new - w_nbor) < min_gain:
+            reason = REJECT_WELFARE; break
+        mrs_self_a = (self_sp / s_msp_c) / (self_su / s_msu_c)
+        mrs_nbor_a = (nbor_sp / n_msp_c) / (nbor_su / n_msu_c)
+        if m_self > m_nbor:
+            if not mrs_self_a >= mrs_nbor_a:
+                reason = REJECT_MRS; break
+        elif not (m_self < m_nbor and mrs_self_a <= mrs_nbor_a):
+            reason = REJECT_MRS; break
+        s_su += su_ex; s_sp -= sp_ex
+        n_su -= su_ex; n_sp += sp_ex
+        prices[p0 + k] = price
+        k += 1
+    return s_su, s_sp, n_su, n_sp, k, reason
+
+@_jit
+def trade_pass(order, start, tx, ty, su, sp, msu, msp, vis, owner, dx, dy, starts,
+               max_rounds, min_gain, call_i, call_j, call_n, prices, stats):
+    """Each trader in ``order[start:]`` trades with the traders in its vision.
+
+    `owner` gives the local trader number first in each cell (-1 if empty).
+    Trades that executed at least one round are appended to call_i/call_j/
+    call_n with their prices in `prices`. Stops early, before a trader, when
+    the buffers might overflow; returns (next start, calls, prices written).
+    """
+    height, wx = owner.shape
+    nc = 0; npr = 0
+    per_trader = starts[starts.size - 1] - starts[starts.size - 2]
+    for k in range(start, order.size):
+        if nc + per_trader > call_i.size or npr + per_trader * max_rounds > prices.size:
+            return k, nc, npr
+        i = order[k]
+        x = tx[i]; y = ty[i]; v = vis[i]
+        for s in range(starts[v], starts[v + 1]):
+            ox = dx[s]; oy = dy[s]
+            if ox == 0 and oy == 0: continue
+            stats[0] += 1
+            j = owner[(y + oy) % height, (x + ox) % wx]
+            if j < 0: continue
+            stats[1] += 1
+            a_su, a_sp, b_su, b_sp, r, why = trade_pair(
+                su[i], sp[i], msu[i], msp[i], su[j], sp[j], msu[j], msp[j],
+                max_rounds, min_gain, prices, npr)
+            if why >= 0:
+                stats[3 + why] += 1
+            if r > 0:
+                su[i] = a_su; sp[i] = a_sp; su[j] = b_su; sp[j] = b_sp
+                call_i[nc] = i; call_j[nc] = j; call_n[nc] = r
+                nc += 1; npr += r
+                stats[2] += r
+    return order.size, nc, npr
@@ -0,0 +1,78 @@
+from __future__ import annotations
+import hashlib
+import os
+from pathlib import Path
+import numpy as np
+from .utils import data_path
+
+def _cache_dir(cache_dir=None) -> Path | None:
+    """`cache_dir`, else $SUGARSCAPE_CACHE_DIR, else None (no caching)."""
+    path = cache_dir or os.environ.get("SUGARSCAPE_CACHE_DIR")
+    return Path(path) if path else None
+
+def load_landscape(map_path: str | Path | None = None,
+                   cache_dir: str | Path | None = None) -> np.ndarray:
+    """Load a heightmap (index [y, x]): a ``.npy`` file or sugar-map.txt style text.
+
+    ``.npy`` maps are memory-mapped read-only. Text maps are parsed on every
+    load unless a cache directory is given (`cache_dir`, or
+    $SUGARSCAPE_CACHE_DIR): then they are stored there as ``.npy``, keyed by
+    the SHA-256 of the file contents, and later loads of the same map are
+    memory-mapped. Defaults to the bundled data/sugar-map.txt, which is small
+    and never cached.
+    """
+    map_file = Path(map_path) if map_path else data_path("sugar-map.txt")
+    if not map_file.exists():
+        raise FileNotFoundError(f"sugar-map not found: {map_file}")
+    if map_file.suffix == ".npy":
+        return np.load(map_file, mmap_mode="r")
+    cache = _cache_dir(cache_dir) if map_path else None
+    if cache is None:
+        return np.genfromtxt(map_file)
+    digest = hashlib.sha256(map_file.read_bytes()).hexdigest()
+    cached = cache / f"{digest}.npy"
+    if cached.exists():
+        return np.load(cached, mmap_mode="r")
+    arr = np.genfromtxt(map_file)
+    try:
+        save_landscape(arr, cached)
+    except OSError:
+        return arr  # read-only cache location: just don't cache
+    return np.load(cached, mmap_mode="r")
+
+def save_landscape(arr: np.ndarray, path: str | Path) -> Path:
+    """Write `arr` as a float64 ``.npy`` map (atomically)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        np.save(fh, np.asarray(arr, dtype=float))
+    tmp.replace(path)
+    return path
+
+def synthetic_landscape(width: int, height: int, peaks=((0.3, 0.7), (0.7, 0.3)),
+                        levels: int = 4, radius: float = 0.5) -> np.ndarray:
+    """Terraced hills like the bundled map, at any size (index [y, x]).
+
+    `peaks` are (x, y) centres as fractions of the grid; a cell's level is
+    ``levels`` at a peak and falls by one per ``radius / levels`` of distance
+    (radius as a fraction of the shorter side), floored at 0.
+    """
+    ys, xs = np.mgrid[0:height, 0:width]
+    r = radius * min(width, height)
+    out = np.zeros((height, width))
+    for px, py in peaks:
+        d = np.hypot(xs - px * (width - 1), ys - py * (height - 1))
+        out = np.maximum(out, np.ceil(levels * (1.0 - d / r)))
+    return np.clip(out, 0, levels)
+
+def tile_landscape(base: np.ndarray, nx: int, ny: int) -> np.ndarray:
+    """Repeat `base` nx times across and ny times down."""
+    return np.tile(np.asarray(base), (ny, nx))
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m sugarscape.landscape MAP.txt OUT.npy")
+    out = save_landscape(load_landscape(sys.argv[1]), sys.argv[2])
+    print(f"Saved {out}")
@@ -0,0 +1,132 @@
+"""Run a model in the background and hand out its latest snapshot.
+
+`SimulationWorker` builds and steps a `SugarscapeG1mt` in a worker thread or
+process. Every `every` steps it puts ``model.snapshot()`` -- plus the model
+reporters of every step since the previous snapshot, under ``"series"`` --
+into a bounded queue. The simulation never waits for the reader: when the
+queue is full the oldest snapshot is dropped and its series carried over,
+keeping at most the last `HISTORY` steps.
+`latest()` drains the queue and returns only the newest snapshot, so a slow
+UI skips frames instead of falling behind (see `sugarscape.dashboard`).
+"""
+from __future__ import annotations
+import multiprocessing as mp
+import queue
+import threading
+import traceback
+
+HISTORY = 5000   # most series rows one snapshot carries
+
+def _reporters(model):
+    return {name: fn(model) for name, fn in model.datacollector.model_reporters.items()
+            if callable(fn)}
+
+def _offer(out, item):
+    """Put without blocking, evicting the oldest item (keeping its series) when full."""
+    while True:
+        try:
+            out.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                old = out.get_nowait()
+            except queue.Empty:
+                continue
+            item["series"] = (old.get("series", []) + item["series"])[-HISTORY:]
+
+def _simulate(model_kwargs, out, stop, running, every, max_steps):
+    try:
+        from .model import SugarscapeG1mt
+        model = SugarscapeG1mt(**model_kwargs)
+        series = []
+        def publish():
+            snap = model.snapshot()
+            snap["series"] = series[:]
+            series.clear()
+            _offer(out, snap)
+        publish()
+        while not stop.is_set() and (max_steps is None or model.schedule.steps < max_steps):
+            if not running.wait(0.1):
+                continue
+            model.step()
+            series.append((model.schedule.steps, _reporters(model)))
+            if model.schedule.steps % every == 0:
+                publish()
+        if series:
+            publish()
+        model.close()
+    except Exception:
+        _offer(out, {"error": traceback.format_exc(), "series": []})
+
+class SimulationWorker:
+    def __init__(self, model_kwargs=None, every=1, max_queue=4, mode="process",
+                 max_steps=None, start=True):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"unknown mode: {mode!r}")
+        self.mode = mode
+        if mode == "thread":
+            self._queue = queue.Queue(max_queue)
+            self._stop, self._running = threading.Event(), threading.Event()
+            self._worker = threading.Thread(target=_simulate, daemon=True, args=(
+                dict(model_kwargs or {}), self._queue, self._stop, self._running, every, max_steps))
+        else:
+            # spawn: forking a process that runs a web server's threads is unsafe
+            ctx = mp.get_context("spawn")
+            self._queue = ctx.Queue(max_queue)
+            self._stop, self._running = ctx.Event(), ctx.Event()
+            self._worker = ctx.Process(target=_simulate, daemon=True, args=(
+                dict(model_kwargs or {}), self._queue, self._stop, self._running, every, max_steps))
+        self.received = 0   # snapshots taken off the queue
+        self.skipped = 0    # of those, superseded before anyone saw them
+        self._worker.start()
+        if start:
+            self.resume()
+
+    @property
+    def running(self) -> bool:
+        return self._running.is_set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def latest(self, timeout=None):
+        """Newest snapshot, with the series of every snapshot skipped on the way.
+
+        Waits up to `timeout` seconds for one (forever if None); returns None
+        if nothing arrived. Raises RuntimeError if the simulation failed.
+        """
+        try:
+            items = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return None
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self.received += len(items)
+        self.skipped += len(items) - 1
+        for it in items:
+            if "error" in it:
+                raise RuntimeError(f"simulation worker failed:\n{it['error']}")
+        snap = items[-1]
+        # an evicted snapshot's rows ride on a later one, so restore step order
+        snap["series"] = sorted((p for it in items for p in it["series"]),
+                                key=lambda p: p[0])[-HISTORY:]
+        return snap
+
+    def close(self, timeout=5.0):
+        self._stop.set()
+        self._running.set()
+        self._worker.join(timeout)
+        if self.mode == "process" and self._worker.is_alive():
+            self._worker.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,180 @@
+"""Batched trade passes (``trade_matching="ordered"`` / ``"pairs"``).
+
+A trade pass is a list of calls ``a.trade(b)``: every trader, in a random
+order, with each trader in its vision. Here the whole list is built at once
+from the occupancy index, one stencil gather per (vision, moore) group, and
+resolved in bulk by `trading.solve_pairs` (see `_in_order`): each batch of
+exchanges is a matching, no trader in two of them, and the outcome is that
+of running the list one call at a time. Trade records, prices and
+instrument counts are then applied in call order.
+
+* ``ordered`` -- the calls of the per-agent loop, in its order (same trader
+  shuffle, same neighbor order), so the pass is bit-identical to
+  ``trade_matching="off"`` with either trade solver.
+* ``pairs`` -- each adjacent pair trades once per pass instead of once from
+  each side that sees the other, the pairs in a random order from
+  ``model.np_random``, initiated by a side that sees the other (a random
+  one if both do). About half the calls; only statistically comparable to
+  the loop.
+"""
+from __future__ import annotations
+import numpy as np
+from .agents import Trader
+from .trading import REJECT_REASONS, solve_pairs
+
+MAX_ROUNDS = 64
+MIN_GAIN = 1e-12
+
+def trade_calls(model, traders):
+    """(caller, callee) positions into `traders` of every call of the per-agent
+    pass over `traders`, in loop order, and the neighborhood cells scanned."""
+    n = len(traders)
+    w, h = model.width, model.height
+    pos = np.array([t.pos for t in traders], dtype=np.int64).reshape(n, 2)
+    vis = np.fromiter((t.vision for t in traders), dtype=np.int64, count=n)
+    moore = np.fromiter((t.moore for t in traders), dtype=bool, count=n)
+    uids = np.fromiter((t.unique_id for t in traders), dtype=np.int64, count=n)
+    by_uid = np.argsort(uids)
+    callers, slots, callees = [], [], []
+    scanned = 0
+    for v, mo in set(zip(vis.tolist(), moore.tolist())):
+        g = np.flatnonzero((vis == v) & (moore == mo))
+        if 2 * v + 1 > min(w, h):
+            # the stencil wraps onto itself: let `cells` drop the repeats
+            for k in g.tolist():
+                xs, ys, _ = model.neighborhoods.cells(traders[k].pos, v, mo, False)
+                ids = model.occupancy.ids[ys, xs]
+                scanned += xs.size
+                hit = np.flatnonzero(ids >= 0)
+                callers.append(np.full(hit.size, k)); slots.append(hit); callees.append(ids[hit])
+            continue
+        dx, dy, _ = model.neighborhoods.stencil(v, mo, False)
+        ids = model.occupancy.ids[(pos[g, 1, None] + dy) % h, (pos[g, 0, None] + dx) % w]
+        scanned += ids.size
+        row, col = np.nonzero(ids >= 0)
+        callers.append(g[row]); slots.append(col); callees.append(ids[row, col])
+    if not callers:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, scanned
+    caller, slot, callee = (np.concatenate(a).astype(np.int64) for a in (callers, slots, callees))
+    order = np.lexsort((slot, caller))
+    caller = caller[order]
+    callee = by_uid[np.searchsorted(uids, callee[order], sorter=by_uid)]
+    return caller, callee, scanned
+
+def _state(model, traders):
+    cols = model.traders
+    if cols is not None:
+        rows = np.fromiter((t._row for t in traders), dtype=np.int64, count=len(traders))
+        return rows, (cols.sugar[rows].copy(), cols.spice[rows].copy(),
+                      cols.metabolism_sugar[rows], cols.metabolism_spice[rows])
+    return None, tuple(np.array([getattr(t, f) for t in traders], dtype=float) for f in
+                       ("sugar", "spice", "metabolism_sugar", "metabolism_spice"))
+
+class _Calls:
+    """Results of the calls of a pass, filled in as they are resolved."""
+    def __init__(self, m):
+        self.rounds = np.zeros(m, dtype=np.int64)
+        self.reason = np.full(m, -1, dtype=np.int64)
+        self.prices = {}
+
+    def solve(self, c, a, b, su, sp, msu, msp):
+        """Solve calls `c` on the current state; returns the new (su, sp) of both sides."""
+        i, j = a[c], b[c]
+        a_su, a_sp, b_su, b_sp, ps, k, why = solve_pairs(
+            su[i], sp[i], msu[i], msp[i], su[j], sp[j], msu[j], msp[j], MAX_ROUNDS, MIN_GAIN)
+        self.rounds[c] = k
+        self.reason[c] = why
+        for q in np.flatnonzero(k).tolist():
+            self.prices[int(c[q])] = ps[q, :k[q]].tolist()
+        return a_su, a_sp, b_su, b_sp
+
+def _first_per_trader(n, a, b, c, fill):
+    """Smallest call number in `c` (ascending) per trader, `fill` where none."""
+    first = np.full(n, fill, dtype=np.int64)
+    # with repeated indices the last assignment wins: assign in reverse
+    first[a[c[::-1]]] = c[::-1]
+    other = np.full(n, fill, dtype=np.int64)
+    other[b[c[::-1]]] = c[::-1]
+    return np.minimum(first, other)
+
+def _in_order(a, b, su, sp, msu, msp, calls):
+    """Resolve the calls with the effect of running them one by one in order.
+
+    Most calls end without an exchange, and those change nothing. So the
+    pending calls are solved at once on the current state, and each is kept
+    if all earlier pending calls on both its traders were kept and exchanged
+    nothing; at most one kept call per trader exchanges. Only calls whose
+    traders changed are solved again, and only over a window at the front
+    of the queue that grows while most of it gets through.
+    """
+    n, m = su.size, a.size
+    pending = np.arange(m)
+    version = np.zeros(n, dtype=np.int64)   # bumped when a trader's state changes
+    seen = np.full((2, m), -1, dtype=np.int64)   # versions a call was solved at
+    result = np.zeros((4, m))
+    size = max(64, n)
+    while pending.size:
+        win = pending[:size]
+        c = win[(seen[0, win] != version[a[win]]) | (seen[1, win] != version[b[win]])]
+        result[:, c] = calls.solve(c, a, b, su, sp, msu, msp)
+        seen[:, c] = version[a[c]], version[b[c]]
+        # a trader blocks later calls from its first exchange or doubtful call
+        block = _first_per_trader(n, a, b, win[calls.rounds[win] > 0], m)
+        while True:
+            ok = win <= np.minimum(block[a[win]], block[b[win]])
+            more = np.minimum(block, _first_per_trader(n, a, b, win[~ok], m))
+            if np.array_equal(more, block):
+                break
+            block = more
+        kept = win[ok]
+        done = kept[calls.rounds[kept] > 0]
+        su[a[done]], sp[a[done]], su[b[done]], sp[b[done]] = result[:, done]
+        version[a[done]] += 1
+        version[b[done]] += 1
+        pending = np.concatenate([win[~ok], pending[size:]])
+        size = max(64, 2 * kept.size)
+
+def trade_pass(model, ordered=True):
+    if ordered:
+        traders = model._randomize_traders()
+    else:
+        traders = list(model.schedule.agents_by_type.get(Trader, {}).values())
+    inst = model.instruments
+    a, b, scanned = trade_calls(model, traders)
+    if not ordered and a.size:
+        # the first of each pair's calls in a random order
+        perm = model.np_random.permutation(a.size)
+        _, first = np.unique(np.minimum(a, b)[perm] * len(traders) + np.maximum(a, b)[perm],
+                             return_index=True)
+        keep = perm[np.sort(first)]
+        a, b = a[keep], b[keep]
+    if inst is not None:
+        inst.count("cells_scanned", scanned)
+        inst.count("trades", a.size)
+    if not a.size:
+        return
+    rows, (su, sp, msu, msp) = _state(model, traders)
+    old_su, old_sp = su.copy(), sp.copy()
+    calls = _Calls(a.size)
+    _in_order(a, b, su, sp, msu, msp, calls)
+
+    changed = np.flatnonzero((su != old_su) | (sp != old_sp))
+    if rows is not None:
+        model.traders.sugar[rows[changed]] = su[changed]
+        model.traders.spice[rows[changed]] = sp[changed]
+    else:
+        for k in changed.tolist():
+            t = traders[k]
+            # keep the attribute types the per-agent loop would leave
+            t.sugar = type(t.sugar)(su[k])
+            t.spice = type(t.spice)(sp[k])
+    for c in np.flatnonzero(calls.rounds).tolist():
+        x, y, ps = traders[a[c]], traders[b[c]], calls.prices[c]
+        x.prices.extend(ps)
+        x.trade_partners.extend([y.unique_id] * len(ps))
+        model.record_trade(x, y, ps)
+    if inst is not None:
+        inst.count("trade_rounds", int(calls.rounds.sum()))
+        for code, name in enumerate(REJECT_REASONS):
+            inst.count("reject_" + name, int(np.count_nonzero(calls.reason == code)))
@@ -1,15 +1,31 @@
 from __future__ import annotations
 import random
-from pathlib import Path
+import time
+import warnings
 import numpy as np
 import math
 import mesa
 from .schedulers import ByTypeScheduler
+from .spatial import OccupancyIndex, Neighborhoods, place_many
+from .landscape import load_landscape
+from .collectors import StreamingCollector
+from .instrument import Instruments
+from .network import TradeNetwork
+from .stopping import StopMonitor
+from .deaths import DeathEvents
+from .population import TraderColumns, ColumnarTrader
+from .decomposition import StripEngine, TorusEngine
+from . import kernels, matching
 from .agents import Sugar, Spice, Trader
 from .utils import data_path, trade_volume_unique, price_gmean, get_trade
+from .trading import welfare_array
 
 class DeathMarker(mesa.Agent):
-    """Short-lived marker to visualize where a Trader died."""
+    """Short-lived marker to visualize where a Trader died.
+
+    No longer created by the model (deaths are kept in ``model.deaths``);
+    kept so code that portrays or filters markers still imports.
+    """
     def __init__(self, unique_id, model, ttl=8):
         try:
             super().__init__(unique_id, model)
@@ -18,13 +34,6 @@ class DeathMarker(mesa.Agent):
             self.unique_id = unique_id
         self.ttl = ttl  # DO NOT set self.pos here; MultiGrid will set it
 
-    #def step(self):
-    #    self.ttl -= 1
-    #    if self.ttl <= 0:
-    #        self.model.grid.remove_agent(self)
-    #        self.model.schedule.remove(self)
-
-
 class SugarscapeG1mt(mesa.Model):
     def __init__(self,
                  moore_movement=True,
@@ -35,10 +44,27 @@ class SugarscapeG1mt(mesa.Model):
                  vision_min=3, vision_max=5,
                  seed=None, 
                  map_path: str | None = None,
+                 landscape: np.ndarray | None = None,
                  sugar_noise_sigma: float = 0.5,
                  spice_noise_sigma: float = 0.5,
                  integerize_maps: bool = True,
+                 resource_engine: str = "agents",
+                 movement_engine: str = "python",
+                 trader_store: str = "objects",
+                 trade_solver: str = "iterative",
+                 trade_matching: str = "off",
+                 collector_dir: str | None = None,
+                 collector_flush_every: int = 100,
+                 collector_intervals: dict | None = None,
+                 instrument: str = "off",
+                 step_engine: str = "serial",
+                 workers: int | None = None,
+                 init_engine: str = "python",
+                 trade_network: str = "off",
+                 network_window: int = 10,
                  ):
+        # constructor arguments, kept so checkpoints can rebuild the model
+        self.init_kwargs = {k: v for k, v in locals().items() if k not in ("self", "__class__")}
         # seed Mesa RNG, fallback for older Mesa
         self.np_random = np.random.default_rng(seed if seed is not None else None)
         try:
@@ -51,6 +77,48 @@ class SugarscapeG1mt(mesa.Model):
                 except Exception:
                     self.random = random.Random(seed)
 
+        if resource_engine not in ("agents", "array"):
+            raise ValueError(f"unknown resource_engine: {resource_engine!r}")
+        self.resource_engine = resource_engine
+        if movement_engine not in ("python", "vectorized"):
+            raise ValueError(f"unknown movement_engine: {movement_engine!r}")
+        if movement_engine == "vectorized" and resource_engine != "array":
+            raise ValueError('movement_engine="vectorized" needs resource_engine="array"')
+        self.movement_engine = movement_engine
+        if trader_store not in ("objects", "columnar"):
+            raise ValueError(f"unknown trader_store: {trader_store!r}")
+        self.trader_store = trader_store
+        if trade_solver not in ("iterative", "fast", "validate"):
+            raise ValueError(f"unknown trade_solver: {trade_solver!r}")
+        self.trade_solver = trade_solver
+        if trade_matching not in ("off", "ordered", "pairs"):
+            raise ValueError(f"unknown trade_matching: {trade_matching!r}")
+        # whole trade passes solved in bulk, in batches of disjoint pairs
+        self.trade_matching = trade_matching
+        if step_engine not in ("serial", "parallel", "jit"):
+            raise ValueError(f"unknown step_engine: {step_engine!r}")
+        if step_engine != "serial" and (resource_engine, trader_store) != ("array", "columnar"):
+            raise ValueError(f'step_engine="{step_engine}" needs resource_engine="array" '
+                             'and trader_store="columnar"')
+        if step_engine != "serial" and trade_matching != "off":
+            raise ValueError(f'step_engine="{step_engine}" has its own trade pass; '
+                             'use trade_matching="off"')
+        if step_engine != "serial" and not kernels.HAVE_NUMBA:
+            warnings.warn(f'step_engine="{step_engine}" needs numba; using the serial engine',
+                          RuntimeWarning)
+            step_engine = "serial"
+        self.step_engine = step_engine
+        if init_engine not in ("python", "vectorized"):
+            raise ValueError(f"unknown init_engine: {init_engine!r}")
+        if instrument not in ("off", "on", "collect"):
+            raise ValueError(f"unknown instrument: {instrument!r}")
+        # per-step timings and counters; "collect" also feeds the data collector
+        self.instruments = None if instrument == "off" else Instruments(self.PHASES)
+        if trade_network not in ("off", "on"):
+            raise ValueError(f"unknown trade_network: {trade_network!r}")
+        # every trade call as an edge, with windowed degree/component queries
+        self.network = TradeNetwork(window=network_window) if trade_network == "on" else None
+
         self.moore_movement = moore_movement
         self.width = width
         self.height = height
@@ -63,13 +131,15 @@ class SugarscapeG1mt(mesa.Model):
         self.vision_max = vision_max
 
         # --- Load landscape (base) ---
-        default_map = Path(__file__).resolve().parents[2] / "data" / "sugar-map.txt"
-        map_file = Path(map_path) if map_path else default_map
-        if not map_file.exists():
-            raise FileNotFoundError(f"sugar-map not found: {map_file}")
+        if landscape is None:
+            landscape = load_landscape(map_path)
+        if np.shape(landscape) != (height, width):
+            raise ValueError(f"landscape shape {np.shape(landscape)} does not match "
+                             f"(height, width) = {(height, width)}")
+        self.landscape = landscape
 
         # start from the same base heightmap
-        sugar_base = np.genfromtxt(map_file).astype(float) + 1.0
+        sugar_base = np.asarray(landscape, dtype=float) + 1.0
         spice_base = np.flip(sugar_base, 1) * 2.0 - 1.0 
 
         # helper to add Gaussian noise + clip + optional integerize
@@ -92,56 +162,123 @@ class SugarscapeG1mt(mesa.Model):
         self.spice_max = float(np.max(spice_distribution)) if spice_distribution.size else 0.0
         self.viz_welfare_cap = 100.0
 
+        # array-backed resources (index [y, x]); None when patches are agents
+        self.sugar_amount = self.sugar_capacity = None
+        self.spice_amount = self.spice_capacity = None
+        if resource_engine == "array":
+            self.sugar_capacity = sugar_distribution
+            self.spice_capacity = spice_distribution
+            self.sugar_amount = sugar_distribution.copy()
+            self.spice_amount = spice_distribution.copy()
+
         self.schedule = ByTypeScheduler(self)
         self.grid = mesa.space.MultiGrid(self.width, self.height, torus=True)
-        self._death_seq = 0
-        self._death_markers = []   # we manage TTL ourselves
-
-        self.datacollector = mesa.DataCollector(
-            model_reporters={
-                "Trader": lambda m: m.schedule.get_type_count(Trader),
-                "Volume": trade_volume_unique,
-                "Price": price_gmean,
-            },
-            agent_reporters={
-                "Trade Network": lambda a: get_trade(a)
-            },
-        )
-
-        # --- Place patches (note: index [y, x]) ---
+        # O(1) cell lookups: trader ids per cell, patch agents by position
+        self.occupancy = OccupancyIndex(self.width, self.height)
+        self.neighborhoods = Neighborhoods(self.width, self.height)
+        self.sugar_patches = {}
+        self.spice_patches = {}
+        # struct-of-arrays trader state; None when traders hold their own
+        self.traders = TraderColumns() if trader_store == "columnar" else None
+        self.trader_cls = ColumnarTrader if trader_store == "columnar" else Trader
+        self.reset_trade_stats()
+        # recent deaths for the viz; never on the grid or in the scheduler
+        self.deaths = DeathEvents(ttl=8)
+        self.stop_reason = None    # set by run_model
+
+        model_reporters = {
+            "Trader": lambda m: m.schedule.get_type_count(Trader),
+            "Volume": trade_volume_unique,
+            "Price": price_gmean,
+        }
+        if instrument == "collect":
+            model_reporters.update(self.instruments.reporters())
+        agent_reporters = {
+            "Trade Network": lambda a: get_trade(a)
+        }
+        if collector_dir is None:
+            self.datacollector = mesa.DataCollector(
+                model_reporters=model_reporters, agent_reporters=agent_reporters)
+        else:
+            # bounded memory: flush to chunked .npz files every N collections
+            self.datacollector = StreamingCollector(
+                collector_dir, model_reporters, agent_reporters,
+                flush_every=collector_flush_every, intervals=collector_intervals,
+                agent_type=Trader)
+
+        # --- Place patches ---
         agent_id = 0
-        for y in range(self.height):
-            for x in range(self.width):
-                max_sugar = sugar_distribution[y, x]
-                if max_sugar > 0:
-                    sugar = Sugar(agent_id, self, (x, y), max_sugar)
-                    self.grid.place_agent(sugar, (x, y))
-                    self.schedule.add(sugar)
-                    agent_id += 1
-
-                max_spice = spice_distribution[y, x]
-                if max_spice > 0:
-                    spice = Spice(agent_id, self, (x, y), max_spice)
-                    self.grid.place_agent(spice, (x, y))
-                    self.schedule.add(spice)
-                    agent_id += 1
+        if resource_engine == "agents":
+            agent_id = self.place_patches(sugar_distribution, spice_distribution)
 
         # --- Place traders ---
-        for _ in range(self.initial_population):
-            x = self.random.randrange(self.width)
-            y = self.random.randrange(self.height)
-            sugar = int(self.random.uniform(self.endowment_min, self.endowment_max + 1))
-            spice = int(self.random.uniform(self.endowment_min, self.endowment_max + 1))
-            met_su = int(self.random.uniform(self.metabolism_min, self.metabolism_max + 1))
-            met_sp = int(self.random.uniform(self.metabolism_min, self.metabolism_max + 1))
-            vision = int(self.random.uniform(self.vision_min, self.vision_max))
-            t = Trader(agent_id, self, (x, y),
-                       moore=self.moore_movement,
-                       sugar=sugar, spice=spice,
-                       metabolism_sugar=met_su, metabolism_spice=met_sp,
-                       vision=vision)
-            self.grid.place_agent(t, (x, y))
-            self.schedule.add(t); agent_id += 1
+        draws = (self._draw_traders_vectorized() if init_engine == "vectorized"
+                 else [self._draw_trader() for _ in range(self.initial_population)])
+        traders, positions = [], []
+        for x, y, sugar, spice, met_su, met_sp, vision in draws:
+            traders.append(self.trader_cls(agent_id, self, (x, y),
+                                           moore=self.moore_movement,
+                                           sugar=sugar, spice=spice,
+                                           metabolism_sugar=met_su, metabolism_spice=met_sp,
+                                           vision=vision))
+            positions.append((x, y))
+            agent_id += 1
+        self.place_traders(traders, positions)
+
+        # kernel-based movement and trading: strips or whole torus (see decomposition.py)
+        self.engine = None
+        if step_engine != "serial":
+            if step_engine == "parallel":
+                strip_seed = seed if seed is not None else int(self.np_random.integers(2**63))
+                self.engine = StripEngine(self, workers=workers, seed=strip_seed)
+            else:
+                self.engine = TorusEngine(self)
+
+    def place_patches(self, sugar_distribution, spice_distribution, agent_id=0):
+        """Create Sugar/Spice agents where the maps are positive (index [y, x]).
+
+        Ids run row by row, sugar before spice within a cell. Returns the
+        next free agent id.
+        """
+        su, sp = np.asarray(sugar_distribution), np.asarray(spice_distribution)
+        ys, xs = np.nonzero((su > 0) | (sp > 0))
+        for x, y, max_sugar, max_spice in zip(xs.tolist(), ys.tolist(), su[ys, xs], sp[ys, xs]):
+            if max_sugar > 0:
+                self.sugar_patches[(x, y)] = Sugar(agent_id, self, (x, y), max_sugar)
+                agent_id += 1
+            if max_spice > 0:
+                self.spice_patches[(x, y)] = Spice(agent_id, self, (x, y), max_spice)
+                agent_id += 1
+        for patches in (self.sugar_patches, self.spice_patches):
+            place_many(self.grid, patches.values(), patches.keys())
+            self.schedule.add_many(patches.values())
+        return agent_id
+
+    def _draw_trader(self):
+        x = self.random.randrange(self.width)
+        y = self.random.randrange(self.height)
+        sugar = int(self.random.uniform(self.endowment_min, self.endowment_max + 1))
+        spice = int(self.random.uniform(self.endowment_min, self.endowment_max + 1))
+        met_su = int(self.random.uniform(self.metabolism_min, self.metabolism_max + 1))
+        met_sp = int(self.random.uniform(self.metabolism_min, self.metabolism_max + 1))
+        vision = int(self.random.uniform(self.vision_min, self.vision_max))
+        return x, y, sugar, spice, met_su, met_sp, vision
+
+    def _draw_traders_vectorized(self):
+        """`_draw_trader` for the whole population in a few np_random calls.
+
+        Same distributions (int(uniform) truncation included), different
+        stream: runs are statistically, not bitwise, equivalent.
+        """
+        n, rng = self.initial_population, self.np_random
+        def draw(lo, hi):
+            return np.floor(rng.uniform(lo, hi, n)).astype(np.int64).tolist()
+        return zip(rng.integers(0, self.width, n).tolist(), rng.integers(0, self.height, n).tolist(),
+                   draw(self.endowment_min, self.endowment_max + 1),
+                   draw(self.endowment_min, self.endowment_max + 1),
+                   draw(self.metabolism_min, self.metabolism_max + 1),
+                   draw(self.metabolism_min, self.metabolism_max + 1),
+                   draw(self.vision_min, self.vision_max))
 
     def _randomize_traders(self):
         from .agents import Trader
@@ -149,65 +286,236 @@ class SugarscapeG1mt(mesa.Model):
         self.random.shuffle(traders)
         return traders
     
+    # --- trader placement (keeps the occupancy index in sync with the grid) ---
+    def place_trader(self, t, pos):
+        self.grid.place_agent(t, pos)
+        self.occupancy.add(t.pos, t.unique_id)
+
+    def place_traders(self, traders, positions):
+        place_many(self.grid, traders, positions)
+        xs, ys = zip(*positions) if positions else ((), ())
+        self.occupancy.add_many(xs, ys, [t.unique_id for t in traders])
+        self.schedule.add_many(traders)
+
+    def move_trader(self, t, pos):
+        old = t.pos
+        self.grid.move_agent(t, pos)
+        self.occupancy.move(old, t.pos, t.unique_id)
+
+    def remove_trader(self, t):
+        self.occupancy.remove(t.pos, t.unique_id)
+        self.grid.remove_agent(t)
+
+    def kill_trader(self, t):
+        # leave a short-lived 'ghost' for the viz, then remove the trader
+        self.spawn_death_marker(t.pos)
+        if self.instruments is not None:
+            self.instruments.count("removed")
+        self.forget_trades(t)
+        self.remove_trader(t)
+        self.schedule.remove(t)
+
+    def trader_at(self, pos):
+        uid = self.occupancy.trader_id(pos)
+        return None if uid < 0 else self.schedule.agents_by_type[Trader][uid]
+
     def get_sugar_amount_at(self, pos):
-        for a in self.grid.get_cell_list_contents(pos):
-            if isinstance(a, Sugar):
-                return a.amount
-        return 0.0
+        if self.sugar_amount is not None:
+            return self.sugar_amount.item(pos[1], pos[0])
+        p = self.sugar_patches.get(pos)
+        return p.amount if p else 0.0
 
     def get_spice_amount_at(self, pos):
-        for a in self.grid.get_cell_list_contents(pos):
-            if isinstance(a, Spice):
-                return a.amount
-        return 0.0
+        if self.spice_amount is not None:
+            return self.spice_amount.item(pos[1], pos[0])
+        p = self.spice_patches.get(pos)
+        return p.amount if p else 0.0
 
-    def spawn_death_marker(self, pos):
-        #uid = f"dead-{self.schedule.steps}-{self._death_seq}"
-        #self._death_seq += 1
-        uid = f"dead-{self.schedule.steps}-{len(self._death_markers)}"
-        mark = DeathMarker(uid, self, ttl=8)
-        self.grid.place_agent(mark, pos)   # sets mark.pos for us
-        self.schedule.add(mark)
+    def resource_arrays(self):
+        """(sugar_capacity, sugar_amount, spice_capacity, spice_amount), index [y, x].
 
-    def step(self):
-        from .agents import Sugar, Spice, Trader
-        # fade out death markers
-        for mark in list(self._death_markers):
-            mark.ttl -= 1
-            if mark.ttl <= 0:
-                self.grid.remove_agent(mark)
-                self._death_markers.remove(mark)
-        # resources grow
+        The live arrays in array mode; filled from the patch agents otherwise,
+        one pass over every patch per call, so snapshots and rendering only
+        avoid per-agent work with ``resource_engine="array"``.
+        """
+        if self.sugar_amount is not None:
+            return (self.sugar_capacity, self.sugar_amount,
+                    self.spice_capacity, self.spice_amount)
+        shape = (self.height, self.width)
+        arrs = [np.zeros(shape), np.zeros(shape), np.zeros(shape), np.zeros(shape)]
+        for patches, cap, amt, attr in ((self.sugar_patches, arrs[0], arrs[1], "max_sugar"),
+                                        (self.spice_patches, arrs[2], arrs[3], "max_spice")):
+            if patches:
+                xs, ys = np.array(list(patches), dtype=np.int64).T
+                cap[ys, xs] = np.fromiter((getattr(p, attr) for p in patches.values()), float, len(patches))
+                amt[ys, xs] = np.fromiter((p.amount for p in patches.values()), float, len(patches))
+        return arrs
+
+    def snapshot(self) -> dict:
+        """Copy of the drawable state as NumPy arrays.
+
+        Keys: ``step``, ``width``, ``height``, ``sugar``/``spice`` amounts and
+        ``sugar_capacity``/``spice_capacity`` ([y, x]), ``sugar_max``/``spice_max``,
+        per-trader ``trader_id``, ``trader_x``, ``trader_y`` and ``welfare`` (in
+        scheduler order), and ``dead_x``/``dead_y`` for recent deaths.
+        """
+        su_cap, su_amt, sp_cap, sp_amt = self.resource_arrays()
+        traders = list(self.schedule.agents_by_type.get(Trader, {}).values())
+        n = len(traders)
+        if self.traders is not None:
+            cols = self.traders
+            su, sp = cols.sugar[:n], cols.spice[:n]
+            msu, msp = cols.metabolism_sugar[:n], cols.metabolism_spice[:n]
+        else:
+            su = np.fromiter((t.sugar for t in traders), float, n)
+            sp = np.fromiter((t.spice for t in traders), float, n)
+            msu = np.fromiter((t.metabolism_sugar for t in traders), float, n)
+            msp = np.fromiter((t.metabolism_spice for t in traders), float, n)
+        pos = np.array([t.pos for t in traders], dtype=np.int64).reshape(n, 2)
+        dead_x, dead_y = self.deaths.positions()
+        return {
+            "step": self.schedule.steps, "width": self.width, "height": self.height,
+            "sugar": np.array(su_amt, dtype=float), "spice": np.array(sp_amt, dtype=float),
+            "sugar_capacity": np.array(su_cap, dtype=float),
+            "spice_capacity": np.array(sp_cap, dtype=float),
+            "sugar_max": self.sugar_max, "spice_max": self.spice_max,
+            "trader_id": np.fromiter((t.unique_id for t in traders), np.int64, n),
+            "trader_x": pos[:, 0].copy(), "trader_y": pos[:, 1].copy(),
+            "welfare": welfare_array(su, sp, msu, msp),
+            "dead_x": dead_x, "dead_y": dead_y,
+        }
+
+    def regrow(self):
+        """Grow every resource patch by one unit, capped at its maximum."""
+        if self.sugar_amount is not None:
+            np.minimum(self.sugar_amount + 1, self.sugar_capacity, out=self.sugar_amount)
+            np.minimum(self.spice_amount + 1, self.spice_capacity, out=self.spice_amount)
+            return
         for s in self.schedule.agents_by_type.get(Sugar, {}).values():
             s.step()
         for p in self.schedule.agents_by_type.get(Spice, {}).values():
             p.step()
-        #for mark in list(self.schedule.agents_by_type.get(DeathMarker, {}).values()):
-        #    mark.step()
 
-        # traders move + harvest (no metabolization yet)
-        traders = self._randomize_traders()
-        for t in traders:
+    # --- per-step trade statistics (read by the Volume/Price reporters) ---
+    def reset_trade_stats(self):
+        self.trade_pairs = {}     # {(lo_id, hi_id): bit 1 if lo initiated | bit 2 if hi did}
+        self.log_price_sum = 0.0
+        self.price_count = 0
+
+    def record_trade(self, a, b, prices):
+        """Fold one call of `a.trade(b)` into this step's running statistics."""
+        ia, ib = a.unique_id, b.unique_id
+        pair, bit = ((ia, ib), 1) if ia < ib else ((ib, ia), 2)
+        self.trade_pairs[pair] = self.trade_pairs.get(pair, 0) | bit
+        for p in prices:
+            self.log_price_sum += math.log(p)
+        self.price_count += len(prices)
+        if self.network is not None:
+            self.network.add(self.schedule.steps + 1, ia, ib, prices)
+
+    def forget_trades(self, t):
+        # the reporters only ever saw trades listed by traders alive at
+        # collection time; drop what dies with `t` to keep that meaning
+        uid = t.unique_id
+        for other in set(t.trade_partners):
+            pair, bit = ((uid, other), 1) if uid < other else ((other, uid), 2)
+            left = self.trade_pairs.get(pair, 0) & ~bit
+            if left:
+                self.trade_pairs[pair] = left
+            else:
+                self.trade_pairs.pop(pair, None)
+        for p in t.prices:
+            self.log_price_sum -= math.log(p)
+        self.price_count -= len(t.prices)
+
+    def spawn_death_marker(self, pos):
+        self.deaths.add(self.schedule.steps + 1, pos)
+
+    # step() phases, in order; timed per phase by `self.instruments` when on
+    PHASES = ("markers", "regrowth", "move_harvest", "trade_1", "trade_2", "burn_die", "collect")
+
+    def fade_death_markers(self):
+        self.deaths.expire(self.schedule.steps + 1)
+
+    def move_and_harvest(self):
+        """Traders move + harvest (no metabolization yet)."""
+        self.reset_trade_stats()
+        if self.engine is not None:
+            return self.engine.move_and_harvest()
+        for t in self._randomize_traders():
             t.prices = []
             t.trade_partners = []
             t.move()
             t.harvest()     # <- collect first
 
-        # trading rounds (now they have the harvest in hand)
-        for t in self._randomize_traders():
-            t.trade_with_neighbor()
-        # (Optionally a second trading pass for more equilibrium)
+    def trade_pass(self):
+        if self.engine is not None:
+            return self.engine.trade_pass()
+        if self.trade_matching != "off":
+            return matching.trade_pass(self, ordered=self.trade_matching == "ordered")
         for t in self._randomize_traders():
             t.trade_with_neighbor()
 
-        # metabolize and then deaths
-        for t in list(self.schedule.agents_by_type.get(Trader, {}).values()):
-            t.burn()
-            t.maybe_die()
+    def burn_and_die(self):
+        """Metabolize and then deaths."""
+        if self.traders is not None:
+            self.traders.burn()
+            dead = self.traders.starved_rows()
+            for r in dead:
+                self.kill_trader(self.traders.agents[r])
+            self.traders.remove_rows(dead)
+        else:
+            for t in list(self.schedule.agents_by_type.get(Trader, {}).values()):
+                t.burn()
+                t.maybe_die()
 
+    def collect(self):
         self.schedule.steps += 1
+        if self.network is not None:
+            self.network.end_step(self.schedule.steps)
         self.datacollector.collect(self)
 
-    def run_model(self, step_count=1000):
+    def step(self):
+        inst = self.instruments
+        phases = (self.fade_death_markers, self.regrow, self.move_and_harvest,
+                  # trading rounds (now they have the harvest in hand); the
+                  # second pass moves prices closer to equilibrium
+                  self.trade_pass, self.trade_pass,
+                  self.burn_and_die, self.collect)
+        if inst is None:
+            for phase in phases:
+                phase()
+            return
+        inst.begin_step(self.schedule.steps + 1)
+        for name, phase in zip(self.PHASES, phases):
+            t0 = time.perf_counter()
+            phase()
+            inst.time(name, time.perf_counter() - t0)
+        inst.end_step()
+
+    def close(self):
+        """Shut down the parallel engine's worker threads, if any."""
+        if self.engine is not None:
+            self.engine.close()
+
+    def run_model(self, step_count=1000, stop_on_extinction=False, stable_window=0,
+                  stable_tol=0.01, time_budget=None):
+        """Step up to `step_count` times, stopping early on the enabled conditions.
+
+        See `sugarscape.stopping`. The reason ("steps", "extinction", "stable"
+        or "time") is left in `self.stop_reason`; an early stop also clears
+        `self.running`.
+        """
+        monitor = None
+        if stop_on_extinction or stable_window or time_budget is not None:
+            monitor = StopMonitor(stop_on_extinction, stable_window, stable_tol, time_budget)
+        self.stop_reason = "steps"
         for _ in range(step_count):
             self.step()
+            reason = monitor.check(self) if monitor is not None else None
+            if reason is not None:
+                self.stop_reason = reason
+                self.running = False
+                break
+        if isinstance(self.datacollector, StreamingCollector):
+            self.datacollector.flush()
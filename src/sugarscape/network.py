@@ -0,0 +1,189 @@
+"""Trade network store (``model.network``, ``trade_network="on"``).
+
+Every call of ``a.trade(b)`` that executes at least one exchange becomes one
+edge (step, a, b, price, volume): `a` initiated, `volume` is the number of
+exchange rounds and `price` their geometric mean. Edges live in growable
+NumPy columns in step order, so a step range is a contiguous slice.
+
+For the last `window` steps the store keeps, updated as edges enter and
+leave, how many edges each unordered pair has and every trader's degree
+(distinct partners); `degree_distribution()` reads that state instead of
+rescanning the edge list. `component_count()` is a windowed recomputation:
+each call runs a union-find over the window's current pairs. Whole-history
+or ad hoc step ranges go through `to_sparse()` / `to_networkx()`.
+"""
+from __future__ import annotations
+import math
+from pathlib import Path
+import numpy as np
+
+class TradeNetwork:
+    FIELDS = ("step", "a", "b", "price", "volume")
+
+    def __init__(self, window=10, capacity=1024):
+        if window < 1:
+            raise ValueError("network window must be at least 1 step")
+        self.window = window
+        self.n = 0
+        self.step = np.zeros(capacity, dtype=np.int64)
+        self.a = np.zeros(capacity, dtype=np.int64)
+        self.b = np.zeros(capacity, dtype=np.int64)
+        self.price = np.zeros(capacity)
+        self.volume = np.zeros(capacity, dtype=np.int64)
+        self._pairs = {}     # {(lo, hi): edges in the window}
+        self.degree = {}     # {uid: distinct partners in the window}
+        self._added = 0      # edges folded into the window so far
+        self._expired = 0    # edges dropped from it so far
+        self.last_step = 0
+
+    def __len__(self):
+        return self.n
+
+    def _grow(self, need):
+        if need <= self.step.size:
+            return
+        size = max(need, 2 * self.step.size)
+        for f in self.FIELDS:
+            col = getattr(self, f)
+            new = np.zeros(size, dtype=col.dtype)
+            new[:self.n] = col[:self.n]
+            setattr(self, f, new)
+
+    def add(self, step, a, b, prices):
+        """Record one trade call; `prices` are its exchange rounds' prices."""
+        if not prices:
+            return
+        self._grow(self.n + 1)
+        i = self.n
+        self.step[i] = step; self.a[i] = a; self.b[i] = b
+        self.price[i] = math.exp(sum(math.log(p) for p in prices) / len(prices))
+        self.volume[i] = len(prices)
+        self.n += 1
+
+    def add_many(self, step, a, b, price, volume):
+        """Record many trade calls from arrays; `step` may be a scalar."""
+        k = len(a)
+        self._grow(self.n + k)
+        sl = slice(self.n, self.n + k)
+        self.step[sl] = step; self.a[sl] = a; self.b[sl] = b
+        self.price[sl] = price; self.volume[sl] = volume
+        self.n += k
+
+    def _pair_delta(self, lo, hi, sign):
+        for u, v in zip(lo.tolist(), hi.tolist()):
+            old = self._pairs.get((u, v), 0)
+            new = old + sign
+            if new:
+                self._pairs[(u, v)] = new
+            else:
+                del self._pairs[(u, v)]
+            if (old == 0) != (new == 0):
+                for w in (u, v):
+                    d = self.degree.get(w, 0) + sign
+                    if d:
+                        self.degree[w] = d
+                    else:
+                        del self.degree[w]
+
+    def end_step(self, step):
+        """Slide the window to end at `step`: fold in new edges, expire old ones."""
+        a, b = self.a, self.b
+        new = slice(self._added, self.n)
+        self._pair_delta(np.minimum(a[new], b[new]), np.maximum(a[new], b[new]), 1)
+        self._added = self.n
+        stop = int(np.searchsorted(self.step[:self.n], step - self.window, side="right"))
+        if stop > self._expired:
+            old = slice(self._expired, stop)
+            self._pair_delta(np.minimum(a[old], b[old]), np.maximum(a[old], b[old]), -1)
+            self._expired = stop
+        self.last_step = step
+
+    def degree_distribution(self) -> np.ndarray:
+        """``counts[k]`` = traders with k distinct partners in the window (k >= 1)."""
+        return np.bincount(np.fromiter(self.degree.values(), dtype=np.int64, count=len(self.degree)))
+
+    def component_count(self) -> int:
+        """Connected components among traders that traded in the window.
+
+        Recomputed on every call with a union-find over the window's pairs,
+        O(pairs) per call.
+        """
+        parent = {}
+        def find(u):
+            while parent[u] != u:
+                parent[u] = parent[parent[u]]
+                u = parent[u]
+            return u
+        roots = 0
+        for u, v in self._pairs:
+            for w in (u, v):
+                if w not in parent:
+                    parent[w] = w
+                    roots += 1
+            ru, rv = find(u), find(v)
+            if ru != rv:
+                parent[ru] = rv
+                roots -= 1
+        return roots
+
+    def edges(self, steps=None) -> dict:
+        """Edge columns, optionally restricted to a (start, stop) step range."""
+        lo, hi = 0, self.n
+        if steps is not None:
+            lo, hi = np.searchsorted(self.step[:self.n], steps, side="left")
+        return {f: getattr(self, f)[lo:hi].copy() for f in self.FIELDS}
+
+    def _aggregate(self, steps):
+        """Undirected pairs in range with their volume, calls and mean log price."""
+        e = self.edges(steps)
+        nodes, inv = np.unique(np.concatenate([e["a"], e["b"]]), return_inverse=True)
+        i, j = inv[:e["a"].size], inv[e["a"].size:]
+        n = max(nodes.size, 1)
+        key, pair = np.unique(np.minimum(i, j) * n + np.maximum(i, j), return_inverse=True)
+        vol = np.bincount(pair, weights=e["volume"], minlength=key.size)
+        calls = np.bincount(pair, minlength=key.size)
+        logp = np.bincount(pair, weights=e["volume"] * np.log(e["price"]), minlength=key.size)
+        return nodes, key // n, key % n, vol, calls, logp / np.maximum(vol, 1)
+
+    def to_sparse(self, steps=None):
+        """Symmetric ``scipy.sparse.csr_matrix`` of traded volume, and the trader ids.
+
+        Row/column k is trader ``ids[k]``.
+        """
+        from scipy import sparse
+        nodes, i, j, vol, _, _ = self._aggregate(steps)
+        mat = sparse.coo_matrix((np.concatenate([vol, vol]),
+                                 (np.concatenate([i, j]), np.concatenate([j, i]))),
+                                shape=(nodes.size, nodes.size)).tocsr()
+        return mat, nodes
+
+    def to_networkx(self, steps=None):
+        """``networkx.Graph``; edges carry ``volume``, ``trades`` and geometric-mean ``price``."""
+        import networkx as nx
+        nodes, i, j, vol, calls, logp = self._aggregate(steps)
+        g = nx.Graph()
+        g.add_nodes_from(nodes.tolist())
+        ids = nodes.tolist()
+        g.add_edges_from((ids[u], ids[v], {"volume": int(w), "trades": int(c), "price": math.exp(lp)})
+                         for u, v, w, c, lp in zip(i.tolist(), j.tolist(), vol.tolist(),
+                                                   calls.tolist(), logp.tolist()))
+        return g
+
+    def save(self, path):
+        """Write the edge columns to an ``.npz`` file."""
+        np.savez_compressed(Path(path), window=self.window, last_step=self.last_step,
+                            **self.edges())
+
+    @classmethod
+    def load(cls, path, window=None):
+        with np.load(path) as z:
+            net = cls(window=int(z["window"]) if window is None else window,
+                      capacity=max(1, z["step"].size))
+            net.restore({f: z[f] for f in cls.FIELDS}, int(z["last_step"]))
+        return net
+
+    def restore(self, edges, step):
+        """Replace the edges and rebuild the window as it stood after `step`."""
+        self.__init__(self.window, capacity=max(1, len(edges["step"])))
+        self.add_many(edges["step"], edges["a"], edges["b"], edges["price"], edges["volume"])
+        self.end_step(step)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+import numpy as np
+from .agents import Trader
+
+class TraderColumns:
+    """Struct-of-arrays store for trader state.
+
+    Row `i` belongs to `agents[i]`; rows stay in scheduler insertion order so
+    vectorized passes visit traders in the same order as the per-agent loop.
+    """
+    FIELDS = ("sugar", "spice", "metabolism_sugar", "metabolism_spice", "vision", "uid", "x", "y")
+
+    def __init__(self, capacity=256):
+        self.n = 0
+        self.agents = []
+        self.sugar = np.zeros(capacity)
+        self.spice = np.zeros(capacity)
+        self.metabolism_sugar = np.zeros(capacity, dtype=np.int64)
+        self.metabolism_spice = np.zeros(capacity, dtype=np.int64)
+        self.vision = np.zeros(capacity, dtype=np.int64)
+        self.uid = np.zeros(capacity, dtype=np.int64)
+        self.x = np.full(capacity, -1, dtype=np.int64)  # -1 while off the grid
+        self.y = np.full(capacity, -1, dtype=np.int64)
+
+    def __len__(self):
+        return self.n
+
+    def _grow(self):
+        for f in self.FIELDS:
+            col = getattr(self, f)
+            new = np.full(max(2 * col.size, 1), -1 if f in ("x", "y") else 0, dtype=col.dtype)
+            new[:col.size] = col
+            setattr(self, f, new)
+
+    def claim_row(self, agent) -> int:
+        if self.n == self.sugar.size:
+            self._grow()
+        self.agents.append(agent)
+        self.n += 1
+        return self.n - 1
+
+    def burn(self):
+        """Metabolize every trader at once (Trader.burn over the population)."""
+        n = self.n
+        np.maximum(0, self.sugar[:n] - self.metabolism_sugar[:n], out=self.sugar[:n])
+        np.maximum(0, self.spice[:n] - self.metabolism_spice[:n], out=self.spice[:n])
+
+    def starved_rows(self) -> np.ndarray:
+        n = self.n
+        return np.flatnonzero((self.sugar[:n] <= 0) & (self.spice[:n] <= 0))
+
+    def remove_rows(self, rows):
+        """Drop `rows` and close the gaps, keeping survivors in order."""
+        if len(rows) == 0:
+            return
+        n = self.n
+        keep = np.ones(n, dtype=bool)
+        keep[rows] = False
+        idx = np.flatnonzero(keep)
+        for f in self.FIELDS:
+            col = getattr(self, f)
+            col[:idx.size] = col[idx]
+        for r in np.asarray(rows).tolist():
+            self.agents[r]._row = None   # detached: its row now holds another trader
+        self.agents = [self.agents[i] for i in idx]
+        self.n = idx.size
+        for r in range(int(rows[0]), self.n):
+            self.agents[r]._row = r
+
+def _column(name):
+    def fget(self):
+        row = self._row
+        if row is None:
+            raise RuntimeError(f"trader {self.unique_id} was removed; its {name} is gone")
+        # a Python scalar: NumPy scalar arithmetic in the per-agent code is slow
+        return getattr(self._cols, name).item(row)
+    def fset(self, value):
+        if self._row is None:
+            raise RuntimeError(f"trader {self.unique_id} was removed; its {name} is gone")
+        getattr(self._cols, name)[self._row] = value
+    return property(fget, fset)
+
+class ColumnarTrader(Trader):
+    """Trader whose numeric state is a view onto a row of TraderColumns.
+
+    This is the state layout the array step engines need, not a memory or
+    speed optimization: the object is still a full mesa.Agent (with a
+    ``__dict__`` and its own trade lists), and every read from per-agent code
+    goes through a property. A removed trader's `_row` is None.
+    """
+    agent_type = Trader
+
+    sugar = _column("sugar")
+    spice = _column("spice")
+    metabolism_sugar = _column("metabolism_sugar")
+    metabolism_spice = _column("metabolism_spice")
+    vision = _column("vision")
+
+    @property
+    def pos(self):
+        if self._row is None:
+            return None
+        x = self._cols.x[self._row]
+        return None if x < 0 else (int(x), int(self._cols.y[self._row]))
+
+    @pos.setter
+    def pos(self, value):
+        # set by mesa's grid on place/move/remove
+        if self._row is None:
+            return
+        x, y = (-1, -1) if value is None else value
+        self._cols.x[self._row] = x
+        self._cols.y[self._row] = y
+
+    def __init__(self, unique_id, model, pos, **kwargs):
+        self._cols = model.traders
+        self._row = self._cols.claim_row(self)
+        super().__init__(unique_id, model, pos, **kwargs)
+        self._cols.uid[self._row] = self.unique_id
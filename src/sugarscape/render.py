@@ -0,0 +1,29 @@
+"""Draw `SugarscapeG1mt.snapshot()` dicts with matplotlib.
+
+Everything here works on plain arrays, so frames can be drawn without the
+model (e.g. in another process).
+"""
+from __future__ import annotations
+import numpy as np
+
+def resource_rgba(snap) -> np.ndarray:
+    """[H, W, 4] image: red = sugar, blue = spice, transparent where no sugar grows."""
+    r = np.clip(snap["sugar"] / max(snap["sugar_max"], 1e-9), 0.0, 1.0)
+    b = np.clip(snap["spice"] / max(snap["spice_max"], 1e-9), 0.0, 1.0)
+    return np.dstack([r, np.full_like(r, 0.05), b, (snap["sugar_capacity"] > 0).astype(float)])
+
+def welfare_colors(welfare, cap=100.0) -> np.ndarray:
+    """Dark to bright green by welfare, saturating at `cap`."""
+    g = np.zeros(len(welfare)) if cap <= 0 else np.clip(np.asarray(welfare) / cap, 0.0, 1.0)
+    return np.column_stack([np.full_like(g, 0.1), g, np.full_like(g, 0.1)])
+
+def draw_snapshot(ax, snap, welfare_cap=100.0):
+    """Resources as one image, traders coloured by welfare, death markers as x."""
+    w, h = snap["width"], snap["height"]
+    ax.imshow(resource_rgba(snap), origin="lower", interpolation="nearest", zorder=0,
+              extent=(-0.5, w - 0.5, -0.5, h - 0.5))
+    ax.scatter(snap["dead_x"], snap["dead_y"], marker="x", s=12, color=(0.6, 0.6, 0.6), zorder=2)
+    ax.scatter(snap["trader_x"], snap["trader_y"], marker="o", s=16,
+               c=welfare_colors(snap["welfare"], welfare_cap), zorder=3)
+    ax.set_xlim(-0.5, w - 0.5); ax.set_ylim(-0.5, h - 0.5)
+    ax.set_aspect("equal")
@@ -0,0 +1,242 @@
+"""Lazy, sliceable access to saved run outputs.
+
+`RunResults(path)` opens either the CSV pair written by ``src/main.py``
+(``model_vars.csv`` / ``agent_vars.csv``) or a `StreamingCollector`
+directory, and answers the same queries for both:
+
+* `agent_vars(name, steps=(lo, hi), agents=[...], every=N)` -- records of a
+  step range and/or agent subset, reading only the bytes (CSV) or chunks
+  (stream) that hold them
+* `agent_stats(name, ...)` -- per-step aggregates (records, value counts)
+  without parsing the list values
+* `model_vars(steps=..., every=N, how=None | "mean" | ...)` -- every Nth
+  step, or N-step bins aggregated with `how`, for plotting
+
+For CSV the first query scans ``agent_vars.csv`` once and writes
+``agent_vars.csv.index.npz`` next to it: the byte offset of every step's
+rows plus each agent's first and last step. The index is rebuilt when the
+CSV's size or mtime changes. The file must be in step order, as
+``DataFrame.to_csv`` writes it.
+"""
+from __future__ import annotations
+import csv
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from .collectors import CollectorReader
+
+def _ranges(idx):
+    """Split sorted indices into runs of consecutive values: [(first, last+1), ...]."""
+    if idx.size == 0:
+        return []
+    cut = np.flatnonzero(np.diff(idx) != 1) + 1
+    return [(int(r[0]), int(r[-1]) + 1) for r in np.split(idx, cut)]
+
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+def _count(text):
+    """Values in one CSV cell: a stringified list counts its items, a scalar is 1."""
+    if text.startswith("["):
+        return 0 if text == "[]" else text.count(",") + 1
+    return 1
+
+def downsample(frame: pd.DataFrame, every=1, how=None) -> pd.DataFrame:
+    """Every `every`-th step of a step-indexed frame, or, with `how` (e.g.
+    "mean", "max"), aggregates over bins of `every` steps labelled by their
+    first step."""
+    if every <= 1:
+        return frame
+    steps = np.asarray(frame.index, dtype=np.int64)
+    if how is None:
+        return frame[steps % every == 0]
+    out = frame.groupby(steps // every * every).agg(how)
+    out.index.name = frame.index.name
+    return out
+
+class CsvIndex:
+    """Step and agent index of an ``agent_vars.csv`` (see module docstring)."""
+    def __init__(self, path):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".index.npz")
+        st = self.path.stat()
+        self.stamp = np.array([st.st_size, st.st_mtime_ns], dtype=np.int64)
+        if not self._load():
+            self._build()
+
+    def _load(self) -> bool:
+        try:
+            with np.load(self.index_path) as z:
+                if not np.array_equal(z["stamp"], self.stamp):
+                    return False
+                for k in ("header", "steps", "offsets", "agents", "first", "last"):
+                    setattr(self, k, z[k])
+        except (OSError, KeyError, ValueError):
+            return False
+        self.header = str(self.header)
+        return True
+
+    def _build(self):
+        steps, offsets, first, last = [], [], {}, {}
+        with open(self.path, "rb") as fh:
+            self.header = fh.readline().decode().rstrip("\r\n")
+            pos = fh.tell()
+            prev = None
+            for line in fh:
+                step, agent, _ = line.split(b",", 2)
+                step = int(step)
+                if step != prev:
+                    if prev is not None and step < prev:
+                        raise ValueError(f"{self.path} is not in step order")
+                    steps.append(step); offsets.append(pos); prev = step
+                first.setdefault(agent, step)
+                last[agent] = step
+                pos += len(line)
+        offsets.append(pos)
+        self.steps = np.asarray(steps, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        ids = [_number(a.decode()) for a in first]
+        self.agents = np.asarray(ids)
+        self.first = np.fromiter(first.values(), dtype=np.int64, count=len(ids))
+        self.last = np.fromiter(last.values(), dtype=np.int64, count=len(ids))
+        try:
+            tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+            with open(tmp, "wb") as fh:
+                np.savez(fh, stamp=self.stamp, header=np.array(self.header), steps=self.steps,
+                         offsets=self.offsets, agents=self.agents, first=self.first,
+                         last=self.last)
+            tmp.replace(self.index_path)
+        except OSError:
+            pass   # read-only directory: keep the index in memory only
+
+    def select(self, steps=None, agents=None, every=1) -> np.ndarray:
+        """Positions (into `self.steps`) of the steps a query has to read."""
+        s = self.steps
+        keep = np.ones(s.size, dtype=bool)
+        if steps is not None:
+            keep &= (s >= steps[0]) & (s < steps[1])
+        if every > 1:
+            keep &= s % every == 0
+        if agents is not None:
+            known = np.isin(self.agents, list(agents))
+            if not known.any():
+                return np.zeros(0, dtype=np.int64)
+            keep &= (s >= self.first[known].min()) & (s <= self.last[known].max())
+        return np.flatnonzero(keep)
+
+    def iter_rows(self, sel):
+        """Parsed CSV rows of the selected steps, reading one byte range per run."""
+        with open(self.path, "rb") as fh:
+            for a, b in _ranges(sel):
+                fh.seek(self.offsets[a])
+                text = fh.read(int(self.offsets[b] - self.offsets[a])).decode()
+                yield from csv.reader(text.splitlines())
+
+class RunResults:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._index = None
+        if (self.path / "meta.json").exists():
+            self.stream = CollectorReader(self.path)
+            self.agent_names = list(self.stream.meta["agent_reporters"])
+        else:
+            self.stream = None
+            self.agent_names = None   # from the CSV header, on first use
+
+    @property
+    def index(self) -> CsvIndex:
+        if self._index is None:
+            self._index = CsvIndex(self.path / "agent_vars.csv")
+            self.agent_names = self._index.header.split(",")[2:]
+        return self._index
+
+    def _name(self, name):
+        if self.stream is None:
+            self.index
+        if name is None:
+            return self.agent_names[0]
+        if name not in self.agent_names:
+            raise ValueError(f"unknown agent reporter: {name!r}")
+        return name
+
+    def steps(self) -> np.ndarray:
+        """Steps with agent records."""
+        if self.stream is None:
+            return self.index.steps.copy()
+        name = self.agent_names[0]
+        return np.unique(np.concatenate(
+            [z[f"agent.{name}.step"] for z in self.stream.iter_chunks()] or [np.zeros(0, np.int64)]))
+
+    def model_vars(self, names=None, steps=None, every=1, how=None) -> pd.DataFrame:
+        if self.stream is not None:
+            df = self.stream.model_vars(names)
+        else:
+            # one row per step, so small enough to read whole
+            df = pd.read_csv(self.path / "model_vars.csv", index_col=0)
+            df.index.name = "Step"
+            if names is not None:
+                df = df[list(names)]
+        if steps is not None:
+            df = df[(df.index >= steps[0]) & (df.index < steps[1])]
+        return downsample(df, every, how)
+
+    def _stream_records(self, name, steps, agents, every):
+        """Yield (step, agent, counts, offsets, values) arrays per chunk, filtered."""
+        for z in self.stream.iter_chunks():
+            st = z[f"agent.{name}.step"]
+            if steps is not None and (st.size == 0 or st[-1] < steps[0] or st[0] >= steps[1]):
+                continue
+            keep = np.ones(st.size, dtype=bool)
+            if steps is not None:
+                keep &= (st >= steps[0]) & (st < steps[1])
+            if every > 1:
+                keep &= st % every == 0
+            ids = z[f"agent.{name}.agent"]
+            if agents is not None:
+                keep &= np.isin(ids, list(agents))
+            if not keep.any():
+                continue
+            off = z[f"agent.{name}.offsets"]
+            yield st[keep], ids[keep], off, z[f"agent.{name}.values"], np.flatnonzero(keep)
+
+    def agent_vars(self, name=None, steps=None, agents=None, every=1) -> pd.DataFrame:
+        """Records indexed by (Step, AgentID), for steps in [lo, hi), agents in
+        `agents` and steps divisible by `every` (each filter optional)."""
+        name = self._name(name)
+        rows = []
+        if self.stream is not None:
+            for st, ids, off, vals, pos in self._stream_records(name, steps, agents, every):
+                rows.extend((int(s), a.item(), vals[off[i]:off[i + 1]].tolist())
+                            for s, a, i in zip(st, ids, pos))
+        else:
+            col = 2 + self.agent_names.index(name)
+            wanted = None if agents is None else set(agents)
+            for row in self.index.iter_rows(self.index.select(steps, agents, every)):
+                agent = _number(row[1])
+                if wanted is None or agent in wanted:
+                    rows.append((int(row[0]), agent, json.loads(row[col]) if row[col] else None))
+        df = pd.DataFrame(rows, columns=["Step", "AgentID", name])
+        return df.set_index(["Step", "AgentID"])
+
+    def agent_stats(self, name=None, steps=None, every=1) -> pd.DataFrame:
+        """Per step: ``agents`` (records), ``values`` (list items over all
+        records), and their ``mean`` and ``max`` per record."""
+        name = self._name(name)
+        parts = []
+        if self.stream is not None:
+            for st, _, off, _, pos in self._stream_records(name, steps, None, every):
+                parts.append(pd.DataFrame({"Step": st, "n": off[pos + 1] - off[pos]}))
+        else:
+            col = 2 + self.agent_names.index(name)
+            st, n = [], []
+            for row in self.index.iter_rows(self.index.select(steps, None, every)):
+                if row[col]:
+                    st.append(int(row[0])); n.append(_count(row[col]))
+            parts.append(pd.DataFrame({"Step": np.asarray(st, dtype=np.int64),
+                                       "n": np.asarray(n, dtype=np.int64)}))
+        df = pd.concat(parts) if parts else pd.DataFrame({"Step": [], "n": []}, dtype=np.int64)
+        return df.groupby("Step")["n"].agg(agents="size", values="sum", mean="mean", max="max")
@@ -7,12 +7,24 @@ class ByTypeScheduler:
         self.steps = 0
         self.agents_by_type = {}  # {cls: {unique_id: agent}}
 
+    @staticmethod
+    def type_of(agent):
+        # stand-in subclasses (e.g. ColumnarTrader) group under `agent_type`
+        return getattr(agent, "agent_type", type(agent))
+
     def add(self, agent):
-        d = self.agents_by_type.setdefault(type(agent), {})
+        d = self.agents_by_type.setdefault(self.type_of(agent), {})
         d[agent.unique_id] = agent
 
+    def add_many(self, agents):
+        by_type = {}
+        for agent in agents:
+            by_type.setdefault(self.type_of(agent), []).append(agent)
+        for cls, group in by_type.items():
+            self.agents_by_type.setdefault(cls, {}).update((a.unique_id, a) for a in group)
+
     def remove(self, agent):
-        d = self.agents_by_type.get(type(agent))
+        d = self.agents_by_type.get(self.type_of(agent))
         if d is not None:
             d.pop(agent.unique_id, None)
 
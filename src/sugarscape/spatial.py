@@ -0,0 +1,141 @@
+from __future__ import annotations
+from functools import lru_cache
+import numpy as np
+
+class OccupancyIndex:
+    """Trader id per cell (index [y, x]), -1 where the cell holds no trader.
+
+    Random initial placement can stack several traders on one cell; the later
+    arrivals are kept in order so `ids` always names the same trader that
+    comes first in the grid's cell list.
+    """
+    def __init__(self, width, height):
+        self.ids = np.full((height, width), -1, dtype=np.int64)
+        self.count = np.zeros((height, width), dtype=np.int32)
+        self._stacked = {}  # {(x, y): [unique_id, ...]} beyond the first
+
+    def add(self, pos, uid):
+        x, y = pos
+        if self.count[y, x] == 0:
+            self.ids[y, x] = uid
+        else:
+            self._stacked.setdefault(pos, []).append(uid)
+        self.count[y, x] += 1
+
+    def remove(self, pos, uid):
+        x, y = pos
+        self.count[y, x] -= 1
+        rest = self._stacked.get(pos)
+        if self.ids[y, x] == uid:
+            self.ids[y, x] = rest.pop(0) if rest else -1
+        else:
+            rest.remove(uid)
+        if rest is not None and not rest:
+            del self._stacked[pos]
+
+    def add_many(self, xs, ys, uids):
+        """`add` for many traders, in order."""
+        xs, ys, uids = (np.asarray(a, dtype=np.int64) for a in (xs, ys, uids))
+        flat = ys * self.ids.shape[1] + xs
+        _, first = np.unique(flat, return_index=True)
+        fresh = first[self.count[ys[first], xs[first]] == 0]
+        self.ids[ys[fresh], xs[fresh]] = uids[fresh]
+        np.add.at(self.count, (ys[fresh], xs[fresh]), 1)
+        rest = np.ones(flat.size, dtype=bool)
+        rest[fresh] = False
+        for i in np.flatnonzero(rest).tolist():
+            self.add((int(xs[i]), int(ys[i])), int(uids[i]))
+
+    def move(self, old, new, uid):
+        self.remove(old, uid)
+        self.add(new, uid)
+
+    def arrival(self, pos, uid) -> int:
+        """Position of trader `uid` among those on `pos`, in arrival order."""
+        x, y = pos
+        return 0 if self.ids[y, x] == uid else 1 + self._stacked[pos].index(uid)
+
+    def trader_id(self, pos):
+        return int(self.ids[pos[1], pos[0]])
+
+    def is_occupied(self, pos) -> bool:
+        return self.count[pos[1], pos[0]] > 0
+
+def place_many(grid, agents, positions):
+    """grid.place_agent for many agents, in order."""
+    for a, pos in zip(agents, positions):
+        grid.place_agent(a, pos)
+
+@lru_cache(maxsize=None)
+def neighborhood_offsets(radius, moore):
+    """(dx, dy) stencil in the order mesa's Grid.get_neighborhood visits cells."""
+    d = np.arange(-radius, radius + 1)
+    dx = np.repeat(d, d.size)
+    dy = np.tile(d, d.size)
+    if not moore:
+        keep = np.abs(dx) + np.abs(dy) <= radius
+        dx, dy = dx[keep], dy[keep]
+    return dx, dy
+
+def wrapped_neighborhood(pos, width, height, radius, moore, include_center=True):
+    """Torus-wrapped neighborhood of `pos` as (xs, ys) arrays, mesa order."""
+    x, y = pos
+    dx, dy = neighborhood_offsets(radius, moore)
+    xs = (x + dx) % width
+    ys = (y + dy) % height
+    if 2 * radius + 1 > min(width, height):
+        # the stencil wraps onto itself; keep first visits like mesa does
+        _, first = np.unique(ys * width + xs, return_index=True)
+        first.sort()
+        xs, ys = xs[first], ys[first]
+    if not include_center:
+        keep = (xs != x) | (ys != y)
+        xs, ys = xs[keep], ys[keep]
+    return xs, ys
+
+@lru_cache(maxsize=None)
+def stencil_table(max_radius, moore):
+    """`neighborhood_offsets` for radii 0..max_radius, concatenated.
+
+    Returns (dx, dy, starts); radius r is ``dx[starts[r]:starts[r + 1]]``.
+    """
+    parts = [neighborhood_offsets(r, moore) for r in range(max_radius + 1)]
+    starts = np.zeros(max_radius + 2, dtype=np.int64)
+    starts[1:] = np.cumsum([p[0].size for p in parts])
+    return (np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]), starts)
+
+class Neighborhoods:
+    """Per-model cache of neighborhood stencils (``model.neighborhoods``).
+
+    One (dx, dy, dist) table per (radius, moore, include_center), built on
+    first use; `dist` is `utils.grid_dist` from the center. `cells` turns a
+    table into torus-wrapped coordinates in mesa's order, skipping the modulo
+    for positions at least `radius` cells from every edge.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._tables = {}
+
+    def stencil(self, radius, moore, include_center=True):
+        key = (radius, moore, include_center)
+        table = self._tables.get(key)
+        if table is None:
+            dx, dy = neighborhood_offsets(radius, moore)
+            if not include_center:
+                keep = (dx != 0) | (dy != 0)
+                dx, dy = dx[keep], dy[keep]
+            dist = np.maximum(np.abs(dx), np.abs(dy)) if moore else np.abs(dx) + np.abs(dy)
+            table = self._tables[key] = (dx, dy, dist)
+        return table
+
+    def cells(self, pos, radius, moore, include_center=True):
+        """(xs, ys, dist) of `pos`'s neighborhood; dist uses raw coordinates like grid_dist."""
+        x, y = pos
+        w, h = self.width, self.height
+        if radius <= x < w - radius and radius <= y < h - radius:
+            dx, dy, dist = self.stencil(radius, moore, include_center)
+            return x + dx, y + dy, dist
+        xs, ys = wrapped_neighborhood(pos, w, h, radius, moore, include_center)
+        ddx, ddy = np.abs(xs - x), np.abs(ys - y)
+        return xs, ys, (np.maximum(ddx, ddy) if moore else ddx + ddy)
@@ -0,0 +1,77 @@
+"""Early-termination conditions for `SugarscapeG1mt.run_model`.
+
+Checked after every step, each in O(1) amortized time:
+
+* ``extinction`` -- no traders left
+* ``stable`` -- over the last `stable_window` steps the trader count and the
+  price (the "Price" reporter) each stayed within a relative band of
+  `stable_tol` (max - min <= tol * |max|); a window with no trades at all
+  counts as a stable price
+* ``time`` -- `time_budget` seconds of wall-clock time used
+* ``steps`` -- `step_count` steps run (the step budget; always on)
+"""
+from __future__ import annotations
+import math
+import time
+from collections import deque
+from .agents import Trader
+from .utils import price_gmean
+
+class _RollingRange:
+    """Min and max over the last `n` values (monotonic deques)."""
+    def __init__(self, n):
+        self.n = n
+        self.i = 0
+        self._lo = deque()
+        self._hi = deque()
+
+    def push(self, x):
+        i = self.i
+        while self._lo and self._lo[-1][1] >= x:
+            self._lo.pop()
+        while self._hi and self._hi[-1][1] <= x:
+            self._hi.pop()
+        self._lo.append((i, x)); self._hi.append((i, x))
+        for d in (self._lo, self._hi):
+            if d[0][0] <= i - self.n:
+                d.popleft()
+        self.i += 1
+
+    def within(self, tol) -> bool:
+        if self.i < self.n:
+            return False
+        lo, hi = self._lo[0][1], self._hi[0][1]
+        return hi - lo <= tol * abs(hi)
+
+class StopMonitor:
+    def __init__(self, extinction=False, stable_window=0, stable_tol=0.01, time_budget=None):
+        self.extinction = extinction
+        self.stable_window = stable_window
+        self.stable_tol = stable_tol
+        self.time_budget = time_budget
+        self._count = _RollingRange(stable_window) if stable_window else None
+        self._price = _RollingRange(stable_window) if stable_window else None
+        self._no_trade = 0   # consecutive steps without / with a price
+        self._traded = 0
+        self._t0 = time.perf_counter()
+
+    def check(self, model) -> str | None:
+        """Reason to stop after the step just taken, or None."""
+        n = model.schedule.get_type_count(Trader)
+        if self.extinction and n == 0:
+            return "extinction"
+        if self._count is not None:
+            self._count.push(n)
+            price = price_gmean(model)
+            if math.isnan(price):
+                self._no_trade += 1; self._traded = 0
+            else:
+                self._traded += 1; self._no_trade = 0
+                self._price.push(price)
+            w, tol = self.stable_window, self.stable_tol
+            if self._count.within(tol) and (
+                    self._no_trade >= w or (self._traded >= w and self._price.within(tol))):
+                return "stable"
+        if self.time_budget is not None and time.perf_counter() - self._t0 >= self.time_budget:
+            return "time"
+        return None
@@ -0,0 +1,135 @@
+"""Parallel multi-seed / parameter-sweep runner.
+
+    python -m sugarscape.sweep --param initial_population=100,200 \\
+        --param vision_max=4,6 --seeds 1 2 3 --steps 500 --out data/sweep
+
+Each run writes ``run-NNNNN.csv`` (model reporters) into the output directory
+as soon as it finishes, and appends one JSON line to ``manifest.jsonl``. A
+sweep starts by clearing the previous sweep's manifest, runs and summaries
+from the directory, so re-running in place never mixes two sweeps. With
+``--summary`` every finished run is also folded into per-step ensemble
+statistics for its parameter point (see `sugarscape.ensemble`), written to
+``summary-PPPPP.npz`` at the end.
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import pandas as pd
+from .landscape import load_landscape
+
+_LANDSCAPES = {}  # per worker process: {map_path: base array}
+
+def expand_grid(grid: dict) -> list[dict]:
+    """Cartesian product of {constructor kwarg: [values]}."""
+    keys = list(grid)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(grid[k] for k in keys))]
+
+def _init_worker(landscapes):
+    _LANDSCAPES.update(landscapes)
+
+def run_one(run_id, params, seed, steps, out_dir, stop=None) -> dict:
+    """Build, run and save one model; `map_path` resolves to a shared landscape.
+
+    `stop` holds `run_model` stop-condition kwargs.
+    """
+    from .model import SugarscapeG1mt
+    kwargs = dict(params)
+    base = _LANDSCAPES[kwargs.pop("map_path", None)]
+    kwargs.setdefault("width", base.shape[1])
+    kwargs.setdefault("height", base.shape[0])
+    t0 = time.perf_counter()
+    model = SugarscapeG1mt(seed=seed, landscape=base, **kwargs)
+    model.run_model(step_count=steps, **(stop or {}))
+    out = Path(out_dir) / f"run-{run_id:05d}.csv"
+    model.datacollector.get_model_vars_dataframe().to_csv(out, index=True)
+    return {"run": run_id, "seed": seed, "params": params, "steps": steps,
+            "steps_run": model.schedule.steps, "stop_reason": model.stop_reason,
+            "file": out.name, "seconds": round(time.perf_counter() - t0, 3)}
+
+def run_sweep(grid: dict, seeds, steps=1000, out_dir="data/sweep",
+              workers: int | None = None, summary=False, stop=None, **fixed) -> list[dict]:
+    """Run every grid point for every seed across a process pool.
+
+    `fixed` kwargs are passed to every model (e.g. resource_engine="array"),
+    `stop` to every `run_model` call (e.g. {"stop_on_extinction": True}).
+    Each distinct map is parsed once in the parent and handed to the workers
+    at start-up. Returns the manifest records in completion order.
+    """
+    from .ensemble import EnsembleStats
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old in [*out_dir.glob("run-*.csv"), *out_dir.glob("summary-*.npz")]:
+        old.unlink()
+    points = [{**fixed, **p} for p in expand_grid(grid)]
+    runs = [(i, p, s) for i, (p, s) in enumerate(itertools.product(points, seeds))]
+    landscapes = {m: load_landscape(m) for m in {p.get("map_path") for p in points}}
+
+    stats = [EnsembleStats() for _ in points] if summary else None
+    records = []
+    with open(out_dir / "manifest.jsonl", "w") as manifest, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(landscapes,)) as pool:
+        futures = [pool.submit(run_one, i, p, s, steps, str(out_dir), stop) for i, p, s in runs]
+        for fut in as_completed(futures):
+            rec = fut.result()
+            manifest.write(json.dumps(rec) + "\n")
+            manifest.flush()
+            records.append(rec)
+            if stats is not None:
+                stats[rec["run"] // len(seeds)].add(pd.read_csv(out_dir / rec["file"], index_col=0))
+    for i, st in enumerate(stats or []):
+        st.save(out_dir / f"summary-{i:05d}.npz", params=points[i], seeds=list(seeds))
+    return records
+
+def parse_param(text):
+    """argparse type for ``--param name=v1,v2,...``: (name, values), values as JSON."""
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"expected name=v1,v2,...: {text!r}")
+    def value(v):
+        try:
+            return json.loads(v)
+        except ValueError:
+            return v  # bare strings, e.g. map paths
+    return name.replace("-", "_"), [value(v) for v in values.split(",")]
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Run a Sugarscape parameter sweep")
+    p.add_argument("--param", type=parse_param, action="append", default=[],
+                   help="constructor kwarg and values, e.g. initial_population=100,200")
+    p.add_argument("--grid", type=Path, help="JSON file {kwarg: [values]}")
+    p.add_argument("--seeds", type=int, nargs="+", default=[123])
+    p.add_argument("--steps", type=int, default=1000)
+    p.add_argument("--out", type=Path, default=Path("data/sweep"))
+    p.add_argument("--workers", type=int, default=os.cpu_count())
+    p.add_argument("--resource-engine", choices=("agents", "array"), default="agents")
+    p.add_argument("--stop-extinction", action="store_true",
+                   help="end a run when no traders are left")
+    p.add_argument("--stable-window", type=int, default=0,
+                   help="end a run once trader count and price hold steady this many steps")
+    p.add_argument("--stable-tol", type=float, default=0.01)
+    p.add_argument("--time-budget", type=float, default=None, help="seconds per run")
+    p.add_argument("--summary", action="store_true",
+                   help="also write per-step ensemble statistics per parameter point")
+    return p.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    grid = json.loads(args.grid.read_text()) if args.grid else {}
+    for name, values in args.param:
+        grid.setdefault(name, []).extend(values)
+    records = run_sweep(grid, args.seeds, steps=args.steps, out_dir=args.out,
+                        workers=args.workers, summary=args.summary,
+                        stop={"stop_on_extinction": args.stop_extinction,
+                              "stable_window": args.stable_window,
+                              "stable_tol": args.stable_tol, "time_budget": args.time_budget},
+                        resource_engine=args.resource_engine)
+    print(f"Saved {len(records)} runs to {args.out}/ (manifest.jsonl)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+import math
+import numpy as np
+
+def welfare_array(sugar, spice, metabolism_sugar, metabolism_spice):
+    """Trader.calculate_welfare over whole arrays (0 where metabolism is 0)."""
+    m_total = np.asarray(metabolism_sugar + metabolism_spice, dtype=float)
+    ok = m_total > 0
+    safe = np.where(ok, m_total, 1.0)
+    w = (np.maximum(0.0, np.asarray(sugar, dtype=float)) ** (metabolism_sugar / safe)
+         * np.maximum(0.0, np.asarray(spice, dtype=float)) ** (metabolism_spice / safe))
+    return np.where(ok, w, 0.0)
+
+def solve_pair(s_su, s_sp, s_msu, s_msp, n_su, n_sp, n_msu, n_msp,
+               max_rounds=64, min_gain=1e-12, rejects=None):
+    """Resolve one bilateral trade on plain scalars.
+
+    Runs the same exchange sequence as Trader.trade/maybe_sell_resource, but
+    with the MRS, welfare and amount rules inlined and each MRS computed once
+    per round. Arithmetic is done operation for operation like the object
+    path, so the result is bit-identical -- including exchange_resource
+    always crediting sugar to the initiator, whichever side is selling.
+
+    Returns (s_su, s_sp, n_su, n_sp, prices) with one price per round. If
+    `rejects` is a dict, the ``reject_<reason>`` entry matching the refusal
+    that ended the exchange (see `Instruments`) is incremented.
+    """
+    eps = 1e-9
+    s_mt = s_msu + s_msp
+    n_mt = n_msu + n_msp
+    s_cd = s_mt > 0
+    n_cd = n_mt > 0
+    if s_cd:
+        s_a_su = s_msu / s_mt; s_a_sp = s_msp / s_mt
+    if n_cd:
+        n_a_su = n_msu / n_mt; n_a_sp = n_msp / n_mt
+    # metabolisms clamped for MRS (max(m, eps) == max(eps, m))
+    s_msu_c = max(s_msu, eps); s_msp_c = max(s_msp, eps)
+    n_msu_c = max(n_msu, eps); n_msp_c = max(n_msp, eps)
+
+    prices = []
+    reason = None
+    while len(prices) < max_rounds:
+        if (s_su <= 0 and s_sp <= 0) or (n_su <= 0 and n_sp <= 0):
+            break
+        m_self = (max(s_sp, eps) / s_msp_c) / (max(s_su, eps) / s_msu_c)
+        m_nbor = (max(n_sp, eps) / n_msp_c) / (max(n_su, eps) / n_msu_c)
+        if not (math.isfinite(m_self) and math.isfinite(m_nbor)): break
+        if math.isclose(m_self, m_nbor, rel_tol=1e-9, abs_tol=1e-12): break
+        price = math.sqrt(m_self * m_nbor)
+        if not (math.isfinite(price) and price > 0): break
+        if price <= eps:
+            reason = "price"; break
+
+        if price >= 1:
+            su_ex, sp_ex = 1, max(1, int(round(price)))
+        else:
+            su_ex, sp_ex = max(1, int(round(1.0 / price))), 1
+        if m_self > m_nbor:  # initiator sells spice
+            self_su = s_su + su_ex; self_sp = s_sp + -sp_ex
+            nbor_su = n_su + -su_ex; nbor_sp = n_sp + sp_ex
+        else:                # initiator sells sugar
+            self_su = s_su + -su_ex; self_sp = s_sp + sp_ex
+            nbor_su = n_su + su_ex; nbor_sp = n_sp + -sp_ex
+        if min(self_su, self_sp, nbor_su, nbor_sp) < 0:
+            reason = "negative"; break
+
+        if s_cd:
+            w_self = (max(0.0, float(s_su)) ** s_a_su) * (max(0.0, float(s_sp)) ** s_a_sp)
+            ws_new = (max(0.0, float(self_su)) ** s_a_su) * (max(0.0, float(self_sp)) ** s_a_sp)
+        else:
+            w_self = ws_new = 0.0
+        if n_cd:
+            w_nbor = (max(0.0, float(n_su)) ** n_a_su) * (max(0.0, float(n_sp)) ** n_a_sp)
+            wn_new = (max(0.0, float(nbor_su)) ** n_a_su) * (max(0.0, float(nbor_sp)) ** n_a_sp)
+        else:
+            w_nbor = wn_new = 0.0
+        if (ws_new - w_self) < min_gain or (wn_new - w_nbor) < min_gain:
+            reason = "welfare"; break
+
+        mrs_self_a = (self_sp / s_msp_c) / (self_su / s_msu_c)
+        mrs_nbor_a = (nbor_sp / n_msp_c) / (nbor_su / n_msu_c)
+        if m_self > m_nbor:
+            if not mrs_self_a >= mrs_nbor_a:
+                reason = "mrs"; break
+        else:
+            if not (m_self < m_nbor and mrs_self_a <= mrs_nbor_a):
+                reason = "mrs"; break
+
+        # exchange_resource
+        s_su += su_ex; s_sp -= sp_ex
+        n_su -= su_ex; n_sp += sp_ex
+        prices.append(price)
+    if rejects is not None and reason is not None:
+        rejects["reject_" + reason] += 1
+    return s_su, s_sp, n_su, n_sp, prices
+
+REJECT_REASONS = ("price", "negative", "welfare", "mrs")
+
+def _welfare_gain(su, sp, new_su, new_sp, a_su, a_sp, cd):
+    """(new - old) welfare on arrays, and a bound on its error against Python's pow."""
+    old = np.maximum(0.0, su) ** a_su * np.maximum(0.0, sp) ** a_sp
+    new = np.maximum(0.0, new_su) ** a_su * np.maximum(0.0, new_sp) ** a_sp
+    old = np.where(cd, old, 0.0); new = np.where(cd, new, 0.0)
+    # NumPy's SIMD pow is within an ulp of libm's; a product of two is within a few
+    return new - old, 8 * np.finfo(float).eps * (old + new)
+
+def _exact_gain(su, sp, new_su, new_sp, msu, msp):
+    """solve_pair's welfare gain on Python floats, for one side of one pair."""
+    mt = msu + msp
+    if not mt > 0:
+        return 0.0
+    a_su = msu / mt; a_sp = msp / mt
+    return ((max(0.0, new_su) ** a_su) * (max(0.0, new_sp) ** a_sp)
+            - (max(0.0, su) ** a_su) * (max(0.0, sp) ** a_sp))
+
+def solve_pairs(s_su, s_sp, s_msu, s_msp, n_su, n_sp, n_msu, n_msp,
+                max_rounds=64, min_gain=1e-12):
+    """`solve_pair` for many disjoint pairs at once, one array element per pair.
+
+    Every rule is applied elementwise with the same operations, so each
+    pair ends exactly where `solve_pair` would leave it. The one exception
+    would be welfare, whose pow NumPy may round differently from Python's:
+    gains too close to `min_gain` to decide that way are recomputed with
+    Python floats.
+
+    Returns (s_su, s_sp, n_su, n_sp, prices, rounds, reason) where
+    ``prices[k, :rounds[k]]`` are pair k's prices and ``reason[k]`` indexes
+    `REJECT_REASONS` for the refusal that ended its exchange (-1 for none).
+    """
+    eps = 1e-9
+    s_su, s_sp, n_su, n_sp = (np.array(a, dtype=float) for a in (s_su, s_sp, n_su, n_sp))
+    s_msu, s_msp, n_msu, n_msp = (np.asarray(a, dtype=float) for a in (s_msu, s_msp, n_msu, n_msp))
+    k = s_su.size
+    s_mt = s_msu + s_msp
+    n_mt = n_msu + n_msp
+    s_cd = s_mt > 0
+    n_cd = n_mt > 0
+    s_safe = np.where(s_cd, s_mt, 1.0); n_safe = np.where(n_cd, n_mt, 1.0)
+    s_a_su = s_msu / s_safe; s_a_sp = s_msp / s_safe
+    n_a_su = n_msu / n_safe; n_a_sp = n_msp / n_safe
+    s_msu_c = np.maximum(s_msu, eps); s_msp_c = np.maximum(s_msp, eps)
+    n_msu_c = np.maximum(n_msu, eps); n_msp_c = np.maximum(n_msp, eps)
+
+    paid = []   # (pairs that exchanged, their price), per round
+    rounds = np.zeros(k, dtype=np.int64)
+    reason = np.full(k, -1)
+    live = np.arange(k)
+    r = 0
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        while live.size and r < max_rounds:
+            i = live
+            go = ~(((s_su[i] <= 0) & (s_sp[i] <= 0)) | ((n_su[i] <= 0) & (n_sp[i] <= 0)))
+            m_self = (np.maximum(s_sp[i], eps) / s_msp_c[i]) / (np.maximum(s_su[i], eps) / s_msu_c[i])
+            m_nbor = (np.maximum(n_sp[i], eps) / n_msp_c[i]) / (np.maximum(n_su[i], eps) / n_msu_c[i])
+            go &= np.isfinite(m_self) & np.isfinite(m_nbor)
+            # math.isclose(m_self, m_nbor, rel_tol=1e-9, abs_tol=1e-12)
+            go &= ~((m_self == m_nbor) | (np.abs(m_self - m_nbor) <= np.maximum(
+                1e-9 * np.maximum(np.abs(m_self), np.abs(m_nbor)), 1e-12)))
+            price = np.sqrt(m_self * m_nbor)
+            go &= np.isfinite(price) & (price > 0)
+            stop = go & (price <= eps)
+            reason[i[stop]] = 0; go &= ~stop
+
+            up = price >= 1
+            su_ex = np.where(up, 1.0, np.maximum(1.0, np.rint(1.0 / price)))
+            sp_ex = np.where(up, np.maximum(1.0, np.rint(price)), 1.0)
+            sells_spice = m_self > m_nbor
+            sgn = np.where(sells_spice, 1.0, -1.0)
+            self_su = s_su[i] + sgn * su_ex; self_sp = s_sp[i] - sgn * sp_ex
+            nbor_su = n_su[i] - sgn * su_ex; nbor_sp = n_sp[i] + sgn * sp_ex
+            stop = go & (np.minimum(np.minimum(self_su, self_sp), np.minimum(nbor_su, nbor_sp)) < 0)
+            reason[i[stop]] = 1; go &= ~stop
+
+            gs, tol_s = _welfare_gain(s_su[i], s_sp[i], self_su, self_sp, s_a_su[i], s_a_sp[i], s_cd[i])
+            gn, tol_n = _welfare_gain(n_su[i], n_sp[i], nbor_su, nbor_sp, n_a_su[i], n_a_sp[i], n_cd[i])
+            for q in np.flatnonzero(go & ((np.abs(gs - min_gain) <= tol_s)
+                                          | (np.abs(gn - min_gain) <= tol_n))).tolist():
+                p = i[q]
+                gs[q] = _exact_gain(float(s_su[p]), float(s_sp[p]), float(self_su[q]),
+                                    float(self_sp[q]), float(s_msu[p]), float(s_msp[p]))
+                gn[q] = _exact_gain(float(n_su[p]), float(n_sp[p]), float(nbor_su[q]),
+                                    float(nbor_sp[q]), float(n_msu[p]), float(n_msp[p]))
+            stop = go & ((gs < min_gain) | (gn < min_gain))
+            reason[i[stop]] = 2; go &= ~stop
+
+            mrs_self_a = (self_sp / s_msp_c[i]) / (self_su / s_msu_c[i])
+            mrs_nbor_a = (nbor_sp / n_msp_c[i]) / (nbor_su / n_msu_c[i])
+            ok = np.where(sells_spice, mrs_self_a >= mrs_nbor_a,
+                          (m_self < m_nbor) & (mrs_self_a <= mrs_nbor_a))
+            stop = go & ~ok
+            reason[i[stop]] = 3; go &= ~stop
+
+            # exchange_resource
+            done = i[go]
+            s_su[done] += su_ex[go]; s_sp[done] -= sp_ex[go]
+            n_su[done] -= su_ex[go]; n_sp[done] += sp_ex[go]
+            paid.append((done, price[go]))
+            rounds[done] += 1
+            live = done
+            r += 1
+    prices = np.zeros((k, r))
+    for c, (done, p) in enumerate(paid):
+        prices[done, c] = p
+    return s_su, s_sp, n_su, n_sp, prices, rounds, reason
@@ -27,6 +27,15 @@ def geometric_mean(xs):
 
 # DataCollector helpers (wired by model)
 def trade_volume_unique(m):
+    # unique trading pairs this step, maintained by model.record_trade
+    return len(m.trade_pairs)
+
+def price_gmean(m):
+    # geometric mean of this step's prices from the running log-sum
+    return math.exp(m.log_price_sum / m.price_count) if m.price_count else float("nan")
+
+# reference versions that rescan every trader (for cross-checks)
+def trade_volume_from_agents(m):
     from .agents import Trader
     traders = m.schedule.agents_by_type.get(Trader, {}).values()
     edges = set()
@@ -36,7 +45,7 @@ def trade_volume_unique(m):
             edges.add(pair)
     return len(edges)
 
-def price_gmean(m):
+def price_gmean_from_agents(m):
     from .agents import Trader
     traders = m.schedule.agents_by_type.get(Trader, {}).values()
     prices = [p for a in traders for p in a.prices]
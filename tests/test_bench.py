@@ -0,0 +1,17 @@
+from sugarscape.bench import bench_case, compare
+from sugarscape.landscape import synthetic_landscape, tile_landscape
+from sugarscape.model import SugarscapeG1mt
+
+def test_synthetic_landscape_shape_and_levels():
+    a = synthetic_landscape(120, 80)
+    assert a.shape == (80, 120)
+    assert a.min() == 0 and a.max() == 4
+    assert tile_landscape(a, 2, 3).shape == (240, 240)
+
+def test_bench_case_times_every_phase():
+    rec = bench_case(30, 20, 40, steps=2, seed=1, resource_engine="array")
+    assert set(rec["phase_seconds"]) == set(SugarscapeG1mt.PHASES)
+    assert rec["steps_per_sec"] > 0 and rec["peak_memory_mb"] > 0
+    assert sum(rec["phase_seconds"].values()) <= rec["step_seconds"]
+    assert rec["counters"]["cells_scanned"] > 0 and rec["params"] == {"resource_engine": "array"}
+    assert compare({"results": [rec]}, {"results": [rec]})[0]["speedup"] == 1.0
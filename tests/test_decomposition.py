@@ -0,0 +1,126 @@
+import os
+import numpy as np
+import pytest
+from sugarscape.checkpoint import load_checkpoint, save_checkpoint
+from sugarscape.kernels import trade_pair
+from sugarscape.landscape import synthetic_landscape
+from sugarscape.model import SugarscapeG1mt
+from sugarscape.trading import solve_pair
+
+@pytest.fixture
+def uncompiled(monkeypatch):
+    # the engines need numba; without it the kernels run as plain Python,
+    # which is slow but enough to check the engine logic
+    from sugarscape import kernels
+    monkeypatch.setattr(kernels, "HAVE_NUMBA", True)
+
+def _model(workers, **kw):
+    kw.setdefault("seed", 9)
+    return SugarscapeG1mt(width=48, height=30, landscape=synthetic_landscape(48, 30),
+                          initial_population=120, resource_engine="array",
+                          trader_store="columnar", step_engine="parallel", workers=workers, **kw)
+
+def _state(m):
+    s = m.snapshot()
+    return [s[k] for k in ("sugar", "spice", "trader_id", "trader_x", "trader_y", "welfare")]
+
+@pytest.mark.usefixtures("uncompiled")
+def test_parallel_engine_is_independent_of_worker_count():
+    a, b = _model(1), _model(2)
+    a.run_model(4); b.run_model(4)
+    b.close()
+    assert all(np.array_equal(x, y) for x, y in zip(_state(a), _state(b)))
+    mv = a.datacollector.get_model_vars_dataframe()
+    assert mv.equals(b.datacollector.get_model_vars_dataframe())
+    assert mv["Volume"].sum() > 0
+    # the occupancy index and grid stay in sync with the columns
+    for t in a.traders.agents:
+        assert t in a.grid.get_cell_list_contents([t.pos])
+    assert a.occupancy.count.sum() == a.traders.n
+
+@pytest.mark.usefixtures("uncompiled")
+def test_parallel_engine_checkpoint_resume(tmp_path):
+    ref = _model(1, seed=None)
+    ref.run_model(2)
+    save_checkpoint(ref, tmp_path / "c.npz")
+    ref.run_model(2)
+    resumed = load_checkpoint(tmp_path / "c.npz")
+    resumed.run_model(2)
+    assert all(np.array_equal(x, y) for x, y in zip(_state(ref), _state(resumed)))
+
+@pytest.mark.usefixtures("uncompiled")
+def test_parallel_engine_rejects_unsupported_setups():
+    with pytest.raises(ValueError):
+        SugarscapeG1mt(step_engine="parallel")  # needs array resources + columnar traders
+    with pytest.raises(ValueError):
+        SugarscapeG1mt(width=20, height=20, landscape=np.zeros((20, 20)), resource_engine="array",
+                       trader_store="columnar", step_engine="parallel")
+
+def test_trade_pair_kernel_matches_solve_pair():
+    rng = np.random.default_rng(0)
+    buf = np.empty(64)
+    for _ in range(300):
+        su, sp, nsu, nsp = rng.integers(0, 40, 4).astype(float)
+        msu, msp, nmsu, nmsp = rng.integers(1, 4, 4)
+        ref = solve_pair(su, sp, msu, msp, nsu, nsp, nmsu, nmsp)
+        a_su, a_sp, b_su, b_sp, k, _ = trade_pair(su, sp, msu, msp, nsu, nsp, nmsu, nmsp,
+                                                  64, 1e-12, buf, 0)
+        assert (a_su, a_sp, b_su, b_sp) == ref[:4] and buf[:k].tolist() == ref[4]
+
+def _jit_model(seed, engine):
+    return SugarscapeG1mt(width=40, height=40, landscape=synthetic_landscape(40, 40), seed=seed,
+                          initial_population=150, resource_engine="array",
+                          trader_store="columnar", trade_solver="fast", step_engine=engine)
+
+@pytest.mark.usefixtures("uncompiled")
+def test_jit_engine_matches_serial_statistically():
+    stats = {}
+    for engine in ("serial", "jit"):
+        runs = []
+        for seed in (1, 2, 3):
+            m = _jit_model(seed, engine)
+            m.run_model(6)
+            runs.append(m.datacollector.get_model_vars_dataframe()[["Trader", "Volume"]].mean())
+        stats[engine] = sum(runs) / len(runs)
+    assert m.step_engine == "jit" and m.occupancy.count.sum() == m.traders.n
+    assert np.allclose(stats["jit"], stats["serial"], rtol=0.1)
+
+    a, b = _jit_model(4, "jit"), _jit_model(4, "jit")
+    a.run_model(3); b.run_model(3)
+    assert all(np.array_equal(x, y) for x, y in zip(_state(a), _state(b)))
+
+@pytest.mark.parametrize("engine", ["jit", "parallel"])
+def test_engines_fall_back_without_numba(monkeypatch, engine):
+    from sugarscape import kernels
+    monkeypatch.setattr(kernels, "HAVE_NUMBA", False)
+    with pytest.warns(RuntimeWarning):
+        m = _jit_model(1, engine)
+    assert m.engine is None and m.step_engine == "serial"
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 4, reason="needs 4 cores")
+def test_parallel_engine_beats_serial():
+    pytest.importorskip("numba")
+    from sugarscape.bench import bench_case
+    kw = dict(seed=1, memory=False, resource_engine="array", trader_store="columnar")
+    bench_case(60, 60, 300, steps=1, step_engine="parallel", workers=4, **kw)  # compile
+    serial = bench_case(240, 240, 12000, steps=5, step_engine="serial", **kw)
+    par = bench_case(240, 240, 12000, steps=5, step_engine="parallel", workers=4, **kw)
+    assert par["steps_per_sec"] > 2 * serial["steps_per_sec"]
+
+def test_jit_engine_orders_traders_with_model_random():
+    pytest.importorskip("numba")
+    from sugarscape import kernels
+    assert kernels.HAVE_NUMBA and hasattr(kernels.trade_pass, "py_func")  # compiled
+    a, b = _jit_model(5, "jit"), _jit_model(5, "jit")
+    b.random.seed(6)   # only model.random drives the order and tie-breaks
+    a.run_model(3); b.run_model(3)
+    assert not all(np.array_equal(x, y) for x, y in zip(_state(a), _state(b)))
+
+def test_jit_engine_beats_serial():
+    pytest.importorskip("numba")
+    from sugarscape.bench import bench_case
+    kw = dict(seed=1, memory=False, resource_engine="array", trader_store="columnar")
+    bench_case(60, 60, 300, steps=1, step_engine="jit", **kw)  # compile
+    serial = bench_case(200, 200, 5000, steps=5, step_engine="serial", **kw)
+    jit = bench_case(200, 200, 5000, steps=5, step_engine="jit", **kw)
+    assert jit["steps_per_sec"] > 10 * serial["steps_per_sec"]   # ~20-30x measured
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from sugarscape.ensemble import EnsembleStats, load_summary, summarize_sweep
+from sugarscape.sweep import run_sweep
+
+def test_online_stats_match_numpy():
+    rng = np.random.default_rng(0)
+    data = rng.lognormal(size=(400, 12))
+    data[3, 5] = np.nan
+    stats = EnsembleStats(quantiles=(0.1, 0.5, 0.9))
+    for i, row in enumerate(data):
+        n = 12 if i % 2 else 9  # runs of different lengths
+        stats.add(pd.DataFrame({"Price": row[:n]}))
+    full = data.copy()
+    full[::2, 9:] = np.nan
+    s = stats.summary()["Price"]
+    assert s["count"].tolist() == np.isfinite(full).sum(axis=0).tolist()
+    assert np.allclose(s["mean"], np.nanmean(full, axis=0))
+    assert np.allclose(s["var"], np.nanvar(full, axis=0, ddof=1))
+    for p in (0.1, 0.5, 0.9):
+        exact = np.nanquantile(full, p, axis=0)
+        assert np.median(np.abs(s[f"q{p:g}"] - exact) / exact) < 0.05
+
+    few = EnsembleStats()
+    for row in data[:3]:
+        few.add(pd.DataFrame({"Price": row}))
+    assert np.allclose(few.summary()["Price"]["q0.5"], np.median(data[:3], axis=0))
+
+def test_sweep_summary(tmp_path):
+    run_sweep({"initial_population": [20, 30]}, seeds=[1, 2, 3], steps=3, out_dir=tmp_path,
+              workers=2, summary=True, resource_engine="array")
+    meta, df = load_summary(tmp_path / "summary-00001.npz")
+    assert meta["runs"] == 3 and meta["params"]["initial_population"] == 30
+    assert set(meta["names"]) == {"Trader", "Volume", "Price"}
+    runs = [pd.read_csv(f, index_col=0) for f in sorted(tmp_path.glob("run-*.csv"))[3:]]
+    assert np.allclose(df[("Trader", "mean")], np.mean([r["Trader"] for r in runs], axis=0))
+    summarize_sweep(tmp_path)
+    _, again = load_summary(tmp_path / "summary-00001.npz")
+    assert again.equals(df)
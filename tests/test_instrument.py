@@ -0,0 +1,34 @@
+import pytest
+from sugarscape.model import SugarscapeG1mt
+
+def _run(steps=4, **kw):
+    m = SugarscapeG1mt(seed=11, initial_population=150, resource_engine="array", **kw)
+    m.run_model(steps)
+    return m
+
+def test_instrumented_run_is_unchanged_and_counts():
+    plain, inst = _run(), _run(instrument="on")
+    pd_a = plain.datacollector.get_model_vars_dataframe()
+    pd_b = inst.datacollector.get_model_vars_dataframe()
+    assert pd_a.equals(pd_b)
+    rec = inst.instruments.last
+    assert rec["step"] == 4
+    assert rec["cells_scanned"] > 0 and rec["trades"] > 0
+    # dead traders' trades drop out of the price statistics, not the counter
+    assert rec["trade_rounds"] >= inst.price_count > 0
+    assert inst.instruments.totals["removed"] == 150 - pd_b["Trader"].iloc[-1]
+    assert all(rec[f"time_{p}"] >= 0 for p in SugarscapeG1mt.PHASES)
+
+@pytest.mark.parametrize("kw", [{"trade_solver": "fast"}, {"movement_engine": "vectorized"}])
+def test_counters_match_across_engines(kw):
+    ref, other = _run(instrument="on"), _run(instrument="on", **kw)
+    strip = lambda r: {k: v for k, v in r.items() if not k.startswith("time_")}
+    assert strip(ref.instruments.totals) == strip(other.instruments.totals)
+
+def test_collect_mode_adds_columns():
+    m = _run(steps=3, instrument="collect")
+    mv = m.datacollector.get_model_vars_dataframe()
+    assert {"cells_scanned", "trade_rounds", "reject_welfare", "time_move_harvest"} <= set(mv.columns)
+    assert mv["trade_rounds"].iloc[-1] == m.instruments.last["trade_rounds"]
+    with pytest.raises(ValueError):
+        SugarscapeG1mt(instrument="yes")
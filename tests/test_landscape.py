@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from sugarscape.landscape import load_landscape, save_landscape
+from sugarscape.model import SugarscapeG1mt
+
+def test_text_maps_are_cached_by_content(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUGARSCAPE_CACHE_DIR", str(tmp_path / "cache"))
+    src = tmp_path / "map.txt"
+    src.write_text("0 1 2\n3 4 0\n")
+    first = load_landscape(src)
+    assert isinstance(first, np.memmap) and first.tolist() == [[0, 1, 2], [3, 4, 0]]
+    assert len(list((tmp_path / "cache").glob("*.npy"))) == 1
+    src.write_text("1 1 1\n1 1 1\n")  # new contents, new cache entry
+    assert load_landscape(src).tolist() == [[1, 1, 1], [1, 1, 1]]
+    assert len(list((tmp_path / "cache").glob("*.npy"))) == 2
+
+def test_cache_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv("SUGARSCAPE_CACHE_DIR", raising=False)
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    src = tmp_path / "map.txt"
+    src.write_text("0 1\n2 3\n")
+    assert not isinstance(load_landscape(src), np.memmap)
+    SugarscapeG1mt(initial_population=0)
+    assert not (tmp_path / "home").exists()
+    assert isinstance(load_landscape(src, cache_dir=tmp_path / "c"), np.memmap)
+    monkeypatch.setenv("SUGARSCAPE_CACHE_DIR", str(tmp_path / "env"))
+    load_landscape()   # the bundled map is never cached
+    assert not (tmp_path / "env").exists()
+
+def test_npy_map_path_matches_text(tmp_path):
+    npy = save_landscape(load_landscape(), tmp_path / "sugar-map.npy")
+    assert isinstance(load_landscape(npy), np.memmap)
+    a = SugarscapeG1mt(seed=4, initial_population=30, map_path=npy, resource_engine="array")
+    b = SugarscapeG1mt(seed=4, initial_population=30, resource_engine="array")
+    assert np.array_equal(a.sugar_capacity, b.sugar_capacity)
+    assert np.array_equal(a.spice_capacity, b.spice_capacity)
+
+def test_map_shape_must_match_grid(tmp_path):
+    npy = save_landscape(np.zeros((80, 80)), tmp_path / "big.npy")
+    for engine in ("agents", "array"):
+        with pytest.raises(ValueError, match="does not match"):
+            SugarscapeG1mt(initial_population=5, map_path=npy, resource_engine=engine)
+    SugarscapeG1mt(initial_population=5, width=80, height=80, map_path=npy)
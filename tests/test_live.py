@@ -0,0 +1,41 @@
+import time
+import pytest
+from sugarscape.live import SimulationWorker
+
+KW = dict(seed=3, initial_population=40, resource_engine="array")
+
+def test_worker_skips_frames_but_keeps_series():
+    with SimulationWorker(KW, mode="thread", max_queue=2, max_steps=12) as w:
+        w._worker.join(60)       # let it finish without reading anything
+        snap = w.latest(timeout=5)
+    assert snap["step"] == 12 and snap["trader_x"].size > 0
+    # only two snapshots fit; the dropped ones' reporter rows were carried over
+    assert [s for s, _ in snap["series"]] == list(range(1, 13))
+    assert set(snap["series"][0][1]) == {"Trader", "Volume", "Price"}
+    assert w.skipped == w.received - 1 >= 1
+
+def test_carried_series_is_capped(monkeypatch):
+    from sugarscape import live
+    monkeypatch.setattr(live, "HISTORY", 5)
+    with SimulationWorker(KW, mode="thread", max_queue=2, max_steps=12) as w:
+        w._worker.join(60)
+        snap = w.latest(timeout=5)
+    assert [s for s, _ in snap["series"]] == list(range(8, 13))
+
+def test_worker_pause_and_process_mode():
+    w = SimulationWorker(KW, every=2, start=False)
+    try:
+        first = w.latest(timeout=60)
+        assert first["step"] == 0 and not w.running
+        time.sleep(0.3)
+        assert w.latest(timeout=0.1) is None     # paused: nothing new
+        w.resume()
+        snap = w.latest(timeout=60)
+        assert snap["step"] % 2 == 0 and snap["step"] > 0
+    finally:
+        w.close()
+
+def test_worker_reports_errors():
+    with SimulationWorker(dict(KW, resource_engine="bogus"), mode="thread") as w:
+        with pytest.raises(RuntimeError, match="resource_engine"):
+            w.latest(timeout=10)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from sugarscape import SugarscapeG1mt, Trader
+from sugarscape.landscape import synthetic_landscape
+from sugarscape.trading import REJECT_REASONS, solve_pair, solve_pairs
+
+def test_solve_pairs_matches_solve_pair():
+    rng = np.random.default_rng(4)
+    k = 3000
+    args = [rng.integers(lo, hi, k) for _ in range(2) for lo, hi in ((0, 60), (0, 60), (1, 6), (1, 6))]
+    su, sp, nsu, nsp, prices, rounds, reason = solve_pairs(*args)
+    for q in range(k):
+        rejects = {f"reject_{r}": 0 for r in REJECT_REASONS}
+        a, b, c, d, ps = solve_pair(*(int(x[q]) for x in args), rejects=rejects)
+        assert (a, b, c, d) == (su[q], sp[q], nsu[q], nsp[q])
+        assert ps == prices[q, :rounds[q]].tolist()
+        hit = [r for r, n in rejects.items() if n]
+        assert hit == ([f"reject_{REJECT_REASONS[reason[q]]}"] if reason[q] >= 0 else [])
+    assert rounds.max() > 1
+
+def _state(m):
+    ts = m.schedule.agents_by_type.get(Trader, {}).values()
+    return [(t.unique_id, t.pos, t.sugar, t.spice, type(t.sugar), t.prices, t.trade_partners)
+            for t in ts]
+
+@pytest.mark.parametrize("kw", [
+    dict(),
+    dict(resource_engine="array", trader_store="columnar", trade_solver="fast"),
+    # vision wraps around the small torus
+    dict(width=20, height=12, landscape=synthetic_landscape(20, 12), vision_max=7,
+         initial_population=250),
+])
+def test_ordered_matching_is_bit_identical(kw):
+    kw = {"seed": 2, "initial_population": 150, "instrument": "on", **kw}
+    a = SugarscapeG1mt(**kw)
+    b = SugarscapeG1mt(trade_matching="ordered", **kw)
+    a.run_model(6); b.run_model(6)
+    assert _state(a) == _state(b)
+    assert a.datacollector.get_model_vars_dataframe().equals(b.datacollector.get_model_vars_dataframe())
+    ta = {k: v for k, v in a.instruments.totals.items() if not k.startswith("time")}
+    tb = {k: v for k, v in b.instruments.totals.items() if not k.startswith("time")}
+    assert ta == tb and ta["trade_rounds"] > 0
+
+def test_pairs_matching_trades_each_pair_once():
+    kw = dict(seed=2, initial_population=300, instrument="on")
+    m = SugarscapeG1mt(trade_matching="pairs", **kw)
+    m.run_model(1)
+    ref = SugarscapeG1mt(**kw)
+    ref.run_model(1)
+    assert 0 < m.instruments.last["trades"] < ref.instruments.last["trades"]
+    assert m.price_count > 0
+    m.run_model(10)
+    for t in m.schedule.agents_by_type[Trader].values():
+        assert t.sugar >= 0 and t.spice >= 0
+        assert len(t.prices) == len(t.trade_partners)
+    assert m.datacollector.get_model_vars_dataframe()["Trader"].iloc[-1] > 0
+
+def test_matching_option_validation():
+    with pytest.raises(ValueError):
+        SugarscapeG1mt(trade_matching="greedy")
+    with pytest.raises(ValueError):
+        SugarscapeG1mt(trade_matching="ordered", resource_engine="array",
+                       trader_store="columnar", step_engine="parallel")
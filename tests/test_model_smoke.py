@@ -1,6 +1,157 @@
+import pytest
 from sugarscape import SugarscapeG1mt
 
 def test_model_smoke():
     m = SugarscapeG1mt(seed=1)
     m.step()
     assert m.schedule.steps == 1
+
+def test_array_resources_match_agent_patches():
+    kw = dict(seed=7, initial_population=60)
+    a = SugarscapeG1mt(**kw)
+    b = SugarscapeG1mt(resource_engine="array", **kw)
+    for _ in range(3):
+        a.step(); b.step()
+    ma = a.datacollector.get_model_vars_dataframe()
+    mb = b.datacollector.get_model_vars_dataframe()
+    assert ma.equals(mb)
+    assert a.get_sugar_amount_at((10, 20)) == b.get_sugar_amount_at((10, 20))
+
+def test_occupancy_index_tracks_grid():
+    from sugarscape import Trader
+    m = SugarscapeG1mt(seed=3, initial_population=150, resource_engine="array")
+    for _ in range(2):
+        m.step()
+    for x in range(m.width):
+        for y in range(m.height):
+            ts = [a for a in m.grid.get_cell_list_contents((x, y)) if isinstance(a, Trader)]
+            assert m.occupancy.count[y, x] == len(ts)
+            assert m.trader_at((x, y)) is (ts[0] if ts else None)
+
+def test_vectorized_movement_is_bit_identical():
+    kw = dict(seed=11, initial_population=80, resource_engine="array")
+    a = SugarscapeG1mt(**kw)
+    b = SugarscapeG1mt(movement_engine="vectorized", **kw)
+    for _ in range(3):
+        a.step(); b.step()
+    assert a.datacollector.get_model_vars_dataframe().equals(
+        b.datacollector.get_model_vars_dataframe())
+    pos = lambda m: [(t.pos, t.sugar, t.spice) for t in m._randomize_traders()]
+    assert pos(a) == pos(b)
+
+def test_columnar_traders_match_objects():
+    kw = dict(seed=5, initial_population=120, resource_engine="array",
+              metabolism_min=3, metabolism_max=6)
+    a = SugarscapeG1mt(**kw)
+    b = SugarscapeG1mt(trader_store="columnar", **kw)
+    everyone = list(b.traders.agents)
+    for _ in range(3):
+        a.step(); b.step()
+    dead = [t for t in everyone if t not in b.traders.agents]
+    assert dead and all(t._row is None and t.pos is None for t in dead)
+    with pytest.raises(RuntimeError):
+        dead[0].sugar
+    ma = a.datacollector.get_model_vars_dataframe()
+    assert ma["Trader"].iloc[-1] < 120  # deaths exercised the row compaction
+    assert ma.equals(b.datacollector.get_model_vars_dataframe())
+    from sugarscape import Trader
+    cols = b.traders
+    assert len(cols) == b.schedule.get_type_count(Trader)
+    assert all(cols.agents[t._row] is t for t in cols.agents)
+    assert [float(t.sugar) for t in a._randomize_traders()] == \
+        [float(t.sugar) for t in b._randomize_traders()]
+
+def test_fast_trade_solver_validates_against_iterative():
+    m = SugarscapeG1mt(seed=9, initial_population=150, integerize_maps=False,
+                       resource_engine="array", trade_solver="validate")
+    for _ in range(3):
+        m.step()  # raises if any pair diverges
+    assert m.datacollector.get_model_vars_dataframe()["Volume"].sum() > 0
+
+def test_streaming_collector_round_trip(tmp_path):
+    from sugarscape.collectors import CollectorReader
+    kw = dict(seed=2, initial_population=60, resource_engine="array")
+    a = SugarscapeG1mt(**kw)
+    b = SugarscapeG1mt(collector_dir=tmp_path, collector_flush_every=2,
+                       collector_intervals={"Trade Network": 2}, **kw)
+    a.run_model(5); b.run_model(5)
+    r = CollectorReader(tmp_path)
+    assert len(r.chunks) == 3
+    mv = r.model_vars()
+    assert list(mv.index) == [1, 2, 3, 4, 5]
+    assert (mv.values == a.datacollector.get_model_vars_dataframe().values).all()
+    av = r.agent_vars("Trade Network", steps=(4, 5))
+    assert set(av.index.get_level_values("Step")) == {4}
+    assert len(av) == mv.loc[4, "Trader"]
+
+    c = SugarscapeG1mt(collector_dir=tmp_path, collector_flush_every=2, **kw)
+    c.run_model(3)
+    r = CollectorReader(tmp_path)
+    assert len(r.chunks) == 2
+    assert list(r.model_vars().index) == [1, 2, 3]
+
+def test_incremental_trade_stats_match_rescan():
+    import math
+    from sugarscape.utils import trade_volume_from_agents, price_gmean_from_agents
+    m = SugarscapeG1mt(seed=5, initial_population=120, resource_engine="array",
+                       metabolism_min=3, metabolism_max=6, trade_solver="fast")
+    for _ in range(4):
+        m.step()
+        mv = m.datacollector.get_model_vars_dataframe().iloc[-1]
+        assert mv["Volume"] == trade_volume_from_agents(m)
+        ref = price_gmean_from_agents(m)
+        assert math.isclose(mv["Price"], ref, rel_tol=1e-12) or (math.isnan(ref) and math.isnan(mv["Price"]))
+    assert mv["Trader"] < 120
+
+def test_vectorized_init_is_statistically_equivalent():
+    import numpy as np
+    from sugarscape import Trader
+    n = 4000
+    def population(**kw):
+        m = SugarscapeG1mt(seed=21, initial_population=n, resource_engine="array",
+                           vision_min=2, vision_max=6, **kw)
+        ts = list(m.schedule.agents_by_type[Trader].values())
+        assert m.occupancy.count.sum() == n == len(ts)
+        return {k: np.array([getattr(t, k) for t in ts]) for k in
+                ("sugar", "spice", "metabolism_sugar", "metabolism_spice", "vision")} | \
+            {"x": np.array([t.pos[0] for t in ts]), "y": np.array([t.pos[1] for t in ts])}
+    ref, bulk = population(), population(init_engine="vectorized")
+    for k in ref:
+        assert set(np.unique(ref[k])) == set(np.unique(bulk[k])), k
+        # two-sample z-test on the means, plus per-value frequencies for small supports
+        se = np.sqrt(ref[k].var() / n + bulk[k].var() / n)
+        assert abs(ref[k].mean() - bulk[k].mean()) < 4 * se, k
+        if k not in ("x", "y"):
+            for v in np.unique(ref[k]):
+                assert abs((ref[k] == v).mean() - (bulk[k] == v).mean()) < 0.04, (k, v)
+
+def test_deaths_stay_off_grid_and_expire():
+    from sugarscape import Trader
+    from sugarscape.deaths import DeathEvents
+    m = SugarscapeG1mt(seed=4, initial_population=120, metabolism_min=8, metabolism_max=12,
+                       resource_engine="array")
+    m.step()
+    died = 120 - m.schedule.get_type_count(Trader)
+    assert died > 0 and len(m.deaths) == died
+    # no marker agents: mesa's registry holds the 120 traders, dead ones included
+    assert set(m.schedule.agents_by_type) == {Trader} and set(m.agents_by_type) == {Trader}
+    assert len(m.agents) == 120
+    assert m.snapshot()["dead_x"].size == died
+    for _ in range(8):   # shown for `ttl` snapshots, gone at the start of step 9
+        m.step()
+    assert (m.deaths.events()["step"] >= 2).all()
+
+    ring = DeathEvents(ttl=2, capacity=3)
+    for step in (1, 1, 2, 3):
+        ring.add(step, (step, 0))
+    assert ring.events()["step"].tolist() == [1, 2, 3]   # oldest overwritten
+    ring.expire(4)
+    assert ring.positions()[0].tolist() == [3]
+
+def test_array_resources_keep_python_scalars():
+    from sugarscape import Trader
+    m = SugarscapeG1mt(seed=2, initial_population=100, resource_engine="array")
+    m.step()
+    ts = list(m.schedule.agents_by_type[Trader].values())
+    assert all(type(t.sugar) is int and type(t.spice) is int for t in ts)
+    assert type(ts[0].get_sugar_amount(ts[0].pos)) is int
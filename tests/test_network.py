@@ -0,0 +1,78 @@
+import networkx as nx
+import numpy as np
+import pytest
+from sugarscape import SugarscapeG1mt
+from sugarscape.checkpoint import save_checkpoint, load_checkpoint
+from sugarscape.network import TradeNetwork
+
+def _run(steps=5, **kw):
+    m = SugarscapeG1mt(seed=5, initial_population=200, resource_engine="array",
+                       trade_network="on", network_window=3, **kw)
+    m.run_model(steps)
+    return m
+
+def _window_graph(net):
+    e = net.edges((net.last_step - net.window + 1, net.last_step + 1))
+    g = nx.Graph()
+    g.add_edges_from(zip(e["a"].tolist(), e["b"].tolist()))
+    return g
+
+def test_edges_match_trade_stats_and_window_queries():
+    m = _run()
+    net = m.network
+    assert net.step[:net.n].tolist() == sorted(net.step[:net.n].tolist())
+    # dead traders' trades leave the price statistics but stay in the network
+    assert net.edges((5, 6))["volume"].sum() >= m.price_count > 0
+    g = _window_graph(net)
+    assert dict(net.degree) == dict(g.degree)
+    assert net.component_count() == nx.number_connected_components(g)
+    dist = net.degree_distribution()
+    assert dist.sum() == g.number_of_nodes() and dist[0] == 0
+
+def test_component_count_tracks_the_window_each_step():
+    m = SugarscapeG1mt(seed=6, initial_population=200, resource_engine="array",
+                       trade_network="on", network_window=3)
+    for _ in range(7):
+        m.step()
+        if m.schedule.steps % 2:
+            assert m.network.component_count() == nx.number_connected_components(
+                _window_graph(m.network))
+
+def test_exports_agree():
+    net = _run().network
+    mat, ids = net.to_sparse()
+    g = net.to_networkx()
+    assert mat.shape == (ids.size, ids.size) and (mat != mat.T).nnz == 0
+    assert sorted(g.nodes) == ids.tolist()
+    assert mat.sum() == 2 * net.volume[:net.n].sum()
+    assert sum(d["volume"] for _, _, d in g.edges(data=True)) == net.volume[:net.n].sum()
+    assert sum(d["trades"] for _, _, d in g.edges(data=True)) == net.n
+
+def test_save_load_and_checkpoint(tmp_path):
+    m = _run(steps=3)
+    m.network.save(tmp_path / "net.npz")
+    net = TradeNetwork.load(tmp_path / "net.npz")
+    assert net.degree == m.network.degree
+    assert np.array_equal(net.price[:net.n], m.network.price[:m.network.n])
+
+    save_checkpoint(m, tmp_path / "ck.npz")
+    r = load_checkpoint(tmp_path / "ck.npz")
+    ref = _run(steps=6)
+    r.run_model(3)
+    for k, v in ref.network.edges().items():
+        assert np.array_equal(r.network.edges()[k], v)
+    assert r.network.degree == ref.network.degree
+
+def test_window_slides_and_validates():
+    net = TradeNetwork(window=2, capacity=1)
+    net.add(1, 1, 2, [2.0]); net.end_step(1)
+    net.add(2, 3, 4, [1.0, 4.0]); net.end_step(2)
+    assert net.component_count() == 2 and net.price[1] == pytest.approx(2.0)
+    net.end_step(3)
+    assert net.degree == {3: 1, 4: 1} and net.component_count() == 1
+    net.add(4, 4, 5, [1.0]); net.add(4, 6, 7, [1.0]); net.end_step(4)
+    assert net.component_count() == 2   # 3-4 left the window
+    net.add(5, 5, 6, [1.0]); net.end_step(5)
+    assert net.component_count() == 1
+    with pytest.raises(ValueError):
+        SugarscapeG1mt(trade_network="yes")
@@ -0,0 +1,63 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from sugarscape.agents import Trader
+from sugarscape.model import SugarscapeG1mt
+from sugarscape.render import draw_snapshot
+
+def test_snapshot_matches_between_engines():
+    a = SugarscapeG1mt(seed=5, initial_population=80)
+    b = SugarscapeG1mt(seed=5, initial_population=80, resource_engine="array",
+                       trader_store="columnar")
+    for _ in range(3):
+        a.step(); b.step()
+    sa, sb = a.snapshot(), b.snapshot()  # ids differ: agents mode numbers patches first
+    for k in ("sugar", "spice", "sugar_capacity", "spice_capacity",
+              "trader_x", "trader_y", "welfare"):
+        assert np.array_equal(sa[k], sb[k]), k
+    traders = list(a.schedule.agents_by_type[Trader].values())
+    assert np.allclose(sa["welfare"], [t.calculate_welfare(t.sugar, t.spice) for t in traders])
+    # a copy: stepping the model leaves the snapshot alone
+    b.step()
+    assert not np.shares_memory(sb["sugar"], b.sugar_amount)
+
+def test_draw_snapshot():
+    m = SugarscapeG1mt(seed=1, initial_population=30, resource_engine="array")
+    fig, ax = plt.subplots()
+    draw_snapshot(ax, m.snapshot())
+    assert len(ax.images) == 1 and len(ax.collections) == 2
+    plt.close(fig)
+
+def test_export_run_png_and_gif(tmp_path):
+    from PIL import Image
+    from sugarscape.export import export_run
+    m = SugarscapeG1mt(seed=2, width=20, height=20, initial_population=20,
+                       landscape=np.zeros((20, 20)), resource_engine="array")
+    n = export_run(m, steps=4, out=tmp_path / "frames", every=2, workers=2, size=(2, 2), dpi=50)
+    assert n == 3 and m.schedule.steps == 4
+    assert sorted(p.name for p in (tmp_path / "frames").iterdir()) == \
+        ["frame-000000.png", "frame-000001.png", "frame-000002.png"]
+    assert export_run(m, steps=2, out=tmp_path / "run.gif", workers=2, size=(2, 2), dpi=50) == 3
+    assert Image.open(tmp_path / "run.gif").n_frames == 3
+
+def test_export_cli_renders_every_param_value(tmp_path, capsys):
+    from sugarscape.export import main
+    main(["--steps", "1", "--workers", "1", "--dpi", "20", "--out", str(tmp_path),
+          "--param", "initial_population=10,20", "--param", "vision_max=4"])
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["run-000", "run-001"]
+    out = capsys.readouterr().out
+    assert "'initial_population': 20, 'vision_max': 4" in out
+
+def test_agent_portrayal_uses_snapshot_colors():
+    from sugarscape.render import resource_rgba, welfare_colors
+    from sugarscape.viz import agent_portrayal
+    m = SugarscapeG1mt(seed=5, initial_population=20)
+    m.step()
+    t = next(iter(m.schedule.agents_by_type[Trader].values()))
+    assert agent_portrayal(t)["color"] == tuple(welfare_colors([t.calculate_welfare(t.sugar, t.spice)],
+                                                               m.viz_welfare_cap)[0])
+    snap = m.snapshot()
+    x, y = next(iter(m.sugar_patches))
+    assert np.allclose(agent_portrayal(m.sugar_patches[(x, y)])["color"],
+                       resource_rgba(snap)[y, x, :3])
@@ -0,0 +1,60 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from sugarscape import SugarscapeG1mt
+from sugarscape.results import RunResults
+
+def _csv_run(path, **kw):
+    m = SugarscapeG1mt(seed=3, initial_population=60, resource_engine="array", **kw)
+    m.run_model(30)
+    m.datacollector.get_model_vars_dataframe().to_csv(path / "model_vars.csv")
+    m.datacollector.get_agent_vars_dataframe().to_csv(path / "agent_vars.csv")
+    return m
+
+def test_csv_slices_match_full_read(tmp_path):
+    _csv_run(tmp_path)
+    full = pd.read_csv(tmp_path / "agent_vars.csv", index_col=[0, 1])["Trade Network"]
+    full = full.map(lambda v: json.loads(v) if isinstance(v, str) else None)
+    r = RunResults(tmp_path)
+    got = r.agent_vars(steps=(10, 20))["Trade Network"]
+    ref = full.loc[10:19]
+    assert got.index.equals(ref.index) and got.tolist() == ref.tolist()
+    assert (tmp_path / "agent_vars.csv.index.npz").exists()
+
+    ids = [0, 5, 7]
+    got = RunResults(tmp_path).agent_vars(agents=ids, every=5)["Trade Network"]  # from the saved index
+    steps, agents = full.index.get_level_values(0), full.index.get_level_values(1)
+    ref = full[agents.isin(ids) & (steps % 5 == 0)]
+    assert got.index.equals(ref.index) and got.tolist() == ref.tolist()
+
+    stats = r.agent_stats(every=10)
+    n = full.map(lambda v: len(v) if v is not None else np.nan)
+    n = n[n.index.get_level_values(0) % 10 == 0].dropna()
+    assert stats["agents"].tolist() == n.groupby(level=0).size().tolist()
+    assert stats["values"].tolist() == n.groupby(level=0).sum().astype(int).tolist()
+
+    mv = pd.read_csv(tmp_path / "model_vars.csv", index_col=0)
+    assert r.model_vars(every=10)["Trader"].tolist() == mv["Trader"][::10].tolist()
+    binned = r.model_vars(["Volume"], steps=(0, 30), every=10, how="mean")
+    assert np.allclose(binned["Volume"], mv["Volume"][:30].to_numpy().reshape(3, 10).mean(axis=1))
+
+def test_index_rebuilt_when_csv_changes(tmp_path):
+    _csv_run(tmp_path)
+    assert RunResults(tmp_path).steps().tolist() == list(range(1, 31))
+    av = pd.read_csv(tmp_path / "agent_vars.csv", index_col=[0, 1])
+    av.loc[:12].to_csv(tmp_path / "agent_vars.csv")
+    os.utime(tmp_path / "agent_vars.csv", ns=(0, 0))
+    assert RunResults(tmp_path).steps().tolist() == list(range(1, 13))
+
+def test_stream_dir_matches_csv(tmp_path):
+    (tmp_path / "csv").mkdir()
+    _csv_run(tmp_path / "csv")
+    m = _csv_run(tmp_path, collector_dir=tmp_path / "stream", collector_flush_every=7)
+    m.datacollector.flush()
+    a, b = RunResults(tmp_path / "csv"), RunResults(tmp_path / "stream")
+    q = dict(steps=(4, 25), agents=[1, 2, 3, 40], every=3)
+    csv_recs = a.agent_vars(**q)["Trade Network"].dropna()
+    assert b.agent_vars(**q)["Trade Network"].tolist() == csv_recs.tolist()
+    assert b.agent_stats(every=4).equals(a.agent_stats(every=4))
+    assert np.allclose(b.model_vars(every=5)["Trader"], a.model_vars(every=5)["Trader"])
@@ -0,0 +1,27 @@
+import mesa
+from sugarscape.spatial import wrapped_neighborhood, Neighborhoods
+from sugarscape.utils import grid_dist
+
+def test_wrapped_neighborhood_matches_mesa_order():
+    for w, h in [(50, 50), (7, 5)]:
+        grid = mesa.space.MultiGrid(w, h, torus=True)
+        for pos in [(0, 0), (3, 2), (w - 1, h - 1)]:
+            for moore in (True, False):
+                for center in (True, False):
+                    xs, ys = wrapped_neighborhood(pos, w, h, 4, moore, center)
+                    got = list(zip(xs.tolist(), ys.tolist()))
+                    assert got == list(grid.get_neighborhood(pos, moore, center, 4))
+
+def test_neighborhood_cache_matches_mesa_and_grid_dist():
+    for w, h in [(50, 50), (7, 5)]:
+        grid = mesa.space.MultiGrid(w, h, torus=True)
+        nb = Neighborhoods(w, h)
+        for pos in [(0, 0), (3, 2), (25, 25), (w - 1, h - 1)]:
+            pos = (pos[0] % w, pos[1] % h)
+            for moore in (True, False):
+                for center in (True, False):
+                    xs, ys, dist = nb.cells(pos, 4, moore, center)
+                    got = list(zip(xs.tolist(), ys.tolist()))
+                    assert got == list(grid.get_neighborhood(pos, moore, center, 4))
+                    assert dist.tolist() == [grid_dist(pos, c, moore) for c in got]
+    assert nb.stencil(4, True, False) is nb.stencil(4, True, False)
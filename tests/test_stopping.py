@@ -0,0 +1,41 @@
+import json
+from sugarscape import SugarscapeG1mt
+from sugarscape.stopping import _RollingRange
+from sugarscape.sweep import run_sweep
+
+def _model(**kw):
+    return SugarscapeG1mt(seed=2, initial_population=60, resource_engine="array", **kw)
+
+def test_rolling_range():
+    r = _RollingRange(3)
+    for x in (10, 1, 5, 5):
+        r.push(x)
+    assert (r._lo[0][1], r._hi[0][1]) == (1, 5) and not r.within(0.5)
+    r.push(5.2)
+    assert r.within(0.05)
+
+def test_stop_reasons():
+    m = _model()
+    m.run_model(3)
+    assert m.stop_reason == "steps" and m.schedule.steps == 3
+
+    m = _model(metabolism_min=40, metabolism_max=40)
+    m.run_model(50, stop_on_extinction=True)
+    assert m.stop_reason == "extinction" and not m.running
+    assert m.schedule.steps < 50 and len(m.datacollector.get_model_vars_dataframe()) == m.schedule.steps
+
+    # nobody left to trade: count and (absent) price hold steady
+    m = _model(metabolism_min=40, metabolism_max=40)
+    m.run_model(50, stable_window=4)
+    assert m.stop_reason == "stable"
+
+    m = _model()
+    m.run_model(50, time_budget=0)
+    assert m.stop_reason == "time" and m.schedule.steps == 1
+
+def test_sweep_records_stop_reason(tmp_path):
+    run_sweep({"metabolism_min": [40], "metabolism_max": [40]}, seeds=[1], steps=50,
+              out_dir=tmp_path, workers=1, stop={"stop_on_extinction": True},
+              resource_engine="array")
+    rec = json.loads((tmp_path / "manifest.jsonl").read_text())
+    assert rec["stop_reason"] == "extinction" and rec["steps_run"] < 50
@@ -0,0 +1,30 @@
+import json
+import pandas as pd
+from sugarscape.sweep import expand_grid, run_sweep, main
+
+def test_expand_grid():
+    pts = expand_grid({"a": [1, 2], "b": ["x"]})
+    assert pts == [{"a": 1, "b": "x"}, {"a": 2, "b": "x"}]
+
+def test_run_sweep_streams_runs(tmp_path):
+    recs = run_sweep({"initial_population": [20, 30]}, seeds=[1, 2], steps=2,
+                     out_dir=tmp_path, workers=2, resource_engine="array")
+    assert sorted(r["run"] for r in recs) == [0, 1, 2, 3]
+    lines = (tmp_path / "manifest.jsonl").read_text().splitlines()
+    assert len(lines) == 4
+    rec = json.loads(lines[0])
+    mv = pd.read_csv(tmp_path / rec["file"], index_col=0)
+    assert len(mv) == 2 and mv["Trader"].iloc[0] <= rec["params"]["initial_population"]
+
+def test_rerun_replaces_previous_sweep(tmp_path):
+    run_sweep({"initial_population": [20]}, seeds=[1, 2, 3], steps=2, out_dir=tmp_path, workers=1)
+    run_sweep({"initial_population": [20]}, seeds=[1], steps=2, out_dir=tmp_path, workers=1)
+    lines = (tmp_path / "manifest.jsonl").read_text().splitlines()
+    assert [json.loads(l)["file"] for l in lines] == ["run-00000.csv"]
+    assert sorted(p.name for p in tmp_path.glob("run-*.csv")) == ["run-00000.csv"]
+
+def test_repeated_params_merge(tmp_path):
+    main(["--param", "initial_population=20", "--param", "initial_population=30",
+          "--steps", "1", "--workers", "1", "--out", str(tmp_path)])
+    lines = (tmp_path / "manifest.jsonl").read_text().splitlines()
+    assert sorted(json.loads(l)["params"]["initial_population"] for l in lines) == [20, 30]